@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Checks that the indexed MIDIChannelManager in scamp._midi makes exactly the same channel assignments as the
+original linear-scan implementation (reproduced below as ReferenceMIDIChannelManager), and compares their speed.
+
+Both managers are driven through the same randomized workloads -- dense microtonal clusters, notes with variable
+pitch bend / cc, and more simultaneous notes than there are channels -- on a simulated clock, and every result
+(assigned channel, or the channel and notes suggested by a NoFreeChannelError) is compared.
+
+Usage:
+    python3 scripts/benchmark_midi_channel_manager.py
+    python3 scripts/benchmark_midi_channel_manager.py --notes 50000 --channels 16 --seeds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from scamp._midi import MIDIChannelManager, NoFreeChannelError, NoteInfo
+
+
+class ReferenceMIDIChannelManager:
+    """
+    The original MIDIChannelManager, which scans every channel on every call.
+    """
+
+    def __init__(self, num_channels, ring_time=0.5, time_func=time.time):
+        self.channels_info = [
+            {"active_notes": [], "last_note_end_time": float("-inf"), "pitch_bend": 0, "cc_values": {}}
+            for _ in range(num_channels)
+        ]
+        self.time_func = time_func
+        self.ring_time = ring_time
+
+    def _get_best_channel_for_fixed_note(self, midi_pitch, pitch_bend, cc_values):
+        matching_channels = [
+            (i, channel_info) for i, channel_info in enumerate(self.channels_info)
+            if pitch_bend == channel_info["pitch_bend"] and cc_values == channel_info["cc_values"]
+            and not any(midi_pitch == note.pitch for note in channel_info["active_notes"])
+        ]
+        if len(matching_channels) > 0:
+            matching_channels.sort(
+                key=lambda index_and_channel_info: len(index_and_channel_info[1]["active_notes"]) == 0
+            )
+            return matching_channels[0]
+        else:
+            return None
+
+    def _get_free_channel(self):
+        oldest_ringing_channel, oldest_finished_note_time = None, float("inf")
+        for i, channel_info in enumerate(self.channels_info):
+            if len(channel_info["active_notes"]) == 0:
+                if self.time_func() > channel_info["last_note_end_time"] + self.ring_time:
+                    return i, channel_info
+                else:
+                    if channel_info["last_note_end_time"] < oldest_finished_note_time:
+                        oldest_ringing_channel = i, channel_info
+                        oldest_finished_note_time = channel_info["last_note_end_time"]
+        if oldest_ringing_channel is not None:
+            return oldest_ringing_channel
+        return None
+
+    def _get_best_channel_to_free(self):
+        channels_to_consider = [(i, channel_info) for i, channel_info in enumerate(self.channels_info)]
+        channels_to_consider.sort(
+            key=lambda channel_num_and_info: max(note.start_time for note in channel_num_and_info[1]["active_notes"]))
+        return channels_to_consider[0]
+
+    def assign_note_to_channel(self, note_id, midi_pitch, pitch_bend, cc_values):
+        if pitch_bend == "variable" or cc_values == "variable":
+            channel = self._get_free_channel()
+        else:
+            channel = self._get_best_channel_for_fixed_note(midi_pitch, pitch_bend, cc_values)
+            if channel is None:
+                channel = self._get_free_channel()
+
+        if channel is None:
+            channel_to_free, channel_info = self._get_best_channel_to_free()
+            notes_to_free = list(self.channels_info[channel_to_free]["active_notes"])
+            raise NoFreeChannelError(channel_to_free, notes_to_free)
+
+        channel_num, channel_info = channel
+        channel_info["active_notes"].append(NoteInfo(note_id, midi_pitch, self.time_func()))
+        channel_info["pitch_bend"] = pitch_bend
+        channel_info["cc_values"] = cc_values
+        return channel_num
+
+    def end_note(self, note_id):
+        for channel_info in self.channels_info:
+            for note in channel_info["active_notes"]:
+                if note.note_id == note_id:
+                    channel_info["active_notes"].remove(note)
+                    channel_info["last_note_end_time"] = self.time_func()
+                    return
+        raise ValueError(f"Cannot find note id {note_id} to end it.")
+
+
+def make_workload(num_notes, seed):
+    """
+    Returns a list of ("start", time, note_id, pitch, bend, cc_values) / ("end", time, note_id) events, in time order.
+    """
+    rng = random.Random(seed)
+    events = []
+    t = 0
+    for note_id in range(num_notes):
+        t += rng.expovariate(25)
+        pitch = rng.randint(55, 80)
+        kind = rng.random()
+        if kind < 0.15:
+            bend, cc_values = "variable", "variable"
+        else:
+            # a small set of microtonal bends and cc settings, so that notes often can share channels
+            bend = rng.choice((0, 0, 0.25, 0.5, -0.25, 1 / 3))
+            cc_values = rng.choice(({}, {}, {64: 1.0}, {1: 0.5}))
+        events.append(("start", t, note_id, pitch, bend, cc_values))
+        events.append(("end", t + rng.uniform(0.05, 1.5), note_id))
+    events.sort(key=lambda event: event[1])
+    return events
+
+
+def run_workload(manager_class, events, num_channels, ring_time):
+    t = 0
+    manager = manager_class(num_channels, ring_time=ring_time, time_func=lambda: t)
+    results = []
+    freed = set()
+    for event in events:
+        t = event[1]
+        if event[0] == "start":
+            _, _, note_id, pitch, bend, cc_values = event
+            try:
+                results.append(manager.assign_note_to_channel(note_id, pitch, bend, cc_values))
+            except NoFreeChannelError as e:
+                results.append((e.best_channel_to_free, tuple(e.notes_to_free)))
+                for note in e.notes_to_free:
+                    manager.end_note(note.note_id)
+                    freed.add(note.note_id)
+                results.append(manager.assign_note_to_channel(note_id, pitch, bend, cc_values))
+        elif event[2] not in freed:
+            manager.end_note(event[2])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=20000, help="number of notes per workload")
+    parser.add_argument("--channels", type=int, default=16, help="number of channels to manage")
+    parser.add_argument("--ring-time", type=float, default=0.5, help="ring time of the channel managers")
+    parser.add_argument("--seeds", type=int, default=5, help="number of random workloads to run")
+    args = parser.parse_args()
+
+    reference_total = indexed_total = 0
+    for seed in range(args.seeds):
+        events = make_workload(args.notes, seed)
+
+        start = time.perf_counter()
+        reference_results = run_workload(ReferenceMIDIChannelManager, events, args.channels, args.ring_time)
+        reference_total += time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed_results = run_workload(MIDIChannelManager, events, args.channels, args.ring_time)
+        indexed_total += time.perf_counter() - start
+
+        if indexed_results != reference_results:
+            first_difference = next(i for i, (a, b) in enumerate(zip(reference_results, indexed_results)) if a != b)
+            raise SystemExit(f"Seed {seed}: results differ at assignment {first_difference}: "
+                             f"{reference_results[first_difference]} vs {indexed_results[first_difference]}")
+        print(f"Seed {seed}: {len(indexed_results)} identical assignments")
+
+    print(f"Reference: {reference_total:.3f}s, indexed: {indexed_total:.3f}s "
+          f"({reference_total / indexed_total:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Checks that the NoteProperties constructor builds exactly the same properties as the original implementation
+(reproduced below as reference_note_properties), which matched every keyword against every property regex and
+deep-copied every default, and compares their speed. Also checks that the cheap copy made for each note of a
+chord is equal to, and independent of, the original, and times it against the deep copy it replaced.
+
+Usage:
+    python3 scripts/benchmark_note_properties.py
+    python3 scripts/benchmark_note_properties.py --repeats 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from copy import deepcopy
+
+from expenvelope import Envelope
+from scamp.note_properties import NoteProperties
+from scamp.utilities import _is_non_str_sequence
+
+
+def reference_note_properties(**kwargs):
+    """
+    The body of the original NoteProperties.__init__ (minus the handling of bundles, which is unchanged), returning
+    the resulting dictionary of properties.
+    """
+    normalized_kwargs = {}
+    for property_info in NoteProperties.PROPERTY_TYPES:
+        for key in kwargs:
+            if re.match(property_info["regex"], key):
+                value = kwargs[key]
+                if _is_non_str_sequence(property_info["default"]):
+                    if not _is_non_str_sequence(kwargs[key]):
+                        value = [value]
+                    if property_info["regularization_function"] is not None:
+                        value = [property_info["regularization_function"](x) for x in value]
+                else:
+                    if property_info["regularization_function"] is not None:
+                        value = property_info["regularization_function"](value)
+                normalized_kwargs[property_info["key"]] = value
+                break
+        else:
+            normalized_kwargs[property_info["key"]] = deepcopy(property_info["default"])
+
+    for key in kwargs:
+        if key.startswith("param_"):
+            param_name, param_value = key[6:], kwargs[key]
+            if isinstance(param_value, (list, tuple)):
+                param_value = Envelope.from_list(param_value)
+                param_value.parsed_from_list = True
+            normalized_kwargs["extra_playback_parameters"][param_name] = param_value
+    normalized_kwargs["temp"] = {}
+    return normalized_kwargs
+
+
+# a variety of keyword arguments, covering every property, aliases, non-list values for list properties,
+# regularization from strings, param_* keys, unrecognized keys and more than one alias for the same property
+TEST_KWARGS = [
+    {},
+    {"articulation": "staccato"},
+    {"articulations": ["staccato", "accent"], "articulation": "tenuto"},
+    {"articulation": "tenuto", "articulations": ["staccato", "accent"]},
+    {"notation": "tremolo", "notehead": "x"},
+    {"noteheads": ["diamond", "normal"], "dynamic": "pp", "dynamics": ["ff"]},
+    {"text": "dolce", "texts": ["ignored"]},
+    {"texts": ["espr.", "molto"]},
+    {"playback_adjustment": "volume * 0.5"},
+    {"adjustments": ["pitch + 0.5", "length * 2"]},
+    {"spelling": "D major"},
+    {"key": "flat"},
+    {"spelling_policies": ["sharp", "flat"]},
+    {"voice": "2", "starts_tie": True, "ends_tie": True, "manual_split_point": True},
+    {"extra_playback_parameters": {"brightness": 0.5}},
+    {"param_brightness": 0.3, "param_10": [0, 1, 0.5]},
+    {"unrecognized": 5, "articulation": "accent"},
+]
+
+
+def check_equivalence():
+    for kwargs in TEST_KWARGS:
+        expected = reference_note_properties(**deepcopy(kwargs))
+        actual = NoteProperties(**deepcopy(kwargs))
+        if actual.__dict__ != expected or list(actual.__dict__) != list(expected):
+            raise SystemExit(f"Constructing from {kwargs} gives {actual.__dict__} instead of {expected}")
+
+        copy = actual._copy()
+        if copy.__dict__ != deepcopy(actual).__dict__:
+            raise SystemExit(f"Copy of {actual} is not equal to the original")
+        for key, value in actual.__dict__.items():
+            if isinstance(value, (list, dict)) and value is getattr(copy, key):
+                raise SystemExit(f"Copy of {actual} shares its {key} with the original")
+    print(f"{len(TEST_KWARGS)} sets of keyword arguments give identical properties")
+
+
+def time_it(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=20000, help="number of objects to construct for each timing")
+    args = parser.parse_args()
+
+    check_equivalence()
+
+    for kwargs in ({}, {"articulation": "staccato", "noteheads": ["x"]}, {"spelling": "flat", "param_10": 0.5}):
+        reference_time = time_it(lambda: reference_note_properties(**kwargs), args.repeats)
+        new_time = time_it(lambda: NoteProperties(**kwargs), args.repeats)
+        print(f"Construct from {kwargs}: reference {reference_time:.3f}s, current {new_time:.3f}s "
+              f"({reference_time / new_time:.1f}x faster)")
+
+    properties = NoteProperties(articulations=["staccato", "accent"], noteheads=["x", "diamond", "normal"],
+                                texts=["dolce"], spelling="D major")
+    deepcopy_time = time_it(lambda: deepcopy(properties), args.repeats)
+    copy_time = time_it(properties._copy, args.repeats)
+    print(f"Copy for chord member: deepcopy {deepcopy_time:.3f}s, current {copy_time:.3f}s "
+          f"({deepcopy_time / copy_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
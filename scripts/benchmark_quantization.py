@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Times the quantization of long synthetic voices of increasing size, to check that it scales linearly with the number
+of notes (i.e. that the time per note stays roughly constant).
+
+Each voice is a random melody with occasional chords, rests and tied (multi-segment) notes, quantized with the
+default quantization settings in 4/4.
+
+Usage:
+    python3 scripts/benchmark_quantization.py
+    python3 scripts/benchmark_quantization.py --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from scamp.note_properties import NoteProperties
+from scamp.performance import PerformanceNote
+from scamp.quantization import QuantizationScheme, _quantize_performance_voice, _collapse_chords
+
+
+def make_voice(num_notes, seed):
+    rng = random.Random(seed)
+    voice = []
+    t = 0
+    for _ in range(num_notes):
+        if rng.random() < 0.2:
+            # chord tone starting together with the previous note
+            t = voice[-1].start_beat if voice else 0
+        else:
+            t += rng.choice((0.25, 0.5, 0.5, 1, 1.5)) + rng.gauss(0, 0.03)
+        length = rng.choice((0.25, 0.5, 1)) + rng.gauss(0, 0.03)
+        if rng.random() < 0.1:
+            # a note with tied segments, which produces inner splits
+            length = (length, rng.choice((0.5, 1)) + rng.gauss(0, 0.03))
+        voice.append(PerformanceNote(max(t, 0), length, rng.randint(48, 84), 0.5, NoteProperties()))
+    voice.sort(key=lambda note: note.start_beat)
+    return voice
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="numbers of notes in the voices to quantize")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for generating the voices")
+    args = parser.parse_args()
+
+    quantization_scheme = QuantizationScheme.from_time_signature("4/4")
+    for num_notes in args.sizes:
+        voice = make_voice(num_notes, args.seed)
+        start = time.perf_counter()
+        _quantize_performance_voice(voice, quantization_scheme)
+        _collapse_chords(voice)
+        duration = time.perf_counter() - start
+        print(f"{num_notes:>9} notes: {duration:8.3f}s ({duration / num_notes * 1e6:.1f} µs per note)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Times and measures the peak memory of turning a long synthetic performance into a Score, and of the copies of its
+notes that quantization and score building make along the way, comparing the lightweight copies they now use with
+the deep copies they used to make.
+
+The performance has several parts, each a random melody with occasional chords, glissandi, rests, articulations and
+notes tied across barlines. It is quantized in 4/4 with the default quantization settings.
+
+Usage:
+    python3 scripts/benchmark_score_building.py
+    python3 scripts/benchmark_score_building.py --parts 4 --notes 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+from copy import deepcopy
+
+from expenvelope import Envelope
+from scamp.note_properties import NoteProperties
+from scamp.performance import Performance, PerformanceNote, PerformancePart
+from scamp.quantization import QuantizationScheme
+from scamp.score import Score
+
+
+def make_performance(num_parts, num_notes, seed):
+    rng = random.Random(seed)
+    performance = Performance()
+    for part_num in range(num_parts):
+        part = PerformancePart(name=f"Part {part_num + 1}", instrument_id=(f"Part {part_num + 1}", 0))
+        performance.add_part(part)
+        t = 0
+        for _ in range(num_notes):
+            length = rng.choice((0.25, 0.5, 0.5, 1, 1.5, 1 / 3, 2.5))
+            if rng.random() < 0.1:
+                # rest
+                t += length
+                continue
+            pitch = rng.randint(48, 84)
+            if rng.random() < 0.1:
+                pitch = (pitch, pitch + rng.choice((3, 4, 7)))
+            elif rng.random() < 0.05:
+                pitch = Envelope([pitch, pitch + rng.randint(-5, 5)], [length])
+            properties = NoteProperties(rng.choice(("staccato", "accent", "tenuto", "fermata", "spelling: C major")))
+            part.add_note(PerformanceNote(t, length, pitch, 0.5, properties))
+            t += length
+    return performance
+
+
+def measure(function, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+def report(label, duration, peak):
+    print(f"{label:<36} {duration:8.3f}s {peak / 2 ** 20:10.1f} MiB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=4, help="number of parts in the performance")
+    parser.add_argument("--notes", type=int, default=5000, help="number of notes (or rests) in each part")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for generating the performance")
+    args = parser.parse_args()
+
+    performance = make_performance(args.parts, args.notes, args.seed)
+    voices = [voice for part in performance.parts for voice in part.voices.values()]
+
+    _, duration, peak = measure(lambda: [deepcopy(voice) for voice in voices])
+    report("copy voices (deepcopy)", duration, peak)
+    _, duration, peak = measure(lambda: [[note._copy() for note in voice] for voice in voices])
+    report("copy voices (PerformanceNote._copy)", duration, peak)
+
+    quantized, duration, peak = measure(performance.quantized, QuantizationScheme.from_time_signature("4/4"))
+    report("Performance.quantized", duration, peak)
+    _, duration, peak = measure(Score.from_quantized_performance, quantized, title="Benchmark", composer="")
+    report("Score.from_quantized_performance", duration, peak)
+
+
+if __name__ == "__main__":
+    main()
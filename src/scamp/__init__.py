@@ -43,15 +43,19 @@ from .transcriber import Transcriber
 from .performance import Performance, PerformancePart, PerformanceNote
 from .spelling import SpellingPolicy
 from .score import Score, StaffGroup, Staff, Measure, Voice, Tuplet, NoteLike
+from ._music_xml_streaming import MusicXMLCache
 from .text import StaffText
 from .spanners import StartBracket, StartTrill, StartPedal, StartDashes, StartSlur, StartHairpin, StartPhrasingSlur, \
     ChangePedal, StopPedal, StopTrill, StopDashes, StopSlur, StopHairpin, StopPhrasingSlur, StopBracket
-from .quantization import TimeSignature, QuantizationScheme, MeasureQuantizationScheme, BeatQuantizationScheme
+from .quantization import TimeSignature, QuantizationScheme, MeasureQuantizationScheme, BeatQuantizationScheme, \
+    IncrementalQuantizer
 from .settings import playback_settings, quantization_settings, engraving_settings
 from ._midi import get_available_midi_input_devices, get_available_midi_output_devices, \
-    print_available_midi_input_devices, print_available_midi_output_devices, get_port_number_of_midi_device
+    print_available_midi_input_devices, print_available_midi_output_devices, get_port_number_of_midi_device, \
+    get_midi_output_stats
 from .playback_adjustments import NotePlaybackAdjustment, ParamPlaybackAdjustment
 from .note_properties import NoteProperties
+from .utilities import clear_caches, get_cache_info
 import importlib.metadata
 from ._soundfont_host import print_soundfont_presets
 from ._dependencies import print_dependency_status, dependency_status
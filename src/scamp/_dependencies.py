@@ -120,6 +120,8 @@ try:
     import pythonosc.udp_client
     import pythonosc.dispatcher
     import pythonosc.osc_server
+    import pythonosc.osc_bundle_builder
+    import pythonosc.osc_message_builder
 except ImportError:
     pythonosc = None
     logging.debug("pythonosc not available; OSCScampInstrument disabled.")
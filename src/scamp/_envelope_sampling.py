@@ -0,0 +1,127 @@
+"""
+Quantization-aware sampling of :class:`~expenvelope.envelope.Envelope` objects. Rather than sampling an envelope at
+a uniform time step, we work out the exact times at which its value crosses from one quantization level to the next
+(e.g. from one 14-bit pitch bend value or 7-bit cc value to the next), so that flat stretches produce no redundant
+values and steep stretches are sampled as finely as they need to be. Used both by the live animation of parameter
+changes in :mod:`scamp.instruments` and by the MIDI file export in :mod:`scamp.performance`.
+(This is an implementation detail.)
+"""
+
+#  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
+#  This file is part of SCAMP (Suite for Computer-Assisted Music in Python)                      #
+#  Copyright © 2020 Marc Evanstein <marc@marcevanstein.com>.                                     #
+#                                                                                                #
+#  This program is free software: you can redistribute it and/or modify it under the terms of    #
+#  the GNU General Public License as published by the Free Software Foundation, either version   #
+#  3 of the License, or (at your option) any later version.                                      #
+#                                                                                                #
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;     #
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.     #
+#  See the GNU General Public License for more details.                                          #
+#                                                                                                #
+#  You should have received a copy of the GNU General Public License along with this program.    #
+#  If not, see <http://www.gnu.org/licenses/>.                                                   #
+#  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
+
+from __future__ import annotations
+import numpy as np
+from expenvelope import Envelope
+from typing import Callable
+
+
+def segment_values(progress, start_levels, end_levels, curve_shapes):
+    """
+    Vectorized version of EnvelopeSegment.value_at, taking the normalized progress (0 to 1) through each segment.
+    (See EnvelopeSegment.value_at for the formula.) All arguments can be NumPy arrays or scalars.
+    """
+    progress, curve_shapes = np.asarray(progress, dtype=float), np.asarray(curve_shapes, dtype=float)
+    linear = np.abs(curve_shapes) < 1e-6
+    # avoid dividing by zero for the linear segments (which get overwritten below anyway)
+    safe_shapes = np.where(linear, 1, curve_shapes)
+    curved_progress = np.expm1(safe_shapes * progress) / np.expm1(safe_shapes)
+    return start_levels + (end_levels - start_levels) * np.where(linear, progress, curved_progress)
+
+
+def segment_progress_at_values(values, start_level, end_level, curve_shape):
+    """
+    Inverse of :func:`segment_values` for a single segment: the normalized progress (0 to 1) at which the segment
+    reaches each of the given values. (Envelope segments are monotonic, so this is well-defined for values between
+    the start and end levels.)
+    """
+    fraction = (np.asarray(values, dtype=float) - start_level) / (end_level - start_level)
+    if abs(curve_shape) < 1e-6:
+        progress = fraction
+    else:
+        progress = np.log1p(fraction * np.expm1(curve_shape)) / curve_shape
+    return np.clip(progress, 0, 1)
+
+
+def segment_crossings(start_level, end_level, curve_shape, step, offset=0.0):
+    """
+    Returns the normalized progress (0 to 1) at each point where a segment crosses one of the quantization
+    thresholds offset + k * step, in order.
+
+    :param start_level: start level of the segment
+    :param end_level: end level of the segment
+    :param curve_shape: curve shape of the segment
+    :param step: distance between quantization thresholds
+    :param offset: a value that falls on a quantization threshold
+    """
+    if end_level == start_level or step <= 0:
+        return np.zeros(0)
+    low, high = min(start_level, end_level), max(start_level, end_level)
+    thresholds = offset + step * np.arange(np.floor((low - offset) / step) + 1, np.ceil((high - offset) / step))
+    if start_level > end_level:
+        thresholds = thresholds[::-1]
+    return segment_progress_at_values(thresholds, start_level, end_level, curve_shape)
+
+
+def sample_envelope(envelope: Envelope, step: float, offset: float = 0.0, min_spacing: float = 0.0,
+                    quantize: Callable = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Samples the given envelope at the start of each of its segments and wherever it crosses from one quantization
+    level to the next. The value given for the start of a segment is the segment's start level. The value given for
+    a crossing is the value of the envelope midway between it and the next threshold crossing, so that it falls
+    safely within the quantization level that the envelope has entered, regardless of floating point error at the
+    threshold itself.
+
+    :param envelope: the envelope to sample
+    :param step: distance between quantization thresholds
+    :param offset: a value that falls on a quantization threshold
+    :param min_spacing: if greater than zero, no two samples will be closer than roughly this far apart; of a
+        cluster of crossings within this time, only the first is kept (carrying the value at that point), except that
+        the last sample kept carries the value of the last sample overall, so that the envelope still reaches its end
+    :param quantize: (optional) a vectorized function that maps envelope values to their quantized versions. If
+        given, this is applied to the sample values, and samples that repeat the previous quantized value are dropped.
+    :return: a tuple of (sample times, sample values) as NumPy arrays
+    """
+    times, values = [], []
+    for segment in envelope.segments:
+        if segment.duration <= 0:
+            continue
+        progress = np.concatenate((
+            [0.], segment_crossings(segment.start_level, segment.end_level, segment.curve_shape, step, offset)
+        ))
+        midpoints = (progress + np.append(progress[1:], 1.)) / 2
+        segment_samples = segment_values(midpoints, segment.start_level, segment.end_level, segment.curve_shape)
+        segment_samples[0] = segment.start_level
+        times.append(segment.start_time + progress * segment.duration)
+        values.append(segment_samples)
+
+    if len(times) == 0:
+        times, values = np.zeros(1), np.array([float(envelope.start_level())])
+    else:
+        times, values = np.concatenate(times), np.concatenate(values)
+
+    if min_spacing > 0:
+        _, first_in_bin = np.unique(np.floor((times - times[0]) / min_spacing), return_index=True)
+        end_value = values[-1]
+        times, values = times[first_in_bin], values[first_in_bin]
+        values[-1] = end_value
+
+    if quantize is not None:
+        values = quantize(values)
+        not_repeated = np.concatenate(([True], values[1:] != values[:-1]))
+        times, values = times[not_repeated], values[not_repeated]
+
+    return times, values
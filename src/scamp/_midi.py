@@ -20,7 +20,8 @@ from ._dependencies import rtmidi
 import threading
 from .utilities import get_average_square_correlation
 import functools
-from collections import namedtuple
+from collections import namedtuple, Counter, deque
+import heapq
 import time
 
 
@@ -139,6 +140,10 @@ def start_midi_listener(port_number_or_device_name, callback_function, clock):
 
 
 _port_connections = {}
+# the last pitch bend and cc values sent on each channel of each output port, keyed by port. Several SimpleRtMidiOuts
+# (belonging to different instruments) can send to the same port, so this is where they find out what its channels
+# have actually been set to.
+_port_channel_states = {}
 
 
 def get_port_connection(number, name):
@@ -154,7 +159,125 @@ def get_port_connection(number, name):
         return midi_out
 
 
+class _MIDIOutputWriter:
+
+    """
+    Sends MIDI messages on behalf of the clock threads, so that they don't have to wait on rtmidi. Each output port
+    gets its own queue (a deque, whose appends and pops are atomic, so the clock threads never block on a lock), and a
+    single shared sender thread empties all of the queues. Whatever has piled up in a port's queue by the time the
+    sender gets to it is treated as one batch, within which a pitch bend or cc message is dropped if a later message in
+    the batch would overwrite it anyway. (This is an implementation detail.)
+    """
+
+    # RPN / NRPN selection and data entry messages only make sense as a sequence, so we never drop any of them
+    _UNCOALESCABLE_CCS = {6, 38, 96, 97, 98, 99, 100, 101}
+
+    def __init__(self):
+        self.queues = {}
+        self.messages_sent = 0
+        self.messages_coalesced = 0
+        # the longest time (in seconds) that a message has waited in a queue before being sent
+        self.max_send_delay = 0
+        self._wake_up = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+        self._running = False
+
+    def get_queue(self, midi_out):
+        """
+        Returns the queue for messages to the given rtmidi output, starting the sender thread if needed.
+        """
+        if midi_out not in self.queues:
+            self.queues[midi_out] = deque()
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True, name="SCAMP MIDI output")
+            self._thread.start()
+        return self.queues[midi_out]
+
+    def send(self, queue, message):
+        """
+        Queues up a message, stamped with the time it was queued.
+        """
+        queue.append((time.perf_counter(), message))
+        self._idle.clear()
+        self._wake_up.set()
+
+    def flush(self, timeout=1.0):
+        """
+        Waits (up to timeout seconds) until all queued messages have been sent.
+        """
+        deadline = time.perf_counter() + timeout
+        while self._running and any(len(queue) > 0 for queue in self.queues.values()):
+            self._wake_up.set()
+            if not self._idle.wait(deadline - time.perf_counter()):
+                return
+
+    def stop(self):
+        self.flush()
+        self._running = False
+        self._wake_up.set()
+
+    @staticmethod
+    def _coalesce(batch):
+        # go backwards through the batch, remembering which (status, cc number) slots have a later value. A note on or
+        # off resets this for its channel, since any bend or cc before it needs to be in place when the note sounds.
+        overwritten = set()
+        kept = []
+        for timestamp, message in reversed(batch):
+            status = message[0] & 0xF0
+            if status in (0x80, 0x90):
+                channel = message[0] & 0x0F
+                overwritten = {key for key in overwritten if key[0] & 0x0F != channel}
+            elif status == 0xE0 or status == 0xB0 and message[1] not in _MIDIOutputWriter._UNCOALESCABLE_CCS:
+                key = (message[0], None) if status == 0xE0 else (message[0], message[1])
+                if key in overwritten:
+                    continue
+                overwritten.add(key)
+            kept.append((timestamp, message))
+        kept.reverse()
+        return kept
+
+    def _run(self):
+        while self._running:
+            self._wake_up.wait()
+            self._wake_up.clear()
+            for midi_out, queue in list(self.queues.items()):
+                batch = []
+                while len(queue) > 0:
+                    batch.append(queue.popleft())
+                if len(batch) == 0:
+                    continue
+                to_send = _MIDIOutputWriter._coalesce(batch)
+                self.messages_coalesced += len(batch) - len(to_send)
+                for timestamp, message in to_send:
+                    midi_out.send_message(message)
+                    self.max_send_delay = max(self.max_send_delay, time.perf_counter() - timestamp)
+                self.messages_sent += len(to_send)
+            if all(len(queue) == 0 for queue in self.queues.values()):
+                self._idle.set()
+
+
+_output_writer = _MIDIOutputWriter()
+
+
+def get_midi_output_stats() -> dict:
+    """
+    Returns statistics on the MIDI messages sent through the queued output (see the ``queued_output`` argument of
+    :class:`~scamp.playback_implementations.MIDIStreamPlaybackImplementation`): how many messages were sent, how many
+    were dropped because a later message to the same channel and controller replaced them, and the longest time (in
+    seconds) that a message waited in the queue.
+    """
+    return {
+        "messages_sent": _output_writer.messages_sent,
+        "messages_coalesced": _output_writer.messages_coalesced,
+        "max_send_delay": _output_writer.max_send_delay,
+    }
+
+
 def _cleanup_port_connections():
+    _output_writer.stop()
     for midi_out_object in _port_connections.values():
         midi_out_object.delete()
     _port_connections.clear()
@@ -169,23 +292,43 @@ class SimpleRtMidiOut:
     a) make the calls a little easier and more specific, rather than all being send_message
     b) fail quietly. If rtmidi can't be loaded, then the user is alerted upon import, and
     from then on all rtmidi calls just don't do anything
+    c) optionally, hand messages off to a background thread to be sent, rather than sending them right away
+
+    :param output_device: name or port number of the midi output device to use
+    :param output_name: name to use when sending messages
+    :param queued: if True, messages are queued up and sent by a shared background thread (see _MIDIOutputWriter),
+        so that sending returns right away.
+
+    The last pitch bend and cc value sent on each channel is recorded in :code:`channel_state`, which is shared by
+    every SimpleRtMidiOut sending to the same port.
     """
 
-    def __init__(self, output_device=None, output_name=None):
+    def __init__(self, output_device=None, output_name=None, queued=False):
 
         if rtmidi is not None:
             port_number = output_device if isinstance(output_device, int) \
                 else get_port_number_of_midi_device(output_device, "output") if output_device is not None else None
             self.midiout = get_port_connection(port_number, output_name)
+            if queued:
+                queue = _output_writer.get_queue(self.midiout)
+                self.send_message = functools.partial(_output_writer.send, queue)
+            else:
+                self.send_message = self.midiout.send_message
+            # a device port is identified by its number, whereas each name opens a different virtual port
+            self.channel_state = _port_channel_states.setdefault(
+                ("device", port_number) if port_number is not None else ("virtual", output_name), {}
+            )
+        else:
+            self.channel_state = {}
 
     def note_on(self, chan, pitch, velocity):
         if rtmidi is not None:
-            self.midiout.send_message([0x90 + chan, pitch, velocity])
+            self.send_message([0x90 + chan, pitch, velocity])
 
     def note_off(self, chan, pitch):
         if rtmidi is not None:
-            self.midiout.send_message([0x80 + chan, pitch, 0])  # note on call of 0 velocity implementation
-            self.midiout.send_message([0x90 + chan, pitch, 0])  # note off call implementation
+            self.send_message([0x80 + chan, pitch, 0])  # note on call of 0 velocity implementation
+            self.send_message([0x90 + chan, pitch, 0])  # note off call implementation
 
     def pitch_bend(self, chan, value):
         assert 0 <= value < 16384
@@ -194,15 +337,18 @@ class SimpleRtMidiOut:
             # a most significant 7-bit number. These combine to form an integer from 0 to 16383
             lsb = value % 128
             msb = (value - lsb) // 128
-            self.midiout.send_message([0xE0 + chan, lsb, msb])
+            self.send_message([0xE0 + chan, lsb, msb])
+        self.channel_state[(chan, "pitch_bend")] = value
 
     def expression(self, chan, value):
         if rtmidi is not None:
-            self.midiout.send_message([0xB0 + chan, 11, value])
+            self.send_message([0xB0 + chan, 11, value])
+        self.channel_state[(chan, 11)] = value
 
     def cc(self, chan, cc_number, value):
         if rtmidi is not None:
-            self.midiout.send_message([0xB0 + chan, cc_number, value])
+            self.send_message([0xB0 + chan, cc_number, value])
+        self.channel_state[(chan, cc_number)] = value
 
 
 # -------------------------------------------- MIDI Channel Manager ----------------------------------------------
@@ -225,6 +371,12 @@ class MIDIChannelManager:
     """
     Keeps track of the states of a set of midi channels, and which notes are using them.
 
+    Everything needed to assign a note is kept indexed, so that each call takes roughly constant time regardless of
+    the number of channels and notes: a map from note id to channel, a map from each (pitch_bend, cc_values) setting
+    to the channels currently set that way, a heap of empty channels that are still ringing (ordered by when their last
+    note ended), and a heap of empty channels that are fully free (ordered by channel number). Heap entries are
+    invalidated lazily, using a per-channel version number that is bumped whenever the channel changes state.
+
     :param num_channels: number of channels to manage
     :param ring_time: Duration after a note has finished during which we try not to treat the channel as free, since
         there may still be reverb, etc.
@@ -235,68 +387,107 @@ class MIDIChannelManager:
 
         self.channels_info = [
             {
-                "active_notes": [],  # contains (note_id, pitch, start_time)
+                "active_notes": {},  # maps note_id to NoteInfo(note_id, pitch, start_time), in order of assignment
+                "active_pitches": Counter(),  # how many active notes are on each midi pitch
                 "last_note_end_time": float("-inf"),
                 "pitch_bend": 0,
                 "cc_values": {},
+                "setting_key": MIDIChannelManager._setting_key(0, {}),
             }
             for _ in range(num_channels)
         ]
         self.time_func = time_func
         self.ring_time = ring_time
 
+        self._note_channels = {}
+        self._channels_by_setting = {MIDIChannelManager._setting_key(0, {}): set(range(num_channels))}
+        self._channel_versions = [0] * num_channels
+        self._ringing_channels = []  # heap of (last_note_end_time, channel, version)
+        self._free_channels = [(i, 0) for i in range(num_channels)]  # heap of (channel, version)
+        self._last_time = float("-inf")
+
     @staticmethod
-    def _cc_matches(channel_cc_values: dict, note_cc_values: dict):
-        return channel_cc_values.keys() == note_cc_values.keys() and \
-               all(note_cc_values[i] == channel_cc_values[i] for i in channel_cc_values.keys())
+    def _setting_key(pitch_bend, cc_values):
+        # dictionaries aren't hashable, but a frozenset of their items is (and compares the same way)
+        return pitch_bend, cc_values if isinstance(cc_values, str) else frozenset(cc_values.items())
 
-    def _get_best_channel_for_fixed_note(self, midi_pitch, pitch_bend, cc_values):
+    def _get_best_channel_for_fixed_note(self, midi_pitch, setting_key):
         # pick out the channels that:
         #   1) match all pitch_bend and cc_values
         #   2) does not currently have a note using this MIDI pitch slot
-        matching_channels = [
-            (i, channel_info) for i, channel_info in enumerate(self.channels_info)
-            if pitch_bend == channel_info["pitch_bend"] and cc_values == channel_info["cc_values"]
-            and not any(midi_pitch == note.pitch for note in channel_info["active_notes"])
-        ]
-        if len(matching_channels) > 0:
-            # 3) preferentially, has a note already on it, since that reduces channel usage
-            # (note that False values for the key get sorted before True values. So the first ones will be
-            # the ones where len(index_and_channel_info[1]["active_notes"]) != 0)
-            matching_channels.sort(
-                key=lambda index_and_channel_info: len(index_and_channel_info[1]["active_notes"]) == 0
-            )
-            return matching_channels[0]
-        else:
-            return None
+        # and of those, preferentially one that has a note already on it, since that reduces channel usage
+        best_empty_channel = None
+        for i in sorted(self._channels_by_setting.get(setting_key, ())):
+            channel_info = self.channels_info[i]
+            if channel_info["active_pitches"][midi_pitch] > 0:
+                continue
+            if len(channel_info["active_notes"]) > 0:
+                return i, channel_info
+            if best_empty_channel is None:
+                best_empty_channel = i, channel_info
+        return best_empty_channel
 
     def _get_free_channel(self):
-        # in case we don't find any free channels that have been free for the full ring interval,
-        # keep track of which ringing-only channel has the oldest finished note
-        oldest_ringing_channel, oldest_finished_note_time = None, float("inf")
-        for i, channel_info in enumerate(self.channels_info):
-            if len(channel_info["active_notes"]) == 0:
-                if self.time_func() > channel_info["last_note_end_time"] + self.ring_time:
-                    # free channel with no notes recently finished during the ring interval. Go for it!
-                    return i, channel_info
-                else:
-                    # free channel, but a recently finished note is still within the ring interval
-                    if channel_info["last_note_end_time"] < oldest_finished_note_time:
-                        oldest_ringing_channel = i, channel_info
-                        oldest_finished_note_time = channel_info["last_note_end_time"]
-        # see if there's a channel that was free, but still ringing
-        if oldest_ringing_channel is not None:
-            return oldest_ringing_channel
+        now = self.time_func()
+        if now < self._last_time:
+            # time went backwards, so channels that we'd decided were done ringing may not be anymore
+            self._rebuild_free_channel_heaps()
+        self._last_time = now
+
+        # move any channels that have finished ringing over to the free heap
+        while len(self._ringing_channels) > 0:
+            end_time, i, version = self._ringing_channels[0]
+            if version != self._channel_versions[i]:
+                heapq.heappop(self._ringing_channels)
+            elif now > end_time + self.ring_time:
+                heapq.heappop(self._ringing_channels)
+                heapq.heappush(self._free_channels, (i, version))
+            else:
+                break
+
+        # prefer the lowest-numbered channel with no notes recently finished during the ring interval
+        while len(self._free_channels) > 0:
+            i, version = self._free_channels[0]
+            if version == self._channel_versions[i]:
+                return i, self.channels_info[i]
+            heapq.heappop(self._free_channels)
+
+        # otherwise, see if there's a channel that was free, but still ringing (the one that finished longest ago)
+        if len(self._ringing_channels) > 0:
+            _, i, _ = self._ringing_channels[0]
+            return i, self.channels_info[i]
+
         # no free channel!
         return None
 
+    def _rebuild_free_channel_heaps(self):
+        self._ringing_channels = [
+            (channel_info["last_note_end_time"], i, self._channel_versions[i])
+            for i, channel_info in enumerate(self.channels_info) if len(channel_info["active_notes"]) == 0
+        ]
+        heapq.heapify(self._ringing_channels)
+        self._free_channels = []
+
     def _get_best_channel_to_free(self):
-        # there's no free channel, so we have to pick the least bad option
-        channels_to_consider = [(i, channel_info) for i, channel_info in enumerate(self.channels_info)]
-        # sort the options according to the channel that started a note least recently
-        channels_to_consider.sort(
-            key=lambda channel_num_and_info: max(note.start_time for note in channel_num_and_info[1]["active_notes"]))
-        return channels_to_consider[0]
+        # there's no free channel, so we have to pick the least bad option: the channel that started a note least
+        # recently. This only happens when we've run out of channels, so it's not worth keeping indexed.
+        return min(
+            enumerate(self.channels_info),
+            key=lambda channel_num_and_info: max(note.start_time
+                                                 for note in channel_num_and_info[1]["active_notes"].values())
+        )
+
+    def _set_channel_setting(self, channel_num, pitch_bend, cc_values, new_key):
+        channel_info = self.channels_info[channel_num]
+        old_key = channel_info["setting_key"]
+        if new_key != old_key:
+            self._channels_by_setting[old_key].discard(channel_num)
+            if len(self._channels_by_setting[old_key]) == 0:
+                del self._channels_by_setting[old_key]
+            self._channels_by_setting.setdefault(new_key, set()).add(channel_num)
+        channel_info["pitch_bend"] = pitch_bend
+        channel_info["cc_values"] = cc_values
+        channel_info["setting_key"] = new_key
 
     def assign_note_to_channel(self, note_id, midi_pitch, pitch_bend, cc_values):
         """
@@ -310,12 +501,13 @@ class MIDIChannelManager:
         :param cc_values: a dictionary mapping cc_numbers to values (ranging from 0 to 1), or the string "variable" if
             any of the cc values change over the course of the note.
         """
+        setting_key = MIDIChannelManager._setting_key(pitch_bend, cc_values)
         if pitch_bend == "variable" or cc_values == "variable":
             # this is a note that will change pitch or cc in a dynamic way; it needs its own channel
             channel = self._get_free_channel()
         else:
             # this is a fixed note, so we try to stick it on a channel that is already being used
-            channel = self._get_best_channel_for_fixed_note(midi_pitch, pitch_bend, cc_values)
+            channel = self._get_best_channel_for_fixed_note(midi_pitch, setting_key)
             if channel is None:
                 # no good option that matches; just pick a free channel
                 channel = self._get_free_channel()
@@ -323,20 +515,28 @@ class MIDIChannelManager:
         if channel is None:
             # there's not even a free channel, so throw an error
             channel_to_free, channel_info = self._get_best_channel_to_free()
-            notes_to_free = list(self.channels_info[channel_to_free]["active_notes"])
+            notes_to_free = list(channel_info["active_notes"].values())
             raise NoFreeChannelError(channel_to_free, notes_to_free)
 
         channel_num, channel_info = channel
-        channel_info["active_notes"].append(NoteInfo(note_id, midi_pitch, self.time_func()))
-        channel_info["pitch_bend"] = pitch_bend
-        channel_info["cc_values"] = cc_values
+        if len(channel_info["active_notes"]) == 0:
+            # the channel is no longer empty, so any entries for it in the free/ringing heaps are now out of date
+            self._channel_versions[channel_num] += 1
+        channel_info["active_notes"][note_id] = NoteInfo(note_id, midi_pitch, self.time_func())
+        channel_info["active_pitches"][midi_pitch] += 1
+        self._note_channels[note_id] = channel_num
+        self._set_channel_setting(channel_num, pitch_bend, cc_values, setting_key)
         return channel_num
 
     def end_note(self, note_id):
-        for channel_info in self.channels_info:
-            for note in channel_info["active_notes"]:
-                if note.note_id == note_id:
-                    channel_info["active_notes"].remove(note)
-                    channel_info["last_note_end_time"] = self.time_func()
-                    return
-        raise ValueError(f"Cannot find note id {note_id} to end it.")
+        if note_id not in self._note_channels:
+            raise ValueError(f"Cannot find note id {note_id} to end it.")
+        channel_num = self._note_channels.pop(note_id)
+        channel_info = self.channels_info[channel_num]
+        note = channel_info["active_notes"].pop(note_id)
+        channel_info["active_pitches"][note.pitch] -= 1
+        channel_info["last_note_end_time"] = self.time_func()
+        if len(channel_info["active_notes"]) == 0:
+            self._channel_versions[channel_num] += 1
+            heapq.heappush(self._ringing_channels, (channel_info["last_note_end_time"], channel_num,
+                                                    self._channel_versions[channel_num]))
@@ -0,0 +1,233 @@
+"""
+Helpers for writing MusicXML to a file one piece at a time, rather than building up and serializing the whole
+document at once (see :func:`~scamp.score.Score.write_music_xml`). Each piece is written exactly as pymusicxml would
+have written it as part of the whole document, both with and without pretty printing, so that the two routes produce
+the same file. Also home to the :class:`MusicXMLCache`, which stores these pieces so that they can be reused when a
+score is exported again.
+"""
+
+#  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
+#  This file is part of SCAMP (Suite for Computer-Assisted Music in Python)                      #
+#  Copyright © 2020 Marc Evanstein <marc@marcevanstein.com>.                                     #
+#                                                                                                #
+#  This program is free software: you can redistribute it and/or modify it under the terms of    #
+#  the GNU General Public License as published by the Free Software Foundation, either version   #
+#  3 of the License, or (at your option) any later version.                                      #
+#                                                                                                #
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;     #
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.     #
+#  See the GNU General Public License for more details.                                          #
+#                                                                                                #
+#  You should have received a copy of the GNU General Public License along with this program.    #
+#  If not, see <http://www.gnu.org/licenses/>.                                                   #
+#  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
+
+from __future__ import annotations
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import TextIO, Any
+from xml.dom import minidom
+from xml.etree import ElementTree
+from xml.sax.saxutils import quoteattr
+from pymusicxml import Measure
+from pymusicxml.score_components import StartNumberedSpanner, Notation
+from .utilities import SavesToJSON, CacheInfo
+
+
+# the same headers that pymusicxml's to_xml puts at the top of a document
+_HEADER = '<?xml version="1.0" encoding="UTF-8"?><!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD ' \
+          'MusicXML 3.0 Partwise//EN" "http://www.musicxml.org/dtds/partwise.dtd">'
+_PRETTY_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD ' \
+                 'MusicXML 3.0 Partwise//EN" "http://www.musicxml.org/dtds/partwise.dtd">\n'
+
+
+def write_header(file: TextIO, pretty_print: bool) -> None:
+    file.write(_PRETTY_HEADER if pretty_print else _HEADER)
+
+
+def write_start_tag(file: TextIO, tag: str, attributes: dict, depth: int, pretty_print: bool) -> None:
+    """
+    Writes the opening tag of an element whose children are going to be written separately.
+
+    :param depth: how many elements this one is nested inside of (which determines its indentation if pretty printing)
+    """
+    start_tag = "<{}{}>".format(tag, "".join(" {}={}".format(key, quoteattr(value))
+                                             for key, value in attributes.items()))
+    file.write("\t" * depth + start_tag + "\n" if pretty_print else start_tag)
+
+
+def write_end_tag(file: TextIO, tag: str, depth: int, pretty_print: bool) -> None:
+    file.write("\t" * depth + "</{}>\n".format(tag) if pretty_print else "</{}>".format(tag))
+
+
+def write_element(file: TextIO, element: ElementTree.Element, depth: int, pretty_print: bool) -> None:
+    """
+    Writes a complete element (and everything inside of it).
+
+    :param depth: how many elements this one is nested inside of (which determines its indentation if pretty printing)
+    """
+    if pretty_print:
+        # this is how pymusicxml pretty prints, only starting at the given depth
+        minidom.parseString(ElementTree.tostring(element, "utf-8")).documentElement.writexml(
+            file, "\t" * depth, "\t", "\n")
+    else:
+        file.write(ElementTree.tostring(element, "unicode"))
+
+
+class SpannerNumberer:
+    """
+    Renumbers the spanners (slurs, brackets, etc.) in a part so that they are integers from 1-6, as MusicXML requires,
+    the same way that :func:`pymusicxml.Part._validate_spanner_numbers` does, but one measure at a time: measures
+    have to be passed to :func:`renumber_spanners` in order, and the spanners that are still open at the end of one
+    measure carry on into the next.
+    """
+
+    def __init__(self):
+        # for each type of spanner, a dict of which input labels are associated with which output numbers
+        self.input_to_output_numbers = {start_type: {} for start_type in StartNumberedSpanner.__subclasses__()}
+
+    def get_state(self) -> list:
+        """
+        Returns the spanners that are currently open, in a JSON-friendly form that can be passed to :func:`set_state`.
+        """
+        return [[start_type.__name__, [[label, list(output_numbers)] for label, output_numbers in numbers.items()]]
+                for start_type, numbers in self.input_to_output_numbers.items() if len(numbers) > 0]
+
+    def set_state(self, state: list) -> None:
+        """
+        Restores the open spanners from a state returned by :func:`get_state`.
+        """
+        for numbers in self.input_to_output_numbers.values():
+            numbers.clear()
+        start_types_by_name = {start_type.__name__: start_type for start_type in self.input_to_output_numbers}
+        for start_type_name, numbers in state:
+            self.input_to_output_numbers[start_types_by_name[start_type_name]].update(
+                (label, list(output_numbers)) for label, output_numbers in numbers)
+
+    def renumber_spanners(self, measure: Measure) -> None:
+        for start_type, input_to_output_numbers in self.input_to_output_numbers.items():
+            stop_type, mid_types = start_type.STOP_TYPE, start_type.MID_TYPES
+            iterator = measure.iter_notations() if issubclass(start_type, Notation) else measure.iter_directions()
+
+            for possible_spanner, _ in iterator:
+                if isinstance(possible_spanner, start_type):
+                    available_numbers = [x for x in range(1, 7) if x not in sum(input_to_output_numbers.values(), [])]
+                    if possible_spanner.label in available_numbers:
+                        input_to_output_numbers.setdefault(possible_spanner.label, []).append(possible_spanner.label)
+                    elif len(available_numbers) > 0:
+                        output_num = available_numbers[0]
+                        input_to_output_numbers.setdefault(possible_spanner.label, []).append(output_num)
+                        possible_spanner.label = output_num
+                    else:
+                        logging.warning("Ran out of available id numbers for {}; too many simultaneous."
+                                        .format(start_type))
+                elif isinstance(possible_spanner, mid_types):
+                    if possible_spanner.label in input_to_output_numbers:
+                        possible_spanner.label = input_to_output_numbers[possible_spanner.label][0]
+                    else:
+                        logging.warning("{} has no corresponding {}.".format(type(possible_spanner).__name__,
+                                                                             start_type.__name__))
+                elif isinstance(possible_spanner, stop_type):
+                    if possible_spanner.label in input_to_output_numbers:
+                        output_num = input_to_output_numbers[possible_spanner.label].pop(0)
+                        if len(input_to_output_numbers[possible_spanner.label]) == 0:
+                            del input_to_output_numbers[possible_spanner.label]
+                        possible_spanner.label = output_num
+                    else:
+                        logging.warning("{} has no corresponding {}.".format(stop_type.__name__,
+                                                                             start_type.__name__))
+
+
+def _key_json_default(obj):
+    # SCAMP objects are keyed by their JSON representation; anything else (e.g. a Fraction) by its repr
+    return SavesToJSON._encoder_default(obj) if hasattr(obj, "_to_dict") else repr(obj)
+
+
+class MusicXMLCache:
+    """
+    A cache of the MusicXML for measures that have already been exported, for re-exporting a score after changing
+    only a few of its measures. Pass the same cache to each call of :func:`~scamp.score.Score.export_music_xml` or
+    :func:`~scamp.score.Score.write_music_xml`. Each measure is looked up by a hash of everything that goes into its
+    MusicXML: its contents, its number, its tempo marks and barline, the spanners still open from earlier measures and
+    the engraving settings. Only measures whose hash is new get converted and rendered; the MusicXML of the rest is
+    copied from the cache. (Measures joined by a glissando across the barline are cached together, as one entry.)
+
+    :param max_size: the maximum number of entries to keep in memory; once there are more, the least recently used
+        are dropped. None means no limit.
+    :param directory: if given, each entry is also saved as a file in this directory, and entries not found in
+        memory are looked for there, so that the cache carries over between sessions. Files saved by a different
+        version of SCAMP or pymusicxml are ignored.
+    :ivar max_size: the maximum number of entries to keep in memory
+    :ivar directory: the directory in which entries are saved, if any
+    """
+
+    def __init__(self, max_size: int | None = 10000, directory: str = None):
+        self.max_size = max_size
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._versions = [importlib.metadata.version("scamp"), importlib.metadata.version("pymusicxml")]
+        else:
+            self._versions = None
+
+    def key(self, key_data: Any) -> str:
+        """
+        Hashes the given data (which can contain anything that saves to JSON, e.g. NoteProperties) into a key.
+        """
+        return hashlib.sha1(json.dumps([self._versions, key_data], default=_key_json_default,
+                                       sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[str, list] | None:
+        """
+        Returns the (MusicXML, spanner state) saved under the given key, or None if there is none.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._entries[key]
+        if self.directory is not None and os.path.exists(self._path(key)):
+            with open(self._path(key), "r") as file:
+                entry = tuple(json.load(file))
+            self._add(key, entry)
+            self._stats["hits"] += 1
+            return entry
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, xml: str, spanner_state: list) -> None:
+        """
+        Saves the MusicXML of a measure (or run of measures), along with the state of the spanners at its end.
+        """
+        self._add(key, (xml, spanner_state))
+        if self.directory is not None:
+            with open(self._path(key), "w") as file:
+                json.dump([xml, spanner_state], file)
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Returns the (hits, misses, evictions, maxsize, currsize) of the in-memory part of this cache.
+        """
+        return CacheInfo(self._stats["hits"], self._stats["misses"], self._stats["evictions"],
+                         self.max_size, len(self._entries))
+
+    def clear(self) -> None:
+        """
+        Empties the in-memory part of this cache and resets its statistics. (Files in the directory are left alone.)
+        """
+        self._entries.clear()
+        self._stats.update(hits=0, misses=0, evictions=0)
+
+    def _add(self, key, entry):
+        self._entries[key] = entry
+        if self.max_size is not None and len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
@@ -27,6 +27,7 @@ import clockblocks
 import threading
 import time
 import wave
+import weakref
 
 
 # ------------------------------------------ Synth that records output -----------------------------------------------
@@ -150,8 +151,108 @@ if fluidsynth is not None:
     PlayAndRecSynth.cc = _record_as_well(PlayAndRecSynth.cc)
     PlayAndRecSynth.pitch_bend = _record_as_well(PlayAndRecSynth.pitch_bend)
 
+
+    class OfflineRenderSynth(fluidsynth.Synth):
+
+        """
+        A subclass of :class:`fluidsynth.Synth` that never starts an audio driver. Instead, right before each call
+        that changes the state of the synth, it pulls samples (via `get_samples`) up to the current time, as given
+        by timer_func, and writes them to a wave file. When timer_func reports the scheduled (score) time of each
+        event, as the master clock does, the output is sample-accurate and does not depend on how fast the clock
+        system actually runs, so it can be rendered in fast-forward.
+
+        :param gain: see :class:`fluidsynth.Synth`
+        :param samplerate: see :class:`fluidsynth.Synth`
+        :param channels: see :class:`fluidsynth.Synth`
+        :param timer_func: function used to measure what time it is
+        :param time_range: the time range that we want to save of the output
+        :param block_size: maximum number of samples to pull from the synth at once
+        """
+
+        def __init__(self, gain=0.2, samplerate=44100, channels=256, timer_func=time.time,
+                     time_range=(0, float("inf")), block_size=4096, **kwargs):
+            super().__init__(gain, samplerate, channels, **kwargs)
+            self.timer_func = timer_func
+            self.samplerate = samplerate
+            self.sample_range = int(time_range[0] * samplerate), \
+                int(time_range[1] * samplerate) if time_range[1] != float("inf") else float("inf")
+            self.block_size = block_size
+            self.current_sample = 0
+            self.wave_file = None
+
+        def start(self, driver=None, device=None, midi_driver=None):
+            # no audio driver: samples are only ever pulled out by render_up_to_time
+            pass
+
+        def start_rendering(self, file_path):
+            """
+            Opens the wave file that rendered samples are written to. Samples rendered before this is called (for
+            instance, silence while instruments are set up) are simply discarded.
+
+            :param file_path: the file to save rendered output to
+            """
+            self.wave_file = wave.open(file_path, 'wb')
+            self.wave_file.setnchannels(2)
+            self.wave_file.setsampwidth(2)
+            self.wave_file.setframerate(self.samplerate)
+
+        def render_up_to_time(self, t):
+            """
+            Pulls samples from the synth, block by block, up to the given time, writing those that fall within
+            the sample range to the wave file (if rendering has started).
+
+            :param t: the time (in seconds) to render up to
+            """
+            target_sample = int(t * self.samplerate)
+            while self.current_sample < target_sample:
+                num_samples = min(self.block_size, target_sample - self.current_sample)
+                new_samps = self.get_samples(num_samples).reshape(-1, 2)
+                start_sample, end_sample = self.current_sample, self.current_sample + num_samples
+                self.current_sample = end_sample
+                if self.wave_file is None or end_sample <= self.sample_range[0] \
+                        or start_sample >= self.sample_range[1]:
+                    continue
+                first = max(0, self.sample_range[0] - start_sample)
+                last = num_samples - max(0, end_sample - self.sample_range[1])
+                self.wave_file.writeframes(new_samps[first:last].tobytes())
+
+        def stop_rendering(self, tail_length=1.0):
+            """
+            Renders up to the current time, plus a little extra audio (for reverb tails and such), and closes the
+            wave file.
+
+            :param tail_length: how many seconds past the current time to render
+            """
+            if self.wave_file is None:
+                return
+            with synth_lock:
+                self.render_up_to_time(max(self.timer_func(), self.current_sample / self.samplerate) + tail_length)
+            self.wave_file.close()
+            self.wave_file = None
+
+
+    def _render_up_to_now(f):
+        """
+        Decorator that is used to wrap the various Synth functions of an OfflineRenderSynth, so that all samples
+        up to the current time are rendered before the call changes the state of the synth.
+        """
+        @functools.wraps(f)
+        def wrapped_method(self, *args, **kwargs):
+            with synth_lock:
+                self.render_up_to_time(self.timer_func())
+                return f(self, *args, **kwargs)
+        return wrapped_method
+
+
+    OfflineRenderSynth.program_select = _render_up_to_now(OfflineRenderSynth.program_select)
+    OfflineRenderSynth.noteon = _render_up_to_now(OfflineRenderSynth.noteon)
+    OfflineRenderSynth.noteoff = _render_up_to_now(OfflineRenderSynth.noteoff)
+    OfflineRenderSynth.cc = _render_up_to_now(OfflineRenderSynth.cc)
+    OfflineRenderSynth.pitch_bend = _render_up_to_now(OfflineRenderSynth.pitch_bend)
+
 else:
     PlayAndRecSynth = None
+    OfflineRenderSynth = None
 
 # ------------------------------------------ Main SoundfontHost classes ----------------------------------------------
 
@@ -165,7 +266,9 @@ class SoundfontHost(SavesToJSON):
         It can be called upon to add or remove instruments from that synth
 
         :param soundfonts: one or several soundfonts to be loaded
-        :param audio_driver: the audio driver to use
+        :param audio_driver: the audio driver to use. The special value "offline" starts no audio driver at all;
+            instead, audio is only rendered to a file, in score time, by calling :func:`start_rendering` and
+            :func:`stop_rendering` (see :func:`~scamp.session.Session.render_offline`).
         :param recording_file_path: if not None, save the playback to a .wav file with this path
         :param recording_time_range: the time range of playback to save (defaults to all)
         """
@@ -177,19 +280,30 @@ class SoundfontHost(SavesToJSON):
 
         self.audio_driver = playback_settings.default_audio_driver if audio_driver == "default" else audio_driver
 
-        if recording_file_path:
-            clock = clockblocks.current_clock()
-
-            master = clock.master if clock is not None else None
-
-            def _timer_func():
-                # Runs on whichever thread issued the MIDI call (see _record_as_well), and every such thread is
-                # inside the clock system: a clock thread woken by its own event (note-ons/offs), or the
-                # scheduler thread running a leaf action (the cc / pitch-bend of an envelope — see
-                # NoteParameterAnimation.run). OSC and MIDI listener callbacks also qualify; they run under
-                # `hold_scheduler`. In all of these the committed time is the current event's
-                # scheduled time, so sample offsets track the score rather than OS jitter.
-                return master.time() if master is not None else time.time()
+        clock = clockblocks.current_clock()
+
+        master = clock.master if clock is not None else None
+
+        def _timer_func():
+            # Runs on whichever thread issued the MIDI call (see _record_as_well), and every such thread is
+            # inside the clock system: a clock thread woken by its own event (note-ons/offs), or the
+            # scheduler thread running a leaf action (the cc / pitch-bend of an envelope — see
+            # NoteParameterAnimation.run). OSC and MIDI listener callbacks also qualify; they run under
+            # `hold_scheduler`. In all of these the committed time is the current event's
+            # scheduled time, so sample offsets track the score rather than OS jitter.
+            return master.time() if master is not None else time.time()
+
+        self.timer_func = _timer_func
+
+        if self.audio_driver == "offline":
+            if master is None:
+                raise ValueError("Offline rendering must be set up from within a clock (typically a Session).")
+            # an offline host is kept for as long as its master clock is around (see SoundfontPlaybackImplementation),
+            # so its timer only refers to the master clock weakly, so as not to keep it around itself
+            master_ref = weakref.ref(master)
+            self.timer_func = lambda: master_ref().time()
+            self.synth = OfflineRenderSynth(timer_func=self.timer_func, time_range=recording_time_range)
+        elif recording_file_path:
             self.synth = PlayAndRecSynth(recording_file_path,
                                          timer_func=_timer_func,
                                          time_range=recording_time_range)
@@ -197,6 +311,10 @@ class SoundfontHost(SavesToJSON):
             self.synth = fluidsynth.Synth()
 
         self.synth.start(driver=self.audio_driver)
+        # created on demand by get_sequenced_synth
+        self.sequencer = None
+        self.sequencer_synth_id = None
+        self.sequencer_tick_offset = None
 
         self.used_channels = 0  # how many channels have we already assigned to various instruments
 
@@ -206,13 +324,68 @@ class SoundfontHost(SavesToJSON):
         for soundfont in soundfonts:
             self.load_soundfont(soundfont)
 
-    def add_instrument(self, num_channels, bank_and_preset, soundfont=None):
+    def is_offline(self) -> bool:
+        """
+        Whether this host renders audio offline to a file, rather than playing it through an audio driver.
+        """
+        return self.audio_driver == "offline"
+
+    def start_rendering(self, file_path):
+        """
+        Starts writing the audio rendered by this (offline) host to the given wave file.
+
+        :param file_path: the file to save rendered output to
+        """
+        if not self.is_offline():
+            raise ValueError("Only a SoundfontHost using the \"offline\" audio driver can render to a file.")
+        self.synth.start_rendering(file_path)
+
+    def stop_rendering(self, tail_length=1.0):
+        """
+        Finishes writing the audio rendered by this (offline) host, including a tail for reverb and such.
+
+        :param tail_length: how many seconds of audio to render past the current time
+        """
+        if not self.is_offline():
+            raise ValueError("Only a SoundfontHost using the \"offline\" audio driver can render to a file.")
+        self.synth.stop_rendering(tail_length)
+
+    def get_sequenced_synth(self, latency):
+        """
+        Returns a stand-in for this host's synth that, rather than acting immediately, hands each event to the
+        FluidSynth sequencer, timestamped with the current (scheduled) clock time plus the given latency. The
+        sequencer is driven by the synth's own sample clock, so the resulting timing is sample-accurate regardless of
+        how late the calling Python thread happened to wake up, as long as it wakes up within the latency.
+        An offline host is already sample-accurate, so in that case the synth itself is returned. So is a host that is
+        recording its output to a file, since events played by the sequencer would bypass the recording.
+
+        :param latency: how far ahead (in seconds) of the clock time to schedule events
+        :return: an object with the same noteon, noteoff, pitch_bend and cc methods as the synth
+        """
+        if self.is_offline():
+            return self.synth
+        if isinstance(self.synth, PlayAndRecSynth):
+            logging.warning("The FluidSynth sequencer cannot be used while recording soundfont output to a file; "
+                            "events will be sent to the synth immediately instead.")
+            return self.synth
+        if self.sequencer is None:
+            # time scale of one tick per sample, with the sequencer advanced by the synth as it renders (rather than
+            # by the system timer)
+            self.sequencer = fluidsynth.Sequencer(time_scale=self.synth.get_setting("synth.sample-rate"),
+                                                  use_system_timer=False)
+            self.sequencer_synth_id = self.sequencer.register_fluidsynth(self.synth)
+            # tick of the sequencer corresponding to time zero on the clock
+            self.sequencer_tick_offset = self.sequencer.get_tick() - \
+                self.timer_func() * self.synth.get_setting("synth.sample-rate")
+        return _SequencedSynth(self, latency)
+
+    def add_instrument(self, num_channels, bank_and_preset, soundfont=None, sequencer_latency=None):
         if soundfont is None:
             # if no soundfont is specified, use the first soundfont added
             soundfont_id = next(iter(self.soundfont_ids.items()))
         else:
             soundfont_id = self.soundfont_ids[soundfont]
-        return SoundfontInstrument(self, num_channels, bank_and_preset, soundfont_id)
+        return SoundfontInstrument(self, num_channels, bank_and_preset, soundfont_id, sequencer_latency)
 
     def load_soundfont(self, soundfont):
         soundfont_path = resolve_soundfont(soundfont)
@@ -233,9 +406,51 @@ class SoundfontHost(SavesToJSON):
         return cls(**json_dict)
 
 
+class _SequencedSynth:
+
+    def __init__(self, soundfont_host, latency):
+        """
+        Drop-in replacement for a SoundfontHost's synth (as far as a SoundfontInstrument is concerned) that schedules
+        every call on the host's FluidSynth sequencer at the current clock time plus the given latency.
+
+        :param soundfont_host: a SoundfontHost whose sequencer has been set up
+        :param latency: how far ahead (in seconds) of the clock time to schedule events
+        """
+        self.soundfont_host = soundfont_host
+        self.sequencer = soundfont_host.sequencer
+        self.synth_id = soundfont_host.sequencer_synth_id
+        self.sample_rate = soundfont_host.synth.get_setting("synth.sample-rate")
+        self.latency = latency
+
+    def _current_tick(self):
+        tick = int(round(self.soundfont_host.sequencer_tick_offset +
+                         (self.soundfont_host.timer_func() + self.latency) * self.sample_rate))
+        # if we're running late, the best we can do is to have the event happen right away
+        return max(tick, self.sequencer.get_tick())
+
+    def noteon(self, chan, key, vel):
+        if vel == 0:
+            self.sequencer.note_off(self._current_tick(), chan, key, dest=self.synth_id)
+        else:
+            self.sequencer.note_on(self._current_tick(), chan, key, vel, dest=self.synth_id)
+
+    def noteoff(self, chan, key):
+        self.sequencer.note_off(self._current_tick(), chan, key, dest=self.synth_id)
+
+    def pitch_bend(self, chan, val):
+        self.sequencer.pitch_bend(self._current_tick(), chan, val, dest=self.synth_id)
+
+    def cc(self, chan, ctrl, val):
+        self.sequencer.control_change(self._current_tick(), chan, ctrl, val, dest=self.synth_id)
+
+    def program_select(self, chan, sfid, bank, preset):
+        # program changes aren't time-critical, so these just happen immediately
+        return self.soundfont_host.synth.program_select(chan, sfid, bank, preset)
+
+
 class SoundfontInstrument:
 
-    def __init__(self, soundfont_host, num_channels, bank_and_preset, soundfont_id):
+    def __init__(self, soundfont_host, num_channels, bank_and_preset, soundfont_id, sequencer_latency=None):
         """
         A SoundfontInstrument represents all the channels in the host dedicated to the same instrument
         On initialization, it loads the appropriate preset from the correct soundfont into those channels
@@ -244,10 +459,15 @@ class SoundfontInstrument:
         :param num_channels: how many channels this instrument gets
         :param bank_and_preset: tuple consisting of the bank and preset to use
         :param soundfont_id: the fluidsynth id of the soundfont this instrument uses
+        :param sequencer_latency: if None, events are sent to the synth immediately. Otherwise, they are scheduled on
+            the FluidSynth sequencer this many seconds after the clock time at which they occur, which makes their
+            timing sample-accurate (see :func:`SoundfontHost.get_sequenced_synth`).
         """
 
         assert isinstance(soundfont_host, SoundfontHost)
         self.soundfont_host = soundfont_host
+        self.synth = soundfont_host.synth if sequencer_latency is None \
+            else soundfont_host.get_sequenced_synth(sequencer_latency)
         self.channels = list(range(self.soundfont_host.used_channels, self.soundfont_host.used_channels + num_channels))
         self.num_channels = num_channels
         self.soundfont_host.used_channels += num_channels
@@ -258,17 +478,17 @@ class SoundfontInstrument:
 
     def set_to_preset(self, bank, preset):
         for i in self.channels:
-            self.soundfont_host.synth.program_select(i, self.soundfont_id, bank, preset)
+            self.synth.program_select(i, self.soundfont_id, bank, preset)
 
     def note_on(self, chan, pitch, volume_from_0_to_1):
         velocity = int(playback_settings.soundfont_volume_to_velocity_curve.value_at(volume_from_0_to_1))
         absolute_channel = self.channels[chan]
-        self.soundfont_host.synth.noteon(absolute_channel, pitch, velocity)
+        self.synth.noteon(absolute_channel, pitch, velocity)
 
     def note_off(self, chan, pitch):
         absolute_channel = self.channels[chan]
-        self.soundfont_host.synth.noteon(absolute_channel, pitch, 0)  # note on call of 0 velocity implementation
-        self.soundfont_host.synth.noteoff(absolute_channel, pitch)  # note off call implementation
+        self.synth.noteon(absolute_channel, pitch, 0)  # note on call of 0 velocity implementation
+        self.synth.noteoff(absolute_channel, pitch)  # note off call implementation
 
     def pitch_bend(self, chan, bend_in_semitones):
         directional_bend_value = int(bend_in_semitones / self.max_pitch_bend * 8192)
@@ -283,7 +503,7 @@ class SoundfontInstrument:
         directional_bend_value = max(-8192, min(directional_bend_value, 8191))
         absolute_channel = self.channels[chan]
         # for some reason, pyFluidSynth takes a value from -8192 to 8191 and then adds 8192 to it
-        self.soundfont_host.synth.pitch_bend(absolute_channel, directional_bend_value)
+        self.synth.pitch_bend(absolute_channel, directional_bend_value)
 
     def set_max_pitch_bend(self, max_bend_in_semitones):
         """
@@ -302,17 +522,17 @@ class SoundfontInstrument:
 
         for chan in range(self.num_channels):
             absolute_channel = self.channels[chan]
-            self.soundfont_host.synth.cc(absolute_channel, 101, 0)
-            self.soundfont_host.synth.cc(absolute_channel, 100, 0)
-            self.soundfont_host.synth.cc(absolute_channel, 6, max_bend_in_semitones)
-            self.soundfont_host.synth.cc(absolute_channel, 100, 127)
+            self.synth.cc(absolute_channel, 101, 0)
+            self.synth.cc(absolute_channel, 100, 0)
+            self.synth.cc(absolute_channel, 6, max_bend_in_semitones)
+            self.synth.cc(absolute_channel, 100, 127)
 
         self.max_pitch_bend = max_bend_in_semitones
 
     def cc(self, chan, cc_number, value_from_0_to_1):
         value = max(0, min(127, int(value_from_0_to_1 * 127)))
         absolute_channel = self.channels[chan]
-        self.soundfont_host.synth.cc(absolute_channel, cc_number, value)
+        self.synth.cc(absolute_channel, cc_number, value)
 
 
 # ------------------------------------------- Utilities ------------------------------------------------
@@ -0,0 +1,122 @@
+"""
+Vectorized conversion between beats and times for a :class:`~clockblocks.tempo_envelope.TempoEnvelope`. These are
+the array equivalents of `TempoEnvelope.time_at_beat` and `TempoEnvelope.beat_at_time`, which work out the time
+elapsed by integrating the beat length over each segment in closed form, so that whole performances can be remapped
+from one tempo to another at once (see :func:`~scamp.performance.Performance.remap_to_tempo`).
+(This is an implementation detail.)
+"""
+
+
+#  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
+#  This file is part of SCAMP (Suite for Computer-Assisted Music in Python)                      #
+#  Copyright © 2020 Marc Evanstein <marc@marcevanstein.com>.                                     #
+#                                                                                                #
+#  This program is free software: you can redistribute it and/or modify it under the terms of    #
+#  the GNU General Public License as published by the Free Software Foundation, either version   #
+#  3 of the License, or (at your option) any later version.                                      #
+#                                                                                                #
+#  This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;     #
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.     #
+#  See the GNU General Public License for more details.                                          #
+#                                                                                                #
+#  You should have received a copy of the GNU General Public License along with this program.    #
+#  If not, see <http://www.gnu.org/licenses/>.                                                   #
+#  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
+
+from __future__ import annotations
+import numpy as np
+from ._envelope_sampling import segment_values
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from clockblocks import TempoEnvelope
+
+
+def segment_integrals(progress, durations, start_levels, end_levels, curve_shapes):
+    """
+    Vectorized integral of envelope segments from their start up to the given normalized progress (0 to 1) through
+    them. (This is the antiderivative of the formula in :func:`~scamp._envelope_sampling.segment_values`.) All
+    arguments can be NumPy arrays or scalars.
+    """
+    progress, curve_shapes = np.asarray(progress, dtype=float), np.asarray(curve_shapes, dtype=float)
+    linear = np.abs(curve_shapes) < 1e-6
+    # avoid dividing by zero for the linear segments (which get overwritten below anyway)
+    safe_shapes = np.where(linear, 1, curve_shapes)
+    curved_part = (np.expm1(safe_shapes * progress) / safe_shapes - progress) / np.expm1(safe_shapes)
+    return durations * (start_levels * progress +
+                        (end_levels - start_levels) * np.where(linear, progress ** 2 / 2, curved_part))
+
+
+def _segment_table(tempo_envelope):
+    """
+    Returns arrays of the start beat, duration, start level, end level and curve shape of each segment of the
+    envelope, along with the time elapsed at the start of each segment.
+    """
+    segments = tempo_envelope.segments
+    starts = np.array([segment.start_time for segment in segments], dtype=float)
+    durations = np.array([segment.end_time - segment.start_time for segment in segments], dtype=float)
+    start_levels = np.array([segment.start_level for segment in segments], dtype=float)
+    end_levels = np.array([segment.end_level for segment in segments], dtype=float)
+    curve_shapes = np.array([segment.curve_shape for segment in segments], dtype=float)
+    segment_times = segment_integrals(1, durations, start_levels, end_levels, curve_shapes)
+    # (before the envelope starts, time passes at the rate of its start level)
+    start_times = starts[0] * start_levels[0] + np.concatenate(([0], np.cumsum(segment_times)[:-1]))
+    return starts, durations, start_levels, end_levels, curve_shapes, start_times
+
+
+def times_at_beats(tempo_envelope: TempoEnvelope, beats) -> np.ndarray:
+    """
+    Equivalent to calling `tempo_envelope.time_at_beat` on each of the given beats.
+
+    :param tempo_envelope: the TempoEnvelope
+    :param beats: array of beats
+    :return: array of the corresponding times
+    """
+    beats = np.asarray(beats, dtype=float)
+    starts, durations, start_levels, end_levels, curve_shapes, start_times = _segment_table(tempo_envelope)
+    i = np.clip(np.searchsorted(starts, beats, side="right") - 1, 0, len(starts) - 1)
+    progress = np.clip((beats - starts[i]) / np.where(durations[i] > 0, durations[i], 1), 0, 1)
+    times = start_times[i] + segment_integrals(progress, durations[i], start_levels[i], end_levels[i],
+                                               curve_shapes[i])
+    # beyond either end of the envelope, time passes at the rate of its first or last level
+    times = np.where(beats < starts[0], start_times[0] + (beats - starts[0]) * start_levels[0], times)
+    end_beat, end_time = starts[-1] + durations[-1], start_times[-1] + segment_integrals(
+        1, durations[-1], start_levels[-1], end_levels[-1], curve_shapes[-1])
+    return np.where(beats > end_beat, end_time + (beats - end_beat) * end_levels[-1], times)
+
+
+def beats_at_times(tempo_envelope: TempoEnvelope, times, max_iterations: int = 50) -> np.ndarray:
+    """
+    Equivalent to calling `tempo_envelope.beat_at_time` on each of the given times. Linear segments are inverted
+    exactly; curved segments are inverted by Newton's method, starting from the linear solution.
+
+    :param tempo_envelope: the TempoEnvelope
+    :param times: array of times
+    :param max_iterations: maximum number of iterations of Newton's method for curved segments
+    :return: array of the corresponding beats
+    """
+    times = np.asarray(times, dtype=float)
+    starts, durations, start_levels, end_levels, curve_shapes, start_times = _segment_table(tempo_envelope)
+    i = np.clip(np.searchsorted(start_times, times, side="right") - 1, 0, len(starts) - 1)
+    duration, start_level, end_level, curve_shape = durations[i], start_levels[i], end_levels[i], curve_shapes[i]
+    safe_duration = np.where(duration > 0, duration, 1)
+    normalized_time = (times - start_times[i]) / safe_duration
+
+    # solve start_level * x + (end_level - start_level) * x^2 / 2 = normalized_time for the progress x
+    level_change = end_level - start_level
+    progress = 2 * normalized_time / (start_level + np.sqrt(np.maximum(
+        start_level ** 2 + 2 * level_change * normalized_time, 0)))
+    curved = np.abs(curve_shape) >= 1e-6
+    for _ in range(max_iterations if np.any(curved) else 0):
+        error = segment_integrals(progress, 1, start_level, end_level, curve_shape) - normalized_time
+        progress = np.where(curved, np.clip(
+            progress - error / segment_values(progress, start_level, end_level, curve_shape), 0, 1), progress)
+        if np.all(np.abs(error[curved]) < 1e-12):
+            break
+    beats = starts[i] + np.clip(progress, 0, 1) * duration
+
+    # beyond either end of the envelope, beats pass at the rate of its first or last level
+    beats = np.where(times < start_times[0], starts[0] + (times - start_times[0]) / start_levels[0], beats)
+    end_beat, end_time = starts[-1] + durations[-1], start_times[-1] + segment_integrals(
+        1, durations[-1], start_levels[-1], end_levels[-1], curve_shapes[-1])
+    return np.where(times > end_time, end_beat + (times - end_time) / end_levels[-1], beats)
@@ -476,6 +476,17 @@ fluid_event_noteoff = cfunc('fluid_event_noteoff', None,
                             ('channel', c_int, 1),
                             ('key', c_short, 1))
 
+fluid_event_pitch_bend = cfunc('fluid_event_pitch_bend', None,
+                               ('evt', c_void_p, 1),
+                               ('channel', c_int, 1),
+                               ('val', c_int, 1))
+
+fluid_event_control_change = cfunc('fluid_event_control_change', None,
+                                   ('evt', c_void_p, 1),
+                                   ('channel', c_int, 1),
+                                   ('control', c_short, 1),
+                                   ('val', c_int, 1))
+
 delete_fluid_event = cfunc('delete_fluid_event', None,
                            ('evt', c_void_p, 1))
 
@@ -1052,6 +1063,19 @@ class Sequencer:
         self._schedule_event(evt, time, absolute)
         delete_fluid_event(evt)
 
+    def pitch_bend(self, time, channel, val, source=-1, dest=-1, absolute=True):
+        """Schedule a pitch bend; as with Synth.pitch_bend, val ranges from -8192 to 8191"""
+        evt = self._create_event(source, dest)
+        fluid_event_pitch_bend(evt, channel, val + 8192)
+        self._schedule_event(evt, time, absolute)
+        delete_fluid_event(evt)
+
+    def control_change(self, time, channel, control, val, source=-1, dest=-1, absolute=True):
+        evt = self._create_event(source, dest)
+        fluid_event_control_change(evt, channel, control, val)
+        self._schedule_event(evt, time, absolute)
+        delete_fluid_event(evt)
+
     def timer(self, time, data=None, source=-1, dest=-1, absolute=True):
         evt = self._create_event(source, dest)
         fluid_event_timer(evt, data)
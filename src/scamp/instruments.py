@@ -24,15 +24,17 @@ all of its subclasses, which are found in playback_implementations.py.
 
 from __future__ import annotations
 import itertools
+import numpy as np
 from ._soundfont_host import get_best_preset_match_for_name, print_soundfont_presets
 from ._midi import get_available_midi_output_devices, print_available_midi_output_devices
 from .utilities import SavesToJSON, NoteProperty
 from .spelling import SpellingPolicy
 from .note_properties import NoteProperties
+from ._envelope_sampling import segment_values, segment_crossings
 from .playback_implementations import PlaybackImplementation, SoundfontPlaybackImplementation, \
     MIDIStreamPlaybackImplementation,  OSCPlaybackImplementation
 from .settings import engraving_settings, playback_settings
-from clockblocks import wait, current_clock, Clock, ClockKilledError, DeadClockError, TimeStamp, Moment
+from clockblocks import current_clock, Clock, ClockKilledError, DeadClockError, TimeStamp, Moment
 from clockblocks.utilities import meaningfully_less_than, meaningfully_greater_than
 from expenvelope import EnvelopeSegment
 import logging
@@ -40,7 +42,6 @@ from threading import Lock
 from typing import Sequence, TypeAlias
 from numbers import Real
 from expenvelope import Envelope
-from copy import deepcopy
 import atexit
 
 
@@ -234,7 +235,8 @@ class Ensemble(SavesToJSON):
 
     def new_osc_part(self, name: str = None, port: int = None, ip_address: str = "127.0.0.1",
                      message_prefix: str = None, osc_message_addresses: dict = "default",
-                     default_spelling_policy: SpellingPolicy = None, clef_preference="from_name") -> ScampInstrument:
+                     default_spelling_policy: SpellingPolicy = None, clef_preference="from_name",
+                     bundle_messages: bool = False, bundle_latency: float = 0) -> ScampInstrument:
         """
         Creates and returns a new ScampInstrument for this Ensemble that uses a OSCPlaybackImplementation. This means
         that when notes are played by this instrument, osc messages are sent out to the specified address
@@ -248,6 +250,9 @@ class Ensemble(SavesToJSON):
             be changed in playback settings.
         :param default_spelling_policy: the :attr:`~ScampInstrument.default_spelling_policy` for the new part
         :param clef_preference: the :attr:`~ScampInstrument.clef_preference` for the new part
+        :param bundle_messages: if True, messages sent at the same moment are grouped into a single time-tagged OSC
+            bundle (see :class:`~scamp.playback_implementations.OSCPlaybackImplementation`)
+        :param bundle_latency: latency (in seconds) added to the time tags of bundles
         :return: the newly created ScampInstrument
         """
         name = "Track " + str(len(self._instruments) + 1) if name is None else name
@@ -255,7 +260,8 @@ class Ensemble(SavesToJSON):
         instrument = self.new_silent_part(name, default_spelling_policy=default_spelling_policy,
                                           clef_preference=clef_preference)
         instrument.add_osc_playback(port=port, ip_address=ip_address, message_prefix=message_prefix,
-                                    osc_message_addresses=osc_message_addresses)
+                                    osc_message_addresses=osc_message_addresses, bundle_messages=bundle_messages,
+                                    bundle_latency=bundle_latency)
 
         return instrument
 
@@ -449,7 +455,7 @@ class ScampInstrument(SavesToJSON):
 
         if did_an_adjustment:
             # play, but don't transcribe the modified version (though only if the clock is not fast-forwarding)
-            if not clock.is_fast_forwarding():
+            if not ScampInstrument._skipping_playback(clock):
                 clock.fork(self._do_play_note, name="DO_PLAY_NOTE",
                            args=(adjusted_pitch, adjusted_volume, adjusted_length, properties),
                            kwargs={"transcribe": False, "silent": silent})
@@ -464,11 +470,12 @@ class ScampInstrument(SavesToJSON):
             # (However, if the clock is fast-forwarding, make it silent)
             if blocking:
                 self._do_play_note(pitch, volume, length, properties,
-                                   silent=clock.is_fast_forwarding() or silent, transcribe=transcribe)
+                                   silent=ScampInstrument._skipping_playback(clock) or silent, transcribe=transcribe)
             else:
                 clock.fork(self._do_play_note, name="DO_PLAY_NOTE",
                            args=(pitch, volume, length, properties),
-                           kwargs={"silent": clock.is_fast_forwarding() or silent, "transcribe": transcribe})
+                           kwargs={"silent": ScampInstrument._skipping_playback(clock) or silent,
+                                   "transcribe": transcribe})
 
     def _resolve_spelling_policies(self, properties: NoteProperties):
         """
@@ -504,6 +511,14 @@ class ScampInstrument(SavesToJSON):
         else:
             return Clock(), blocking
 
+    @staticmethod
+    def _skipping_playback(clock):
+        """
+        Notes are silent while fast-forwarding, unless the master clock (i.e. the Session) is rendering offline, in
+        which case fast-forwarding is just the means of rendering faster than realtime.
+        """
+        return clock.is_fast_forwarding() and not getattr(clock.master, "_rendering_offline", False)
+
     @staticmethod
     def _normalize_envelopes(pitch, volume, length, properties):
         # length can either be a single number of beats or a list/tuple or segments to be split
@@ -605,7 +620,7 @@ class ScampInstrument(SavesToJSON):
         for i, pitch in enumerate(pitches):
             # play the pitches individually, duplicating the properties dictionary for each.
             # (note that individual noteheads and spellings need to be separated out)
-            properties_copy = properties.duplicate()
+            properties_copy = properties._copy()
             if len(properties.noteheads) > 1:
                 # if we've been given multiple noteheads, assign them note by note
                 # (if given too few, just repeat the last notehead)
@@ -674,7 +689,7 @@ class ScampInstrument(SavesToJSON):
                 "flags": [] if flags is None else flags
             }
 
-            if clock.is_fast_forwarding() and "silent" not in self._note_info_by_id[note_id]["flags"]:
+            if ScampInstrument._skipping_playback(clock) and "silent" not in self._note_info_by_id[note_id]["flags"]:
                 self._note_info_by_id[note_id]["flags"].append("silent")
 
             if "silent" not in self._note_info_by_id[note_id]["flags"]:
@@ -737,7 +752,7 @@ class ScampInstrument(SavesToJSON):
         for i, pitch in enumerate(pitches):
             # for all but the last pitch, play it without blocking, so we can start all the others
             # also copy the properties dictionary, and pick out the correct notehead if we've been given several
-            properties_copy = deepcopy(properties)
+            properties_copy = properties._copy()
             if len(properties.noteheads) > 1:
                 properties_copy.noteheads = [properties_copy.noteheads[i]]
             note_handles.append(self.start_note(pitch, volume, properties=properties_copy, clock=clock,
@@ -804,11 +819,11 @@ class ScampInstrument(SavesToJSON):
                 segments_list = note_info["parameter_change_segments"][param_name] = []
 
             # if there was a previous segment changing this same parameter, and it's not done yet, we should abort it
+            # (this also aborts any of its remaining segments, if it was part of a sequence)
             if len(segments_list) > 0:
                 segments_list[-1].abort_if_running()
 
-            # this helps to keep track of which call to change_note_parameter happened first, since when
-            # do_animation_sequence gets forked, order can become indeterminate (see comment there)
+            # this keeps track of the order of calls to change_note_parameter
             call_priority = next(ScampInstrument._change_param_call_counter)
 
             if hasattr(target_value_or_values, "__len__"):
@@ -820,50 +835,30 @@ class ScampInstrument(SavesToJSON):
                 assert len(target_value_or_values) == len(transition_length_or_lengths) == \
                        len(transition_curve_shape_or_shapes), \
                     "List of target values must be accompanied by a equal length list of transition lengths and shapes."
-
-                def do_animation_sequence():
-                    for target, length, shape in zip(target_value_or_values, transition_length_or_lengths,
-                                                     transition_curve_shape_or_shapes):
-                        with note_info["segments_list_lock"]:
-                            if len(segments_list) > 0 and segments_list[-1].running:
-                                # if two segments are started at the exact same (clock) time, then we want to abort the
-                                # one that was called first. Often that will happen in the call to segments_list[-1].
-                                # abort_if_running() above. However, it may be that they both make it through that check
-                                # before either is added to the segments list. This checks in on that case, and aborts
-                                # whichever segment came from the earlier call to change_note_parameter
-                                if call_priority > segments_list[-1].call_priority:
-                                    # this call to change_note_parameter happened after, abort the other one
-                                    segments_list[-1].abort_if_running()
-                                else:
-                                    # this call to change_note_parameter happened before, abort
-                                    return
-
-                            this_segment = _ParameterChangeSegment(
-                                parameter_change_function, note_info["parameter_values"][param_name], target,
-                                length, shape, clock, call_priority, temporal_resolution=temporal_resolution)
-
-                            segments_list.append(this_segment)
-                        # note that these segments are not forked individually: they are chained together and called
-                        # directly on a function (do_animation_sequence) that is forked. This means that when we abort
-                        # one of them, we kill the clock that do_animation_sequence is running on, thereby aborting all
-                        # remaining segments as well. This is exactly what we want: if we call change_note_parameter
-                        # while a previous change_note_parameter is running, we want to abort all segments of the
-                        # one that's running
-                        try:
-                            this_segment.run(silent="silent" in note_info["flags"])
-                        except Exception as e:
-                            raise e
-
-                clock.fork(do_animation_sequence, name="PARAM_ANIMATION_SEQUENCE({})".format(param_name))
+                segment_specs = list(zip(target_value_or_values, transition_length_or_lengths,
+                                         transition_curve_shape_or_shapes))
             else:
-                parameter_change_segment = _ParameterChangeSegment(
-                    parameter_change_function, note_info["parameter_values"][param_name], target_value_or_values,
-                    transition_length_or_lengths, transition_curve_shape_or_shapes, clock, call_priority,
-                    temporal_resolution=temporal_resolution)
+                segment_specs = [(target_value_or_values, transition_length_or_lengths,
+                                  transition_curve_shape_or_shapes)]
+
+            def start_segment(which_segment):
+                # Segments in a sequence are chained together: each one starts the next when it finishes. (Rather
+                # than each having its own forked clock, they are animated by the shared
+                # _ParameterAnimationEngine.) Aborting the running segment therefore aborts all remaining segments
+                # as well, which is exactly what we want: if we call change_note_parameter while a previous
+                # change_note_parameter is running, we want to abort all segments of the one that's running
+                target, length, shape = segment_specs[which_segment]
                 with note_info["segments_list_lock"]:
-                    segments_list.append(parameter_change_segment)
-                clock.fork(parameter_change_segment.run, name="PARAM_ANIMATION({})".format(param_name),
-                           kwargs={"silent": "silent" in note_info["flags"]})
+                    this_segment = _ParameterChangeSegment(
+                        parameter_change_function, note_info["parameter_values"][param_name], target,
+                        length, shape, clock, call_priority, temporal_resolution=temporal_resolution,
+                        on_finish=(lambda: start_segment(which_segment + 1))
+                        if which_segment + 1 < len(segment_specs) else None
+                    )
+                    segments_list.append(this_segment)
+                this_segment.run(silent="silent" in note_info["flags"])
+
+            start_segment(0)
 
     def change_note_pitch(self, note_id: int | NoteHandle, target_value_or_values: float | Sequence[float],
                           transition_length_or_lengths: float | Sequence[float] = 0,
@@ -1068,7 +1063,8 @@ class ScampInstrument(SavesToJSON):
         return self
 
     def add_osc_playback(self, port: int, ip_address: str = "127.0.0.1", message_prefix: str = None,
-                         osc_message_addresses: dict = "default"):
+                         osc_message_addresses: dict = "default", bundle_messages: bool = False,
+                         bundle_latency: float = 0):
         """
         Add an OSCPlaybackImplementation for this instrument.
 
@@ -1078,12 +1074,16 @@ class ScampInstrument(SavesToJSON):
             with all spaces removed.
         :param osc_message_addresses: the specifix message addresses to be used for each type of message. Defaults are
             defined in playback_settings
+        :param bundle_messages: if True, messages sent at the same moment are grouped into a single time-tagged OSC
+            bundle (see :class:`~scamp.playback_implementations.OSCPlaybackImplementation`)
+        :param bundle_latency: latency (in seconds) added to the time tags of bundles
         :return: self, for chaining purposes
         """
         message_prefix = self.name.replace(" ", "") if message_prefix is None else message_prefix
         self.playback_implementations.append(
             OSCPlaybackImplementation(port=port, ip_address=ip_address, message_prefix=message_prefix,
-                                      osc_message_addresses=osc_message_addresses)
+                                      osc_message_addresses=osc_message_addresses, bundle_messages=bundle_messages,
+                                      bundle_latency=bundle_latency)
         )
         return self
 
@@ -1439,6 +1439,134 @@ class ChordHandle:
         return "ChordHandle({}, {})".format(self.note_handles, self._intervals)
 
 
+class _ParameterAnimationEngine:
+
+    """
+    Animates all of the running :class:`_ParameterChangeSegment` objects in a clock family (i.e. in a Session).
+    Rather than each segment scheduling its own intermediate value changes, the engine keeps the key data of all of
+    the running segments in parallel NumPy arrays and, on each tick of the master clock, evaluates all of them in one
+    vectorized pass. When a segment is added, the points at which it crosses from one quantization level of its
+    parameter to the next are precomputed (see :mod:`scamp._envelope_sampling`), and a segment only has its parameter
+    change function called on ticks where it has passed its next such point. (This is an implementation detail.)
+
+    Progress through each segment is measured in beats of the clock it runs on, which is read once per tick for each
+    clock that has segments running, so the intermediate values follow any tempo changes of that clock (including
+    changes made after the segment starts), as the end of the segment, which is scheduled on the clock itself, does.
+
+    :param master_clock: the master clock of the clock family whose segments this engine animates
+    :param tick_length: time (in seconds) between evaluations of the running segments
+    """
+
+    def __init__(self, master_clock, tick_length=0.005):
+        self.master_clock = master_clock
+        self.tick_length = tick_length
+        self.segments = []
+        self.ticking = False
+        self.lock = Lock()
+        # parallel arrays, with one entry per segment in self.segments (start beats and durations are measured on
+        # the segment's clock)
+        self._start_beats = np.zeros(0)
+        self._durations = np.zeros(0)
+        self._start_levels = np.zeros(0)
+        self._end_levels = np.zeros(0)
+        self._curve_shapes = np.zeros(0)
+        # progress through each segment at which it next needs updating, and all such points for each segment
+        self._next_updates = np.zeros(0)
+        self._update_points = []
+
+    @classmethod
+    def for_clock(cls, clock):
+        """
+        Returns the engine belonging to the family of the given clock, creating it if necessary.
+        """
+        master = clock.master
+        if getattr(master, "_parameter_animation_engine", None) is None:
+            master._parameter_animation_engine = cls(master)
+        return master._parameter_animation_engine
+
+    def add_segment(self, segment, resolution):
+        """
+        Starts animating the given segment.
+
+        :param segment: a running _ParameterChangeSegment
+        :param resolution: the quantization step of the parameter; the segment is updated whenever it crosses from
+            one multiple of this step to the next (but no more often than once per tick)
+        """
+        with self.lock:
+            self.segments.append(segment)
+            start_beat = segment.start_time_stamp.beat_in_clock(segment.clock)
+            # (this is only an estimate if the tempo changes later, but it's only used to thin out the update points)
+            expected_length_in_time = segment.clock.clock_to_scheduler_time(start_beat + segment.duration) - \
+                segment.start_time_stamp.scheduler_time
+            update_points = segment_crossings(segment.start_level, segment.end_level, segment.curve_shape, resolution)
+            if expected_length_in_time > 0 and len(update_points) > 0:
+                # no point in updating more than once per tick
+                _, first_in_tick = np.unique(np.floor(update_points * expected_length_in_time / self.tick_length),
+                                             return_index=True)
+                update_points = update_points[first_in_tick]
+            self._update_points.append(update_points)
+            self._next_updates = np.append(self._next_updates, update_points[0] if len(update_points) > 0 else np.inf)
+            self._start_beats = np.append(self._start_beats, start_beat)
+            self._durations = np.append(self._durations, segment.duration)
+            self._start_levels = np.append(self._start_levels, segment.start_level)
+            self._end_levels = np.append(self._end_levels, segment.end_level)
+            self._curve_shapes = np.append(self._curve_shapes, segment.curve_shape)
+            if not self.ticking:
+                self.ticking = True
+                self.master_clock.schedule_action(self._tick, Moment.after_time(self.tick_length))
+
+    def remove_segment(self, segment):
+        """
+        Stops animating the given segment (if it's being animated).
+        """
+        with self.lock:
+            self._remove_where(np.array([s is segment for s in self.segments], dtype=bool))
+
+    def _remove_where(self, mask):
+        if not np.any(mask):
+            return
+        keep = ~mask
+        self.segments = [s for s, k in zip(self.segments, keep) if k]
+        self._update_points = [u for u, k in zip(self._update_points, keep) if k]
+        self._start_beats = self._start_beats[keep]
+        self._durations = self._durations[keep]
+        self._start_levels = self._start_levels[keep]
+        self._end_levels = self._end_levels[keep]
+        self._curve_shapes = self._curve_shapes[keep]
+        self._next_updates = self._next_updates[keep]
+
+    def _tick(self):
+        with self.lock:
+            # segments whose clock has been killed will never finish, so we drop them
+            self._remove_where(np.array([not s.clock.alive for s in self.segments], dtype=bool))
+            if len(self.segments) == 0:
+                self.ticking = False
+                return
+
+            # the current beat of each clock that has segments running, read once per clock (straight from the clock,
+            # since a TimeStamp would read every clock in the family and be kept in the master clock's time stamp data)
+            clock_beats = {}
+            current_beats = np.array([
+                clock_beats[s.clock] if s.clock in clock_beats else clock_beats.setdefault(s.clock, s.clock.beat())
+                for s in self.segments
+            ])
+            progress = np.clip((current_beats - self._start_beats) / self._durations, 0, 1)
+            due = np.flatnonzero(progress >= self._next_updates)
+            values = segment_values(progress[due], self._start_levels[due], self._end_levels[due],
+                                    self._curve_shapes[due])
+            for i in due:
+                update_points = self._update_points[i]
+                next_index = np.searchsorted(update_points, progress[i], side="right")
+                self._next_updates[i] = update_points[next_index] if next_index < len(update_points) else np.inf
+            updates = [(self.segments[i], float(value)) for i, value in zip(due, values)]
+            self.master_clock.schedule_action(self._tick, Moment.after_time(self.tick_length))
+
+        # call the parameter change functions outside the lock, since they talk to the playback implementations
+        for segment, value in updates:
+            if segment.running:
+                segment.do_change_parameter(value)
+
+
 class _ParameterChangeSegment(EnvelopeSegment):
 
     """
@@ -1452,23 +1580,24 @@ class _ParameterChangeSegment(EnvelopeSegment):
     :param transition_length: length of the transition in beats on the clock given
     :param transition_curve_shape: curve shape of the transition
     :param clock: the clock that all of this happens in reference to
-    :param call_priority: this is used to determine which call to change_parameter happened first, since once these
-        things get spawned in threads, the order gets indeterminate.
-    :param temporal_resolution: time resolution of the unsynchronized process. One of: just a number (in seconds); the
-        string "pitch-based", in which case we derive it based on trying to get a smooth pitch change; the string
+    :param call_priority: this is used to keep track of which call to change_parameter happened first
+    :param temporal_resolution: determines how finely the parameter is updated. One of: just a number (in seconds);
+        the string "pitch-based", in which case we derive it based on trying to get a smooth pitch change; the string
         "volume-based", in which case we derive it based on trying to get a smooth volume change.
+    :param on_finish: (optional) function to call when the segment finishes, but not if it gets aborted. Used to
+        chain together the segments of a sequence of parameter changes.
     """
 
     def __init__(self, parameter_change_function, start_value, target_value, transition_length, transition_curve_shape,
-                 clock, call_priority, temporal_resolution=0.01):
+                 clock, call_priority, temporal_resolution=0.01, on_finish=None):
         # set this up as an envelope
         super().__init__(0, transition_length, start_value, target_value, transition_curve_shape)
         # "do_change_parameter" feels more like an action name
         self.do_change_parameter = parameter_change_function
 
-        self.clock = clock  # the parent clock that this process runs on
-        self._run_clock = None  # the sub-clock created by forking this process
-        self.running = False  # flag used for aborting the unsynchronized process
+        self.clock = clock  # the clock that this segment runs on
+        self.running = False  # flag used for aborting
+        self.on_finish = on_finish
 
         # some of the key data that this envelope holds onto are the time stamps at which it starts and finishes
         # this can be used to construct the appropriate envelope segment on whichever clock we're recording on
@@ -1480,9 +1609,9 @@ class _ParameterChangeSegment(EnvelopeSegment):
 
     def run(self, silent=False):
         """
-        Runs the segment from start to finish, gradually changing the parameter.
-        This function runs as a synchronized clock process (it should be forked), and it schedules the
-        intermediate parameter changes as leaf actions on its clock (see below).
+        Starts the segment, gradually changing the parameter. The intermediate values are taken care of by the
+        clock family's _ParameterAnimationEngine, and the end of the segment is scheduled as a leaf action on the
+        clock, so this returns immediately.
 
         :param silent: this flag causes none of the animation to actually happen. This is used when we're trying to
         notate a note but not play it back, as in the case of a note that has been adjusted (where we playback -- but
@@ -1495,60 +1624,37 @@ class _ParameterChangeSegment(EnvelopeSegment):
         if self.duration == 0:
             self.end_time_stamp = TimeStamp.now(self.clock)
             self.do_change_parameter(self.end_level)
+            if self.on_finish is not None:
+                self.on_finish()
             return
 
-        self.start_time_stamp = TimeStamp.now(self.clock)
-        self.running = True  # used to kill the unsynchronized process when we abort or this synchronized one ends
+        self.running = True
 
-        # we note down the clock we're running this on. If abort is called, this clock gets killed
-        self._run_clock = current_clock()
+        # if there's no change, or if we're skipping animation, we just need to finish at the right time
+        if not (self.end_level == self.start_level or silent):
+            _ParameterAnimationEngine.for_clock(self.clock).add_segment(self, self._get_value_resolution())
 
-        # if there's no change, or if we're skipping animation, just wait and finish
-        if self.end_level == self.start_level or silent:
-            wait(self.duration)
-            self.end_time_stamp = TimeStamp.now(self.clock)
-            self.do_change_parameter(self.end_level)
-            self.running = False
-            return
+        # Scheduling the end as a leaf action on self.clock means that any tempo changes to the clock affect it
+        # (as they do the animation, which is based on the clock's beat), and that it disappears if the clock is killed
+        self.clock.schedule_action(self._finish, Moment.after_beats(self.duration))
 
-        # determine the time increment, perhaps by calculating a good one for the given parameter
-        if self.temporal_resolution == "pitch-based":
-            time_increment = self._get_good_pitch_bend_temporal_resolution()
-        elif self.temporal_resolution == "volume-based":
-            time_increment = self._get_good_volume_temporal_resolution()
-        else:
-            time_increment = self.temporal_resolution
-        # don't animate faster than 4ms though, and don't go slower than half the duration
-        time_increment = min(self.duration / 2, max(0.004, time_increment))
-
-        # Schedule the intermediate value changes as lightweight leaf actions (Clock.schedule_action) rather
-        # than using the heavier machinery of a forked clock. Because these are tagged with the acting clock
-        # (see `Clock._schedule_at`) any future tempo mutation will affect these value changes, and the events
-        # disappear if the clock is killed.
-        # the calculated `time_increment` is measured in second, so we have to use the clock's absolute rate
-        # to convert these to beat targets on the clock.
-        seconds_per_beat = 1 / self.clock.absolute_rate()
-        num_steps = max(1, round(self.duration * seconds_per_beat / time_increment))
-        for i in range(1, num_steps):
-            beat_offset = self.duration * i / num_steps
-            self._run_clock.schedule_action(
-                lambda b=beat_offset: self.do_change_parameter(self.value_at(b)),
-                Moment.after_beats(beat_offset)
-            )
-
-        # waits in a synchronized fashion so that it can save an accurate time stamp at the end
-        wait(self.duration)
-
-        # we only get here if it wasn't aborted while running, since that will call kill on the child clock
+    def _finish(self):
+        # if it was aborted in the meantime, there's nothing to do
+        if not self.running:
+            return
         self.running = False
+        _ParameterAnimationEngine.for_clock(self.clock).remove_segment(self)
         self.end_time_stamp = TimeStamp.now(self.clock)
         self.do_change_parameter(self.end_level)
+        if self.on_finish is not None:
+            self.on_finish()
 
     def abort_if_running(self):
         if self.running:
+            self.running = False
+            _ParameterAnimationEngine.for_clock(self.clock).remove_segment(self)
             # if we were running, we save the time stamp at which we aborted as the end time stamp
             self.end_time_stamp = TimeStamp.now(self.clock)
-            self._run_clock.kill()  # kill the clock doing the "run" function
             # since the units of this envelope are beats in self.clock, see how far we got in the envelope by
             # subtracting converting the start and end time stamps to those beats and subtracting
             how_far_we_got = self.end_time_stamp.beat_in_clock(self.clock) - \
@@ -1567,34 +1673,29 @@ class _ParameterChangeSegment(EnvelopeSegment):
                 # this was aborted before it even got going. Later, the transcriber will ignore this nothing segment
                 self.end_time = self.start_time
                 self.end_level = self.start_level
-                self.running = False
                 return
             # otherwise we reached the end (within noise), so leave the segment and its exact end_level untouched
 
             self.do_change_parameter(self.end_level)  # set it to where we should be at this point
-        # mark finished; kill() (above) already cancelled the scheduled leaf updates, so this is just for
-        # idempotency (a later abort_if_running no-ops) and the running checks in do_animation_sequence
-        self.running = False
-
-    def _get_good_pitch_bend_temporal_resolution(self):
-        """
-        Returns a reasonable temporal resolution, based on this clock's envelope and rate, assuming it's a pitch curve
-        """
-        max_cents_per_second = self.max_absolute_slope() * 100 * self.clock.absolute_rate()
-        # cents / update * updates / sec = cents / sec   =>  updates_freq = cents_per_second / cents_per_update
-        # we'll aim for 4 cents per update, since some say the JND is 5-6 cents
-        update_freq = max_cents_per_second / 4.0
-        return 1 / update_freq
 
-    def _get_good_volume_temporal_resolution(self):
+    def _get_value_resolution(self):
         """
-        Returns a reasonable temporal resolution, based on this clock's envelope and rate, assuming it's a volume curve
+        Returns the quantization step of the parameter: the parameter change function is called whenever the value
+        crosses from one multiple of this step to the next.
         """
-        max_volume_per_second = self.max_absolute_slope() * self.clock.absolute_rate()
-        # based on the idea that for midi volumes, it's quantized from 0 to 127, so there's not much point in updating
-        # in between those quantization levels. It's a decent enough rule even if not using midi output.
-        update_freq = max_volume_per_second * 127
-        return 1 / update_freq
+        if self.temporal_resolution == "pitch-based":
+            # we'll aim for 4 cents per update, since some say the JND is 5-6 cents
+            return 0.04
+        elif self.temporal_resolution == "volume-based":
+            # for midi volumes, it's quantized from 0 to 127, so the multiples of 1/127 are exactly the points at which
+            # the cc value changes. It's a decent enough rule even if not using midi output.
+            return 1 / 127
+        else:
+            # a plain temporal resolution in seconds: update by however much the value changes, on average, in that
+            # time (but don't animate faster than 4ms, or in fewer than two steps)
+            seconds_per_beat = 1 / self.clock.absolute_rate()
+            time_increment = min(self.duration * seconds_per_beat / 2, max(0.004, self.temporal_resolution))
+            return abs(self.end_level - self.start_level) * time_increment / (self.duration * seconds_per_beat)
 
     def __repr__(self):
         return "_ParameterChangeSegment[{}, {}, {}, {}, {}]".format(
@@ -22,7 +22,7 @@ options that affect a given note.
 from __future__ import annotations
 from .utilities import _is_non_str_sequence
 from .playback_adjustments import NotePlaybackAdjustment
-from .utilities import SavesToJSON, NoteProperty
+from .utilities import SavesToJSON, NoteProperty, register_cache, CacheInfo
 from .spelling import SpellingPolicy
 from .text import StaffText
 from .spanners import Spanner
@@ -30,8 +30,10 @@ from expenvelope import Envelope
 from copy import deepcopy
 from . import _parsing
 import re
+from collections import OrderedDict
 from types import SimpleNamespace
 from typing import MutableMapping
+from threading import RLock
 
 
 class NoteProperties(SimpleNamespace, SavesToJSON, NoteProperty):
@@ -170,6 +172,30 @@ class NoteProperties(SimpleNamespace, SavesToJSON, NoteProperty):
 
     PROPERTY_TYPES_AS_DICT = {property_info["key"]: property_info for property_info in PROPERTY_TYPES}
 
+    # (key, default, whether the default needs copying) for each property, in order. The defaults are all empty or
+    # hold only strings, so a shallow copy does just as well as the deep copy that would otherwise be needed.
+    _DEFAULTS = tuple(
+        (property_info["key"], property_info["default"], isinstance(property_info["default"], (list, dict)))
+        for property_info in PROPERTY_TYPES
+    )
+
+    # maps each keyword argument name seen so far to (key, whether it's a container property, regularization function)
+    # for the property it refers to, or None if it doesn't refer to one. This way each name only gets matched against
+    # the property regexes once.
+    _property_info_by_kwarg = {}
+
+    #: How many distinct properties strings to keep parsed in the cache used by :func:`NoteProperties.interpret`
+    PARSE_CACHE_SIZE = 256
+
+    # maps properties strings to the NoteProperties parsed from them. These parsed versions are never handed out
+    # directly; interpret returns a copy of one, so they stay as they were when parsed.
+    _parse_cache = OrderedDict()
+    # properties strings are parsed from every clock thread that plays notes, so access to the cache is locked
+    _parse_cache_lock = RLock()
+    _parse_cache_hits = 0
+    _parse_cache_misses = 0
+    _parse_cache_evictions = 0
+
     def __init__(self, *args, **kwargs):
         if len(args) > 0:
             arg_properties = NoteProperties.interpret(args)
@@ -178,41 +204,44 @@ class NoteProperties(SimpleNamespace, SavesToJSON, NoteProperty):
             else:
                 kwargs["bundles"] = [arg_properties]
 
-        normalized_kwargs = {}
-        for property_info in NoteProperties.PROPERTY_TYPES:
-            for key in kwargs:
-                if re.match(property_info["regex"], key):
-                    # if there's a match in kwargs
-                    value = kwargs[key]
-                    if _is_non_str_sequence(property_info["default"]):
-                        # if it's a container property
-                        if not _is_non_str_sequence(kwargs[key]):
-                            # ... and we weren't given a container, then put it in a list
-                            value = [value]
-                        if property_info["regularization_function"] is not None:
-                            # If there's a regularization function to call, do it for each element of the list
-                            value = [property_info["regularization_function"](x) for x in value]
-                    else:
-                        # not a container property
-                        if property_info["regularization_function"] is not None:
-                            # If there's a regularization function to call, do it
-                            value = property_info["regularization_function"](value)
-                    normalized_kwargs[property_info["key"]] = value
-                    break
-            else:
-                # no match in kwargs make a deep copy of the default (since it's often a list!)
-                normalized_kwargs[property_info["key"]] = deepcopy(property_info["default"])
-
-        # pull out any "param_*" keys and store them in the extra playback parameters
-        for key in kwargs:
-            if key.startswith("param_"):
-                param_name, param_value = key[6:], kwargs[key]
-                if isinstance(param_value, (list, tuple)):
-                    param_value = Envelope.from_list(param_value)
-                    param_value.parsed_from_list = True
-                normalized_kwargs["extra_playback_parameters"][param_name] = param_value
-
-        super().__init__(**normalized_kwargs)
+        given_properties = {}
+        extra_parameters = None
+        for key, value in kwargs.items():
+            property_info = NoteProperties._property_info_for_kwarg(key)
+            if property_info is None:
+                # pull out any "param_*" keys, to be stored in the extra playback parameters
+                if key.startswith("param_"):
+                    if isinstance(value, (list, tuple)):
+                        value = Envelope.from_list(value)
+                        value.parsed_from_list = True
+                    extra_parameters = extra_parameters or {}
+                    extra_parameters[key[6:]] = value
+                continue
+            # if more than one kwarg refers to the same property (e.g. "articulation" and "articulations"), the first
+            # one given takes precedence
+            property_key, is_container, regularization_function = property_info
+            if property_key in given_properties:
+                continue
+            if is_container:
+                # if it's a container property and we weren't given a container, then put it in a list
+                if not _is_non_str_sequence(value):
+                    value = [value]
+                if regularization_function is not None:
+                    # If there's a regularization function to call, do it for each element of the list
+                    value = [regularization_function(x) for x in value]
+            elif regularization_function is not None:
+                # not a container property, but there's a regularization function to call, so do it
+                value = regularization_function(value)
+            given_properties[property_key] = value
+
+        # set the properties in their standard order, filling in a fresh copy of the default for any not given
+        # (this is equivalent to, but a good deal faster than, SimpleNamespace.__init__)
+        self.__dict__.update({
+            key: given_properties[key] if key in given_properties else default.copy() if needs_copy else default
+            for key, default, needs_copy in NoteProperties._DEFAULTS
+        })
+        if extra_parameters is not None:
+            self.extra_playback_parameters.update(extra_parameters)
 
         # the "bundles" keyword allows us to pass full NoteProperties, which just get incorporated
         if "bundles" in kwargs:
@@ -221,6 +250,21 @@ class NoteProperties(SimpleNamespace, SavesToJSON, NoteProperty):
 
         self.temp = {}
 
+    @staticmethod
+    def _property_info_for_kwarg(key: str) -> tuple | None:
+        try:
+            return NoteProperties._property_info_by_kwarg[key]
+        except KeyError:
+            for property_info in NoteProperties.PROPERTY_TYPES:
+                if re.match(property_info["regex"], key):
+                    result = (property_info["key"], _is_non_str_sequence(property_info["default"]),
+                              property_info["regularization_function"])
+                    break
+            else:
+                result = None
+            NoteProperties._property_info_by_kwarg[key] = result
+            return result
+
     @classmethod
     def interpret(cls, properties_object) -> NoteProperties:
         """
@@ -230,7 +274,9 @@ class NoteProperties(SimpleNamespace, SavesToJSON, NoteProperty):
             properties string, custom NoteProperties object or list of any of the above that get merged together.
             See :ref:`The Note Properties Argument` for more info.
         :return: a new :class:`NoteProperties`. Note that if a :class:`NoteProperties` is passed in, the function will
-            simply return the exact same object (not a duplicate)
+            simply return the exact same object (not a duplicate). Properties strings are parsed once and kept in a
+            least-recently-used cache (see :func:`NoteProperties.parse_cache_info`), so repeating the same string is
+            cheap; each call still returns a new object.
         """
         if isinstance(properties_object, cls):
             return properties_object
@@ -244,13 +290,79 @@ class NoteProperties(SimpleNamespace, SavesToJSON, NoteProperty):
                 properties.incorporate(cls.interpret(item))
             return properties
         elif isinstance(properties_object, str):
-            return cls(**_parsing.parse_note_properties(properties_object))
+            return cls._parse_string(properties_object)._copy()
         else:
             for property_info in NoteProperties.PROPERTY_TYPES:
                 if "custom_type" in property_info and isinstance(properties_object, property_info["custom_type"]):
                     return cls(**{property_info["key"]: properties_object})
             raise ValueError(f"{properties_object} not interpretable as NoteProperties.")
 
+    @classmethod
+    def _parse_string(cls, properties_string: str) -> NoteProperties:
+        """
+        Returns the (shared, not to be altered) NoteProperties parsed from the given string, parsing it only if it
+        isn't already in the least-recently-used cache.
+        """
+        cache = NoteProperties._parse_cache
+        with NoteProperties._parse_cache_lock:
+            parsed = cache.get(properties_string)
+            if parsed is not None:
+                NoteProperties._parse_cache_hits += 1
+                cache.move_to_end(properties_string)
+                return parsed
+            NoteProperties._parse_cache_misses += 1
+            # the parser can't be used from two threads at once either, so parsing happens under the lock too
+            parsed = cls(**_parsing.parse_note_properties(properties_string))
+            if NoteProperties.PARSE_CACHE_SIZE > 0:
+                cache[properties_string] = parsed
+                while len(cache) > NoteProperties.PARSE_CACHE_SIZE:
+                    cache.popitem(last=False)
+                    NoteProperties._parse_cache_evictions += 1
+        return parsed
+
+    @staticmethod
+    def parse_cache_info() -> CacheInfo:
+        """
+        Statistics on the cache of parsed properties strings used by :func:`NoteProperties.interpret`.
+
+        :return: a named tuple of (hits, misses, evictions, maxsize, currsize), as for memoized functions (see
+            :func:`~scamp.utilities.get_cache_info`)
+        """
+        with NoteProperties._parse_cache_lock:
+            return CacheInfo(NoteProperties._parse_cache_hits, NoteProperties._parse_cache_misses,
+                             NoteProperties._parse_cache_evictions, NoteProperties.PARSE_CACHE_SIZE,
+                             len(NoteProperties._parse_cache))
+
+    @staticmethod
+    def clear_parse_cache() -> None:
+        """
+        Empties the cache of parsed properties strings used by :func:`NoteProperties.interpret`, and resets its
+        statistics.
+        """
+        with NoteProperties._parse_cache_lock:
+            NoteProperties._parse_cache.clear()
+            NoteProperties._parse_cache_hits = NoteProperties._parse_cache_misses = 0
+            NoteProperties._parse_cache_evictions = 0
+
+    def _copy(self, keep_temp: bool = False) -> NoteProperties:
+        """
+        A much cheaper alternative to :func:`duplicate`: copies each list and dictionary of properties, so that
+        they can be altered independently, but shares the (unaltered) objects within them. The exception is
+        envelopes among the extra playback parameters, which get copied, since playback resizes them in place.
+
+        :param keep_temp: if True, the copy gets a copy of the temporary working values in `temp` (as a deep copy
+            would); otherwise (as with :func:`duplicate`) it starts with them empty
+        """
+        copy = type(self).__new__(type(self))
+        for key, value in self.__dict__.items():
+            if isinstance(value, list):
+                value = list(value)
+            elif isinstance(value, dict):
+                value = {k: deepcopy(v) if isinstance(v, Envelope) else v for k, v in value.items()}
+            setattr(copy, key, value)
+        copy.temp = deepcopy(self.temp) if keep_temp else {}
+        return copy
+
     def incorporate(self, other_properties: SimpleNamespace | MutableMapping | None) -> NoteProperties:
         """
         Incorporates a different NoteProperties or dictionary into this one.
@@ -397,3 +509,7 @@ class NoteProperties(SimpleNamespace, SavesToJSON, NoteProperty):
                  or not NoteProperties.PROPERTY_TYPES_AS_DICT[key]["is_default_function"](value))
         )
         return f"NoteProperties({kwarg_string})"
+
+
+register_cache("scamp.note_properties.NoteProperties._parse_string",
+               NoteProperties.parse_cache_info, NoteProperties.clear_parse_cache)
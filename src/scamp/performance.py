@@ -23,12 +23,13 @@ into the notation-based classes in the score module.
 
 from __future__ import annotations
 import bisect
-from functools import total_ordering
+import heapq
+from functools import total_ordering, wraps
 from numbers import Real
 from expenvelope import Envelope
 from .note_properties import NoteProperties
 from .settings import engraving_settings
-from .quantization import quantize_performance_part, QuantizationScheme
+from .quantization import quantize_performance_part, quantize_performance_parts, QuantizationScheme
 from .settings import quantization_settings
 from clockblocks import Clock, TempoEnvelope, current_clock
 from .instruments import Ensemble, ScampInstrument
@@ -37,10 +38,30 @@ from .utilities import SavesToJSON, beat_is_before, beat_is_after
 import logging
 from copy import deepcopy
 import itertools
+import os
 import textwrap
-from typing import Sequence, Iterator, Callable
+import weakref
+from collections.abc import MutableSequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence, Iterator, Callable, Iterable
 from midiutil import MIDIFile
+from midiutil.MidiFile import sort_events
 from ._midi import MIDIChannelManager
+from ._envelope_sampling import sample_envelope
+from ._tempo_mapping import times_at_beats, beats_at_times
+import numpy as np
+
+
+def _copy_envelopes(value):
+    # copies an Envelope, or the Envelopes in a tuple (i.e. a chord), leaving immutable values shared
+    if isinstance(value, Envelope):
+        return deepcopy(value)
+    elif isinstance(value, tuple):
+        return tuple(_copy_envelopes(x) for x in value)
+    return value
+
+
+_TIMING_ATTRIBUTES = ("start_beat", "length")
 
 
 @total_ordering
@@ -64,15 +85,27 @@ class PerformanceNote(SavesToJSON):
 
     def __init__(self, start_beat: float, length: float | tuple[float, ...], pitch: float | Envelope | Sequence,
                  volume: float | Envelope, properties: dict):
-        self.start_beat = start_beat
+        # (the attributes are written straight into the instance dict, since __setattr__ only needs to see changes
+        # made after construction, and calling it for each one would make creating notes several times slower)
+        attributes = self.__dict__
+        attributes["start_beat"] = start_beat
         # if length is a tuple, this indicates that the note is to be split into tied segments
-        self.length = length
+        attributes["length"] = length
         # if pitch is a tuple, this indicates a chord
-        self.pitch = pitch
-        self.volume = volume
-        self.properties = properties if isinstance(properties, NoteProperties) \
+        attributes["pitch"] = pitch
+        attributes["volume"] = volume
+        attributes["properties"] = properties if isinstance(properties, NoteProperties) \
             else NoteProperties.interpret(properties)
 
+    # counts the changes made to the start beat or length of any existing note, so that the sorted note indices kept
+    # by PerformanceParts can tell at a glance whether the notes in them might have moved
+    _timing_changes = 0
+
+    def __setattr__(self, name, value):
+        if name in _TIMING_ATTRIBUTES:
+            PerformanceNote._timing_changes += 1
+        object.__setattr__(self, name, value)
+
     def length_sum(self) -> float:
         """
         Total length of this note, adding together any tied segments.
@@ -123,6 +156,19 @@ class PerformanceNote(SavesToJSON):
         else:
             instrument.play_note(self.pitch, self.volume, self.length, self.properties, clock=clock, blocking=blocking)
 
+    def _copy(self, keep_temp: bool = True) -> PerformanceNote:
+        """
+        A much cheaper alternative to a deep copy or :func:`duplicate`, for the copies made while quantizing and
+        building scores. Start beats, lengths and constant pitches and volumes are immutable, so they are shared;
+        envelopes (which get normalized and split in place) are copied, and the properties get a shallow copy via
+        :func:`~scamp.note_properties.NoteProperties._copy`. Always returns a plain PerformanceNote.
+
+        :param keep_temp: whether to copy the temporary working values in `properties.temp` (as a deep copy would)
+            or to leave them empty (as :func:`duplicate` does)
+        """
+        return PerformanceNote(self.start_beat, self.length, _copy_envelopes(self.pitch),
+                               _copy_envelopes(self.volume), self.properties._copy(keep_temp=keep_temp))
+
     _id_generator = itertools.count()
 
     @staticmethod
@@ -134,6 +180,23 @@ class PerformanceNote(SavesToJSON):
         """
         return next(PerformanceNote._id_generator)
 
+    @staticmethod
+    def _reserve_id_block(size: int) -> int:
+        """
+        Reserves a block of `size` consecutive ID numbers, which will not be returned by :func:`next_id` in this
+        process, and returns the first of them. Used to give worker processes IDs that can't collide.
+        """
+        first_id = next(PerformanceNote._id_generator)
+        PerformanceNote._id_generator = itertools.count(first_id + size)
+        return first_id
+
+    @staticmethod
+    def _start_ids_at(first_id: int) -> None:
+        """
+        Makes :func:`next_id` count up from `first_id` (e.g. the start of a block reserved in the parent process).
+        """
+        PerformanceNote._id_generator = itertools.count(first_id)
+
     def _divide_length_at_gliss_control_points(self):
         if not isinstance(self.pitch, Envelope):
             return
@@ -194,7 +257,7 @@ class PerformanceNote(SavesToJSON):
             # since the expectation is a tuple as return value, return the note unaltered in a length-1 tuple
             return self,
         else:
-            second_part = self.duplicate()
+            second_part = self._copy(keep_temp=False)
             second_part.start_beat = split_beat
             self.length, second_part.length = PerformanceNote._split_length(self.length, split_beat - self.start_beat)
 
@@ -389,6 +452,338 @@ class PerformanceNote(SavesToJSON):
         )
 
 
+class _ColumnarNoteView(PerformanceNote):
+    """
+    A :class:`PerformanceNote` whose attributes live in a :class:`ColumnarVoice`, rather than in the object itself.
+    Setting its attributes writes through to the voice. Copying or pickling it produces an ordinary PerformanceNote.
+    """
+
+    def __init__(self, voice: ColumnarVoice, index: int):
+        self._voice = voice
+        self._index = index
+
+    def _column_attribute(column):
+        return property(lambda self: self._voice._get_value(column, self._index),
+                        lambda self, value: self._voice._set_value(column, self._index, value))
+
+    start_beat = _column_attribute("start_beat")
+    length = _column_attribute("length")
+    pitch = _column_attribute("pitch")
+    volume = _column_attribute("volume")
+    del _column_attribute
+
+    @property
+    def properties(self) -> NoteProperties:
+        # note that this is shared with every other note in the voice that has the same properties
+        return self._voice._properties[self._voice._property_ids[self._index]]
+
+    @properties.setter
+    def properties(self, properties):
+        properties = properties if isinstance(properties, NoteProperties) else NoteProperties.interpret(properties)
+        self._voice._property_ids[self._index] = self._voice._intern_properties(properties)
+
+    def _detach(self):
+        # called when this note is removed from its voice; it moves into a voice of its own
+        voice = ColumnarVoice()
+        voice.append(self)
+        self._voice, self._index = voice, 0
+        voice._views[0] = self
+
+    def __deepcopy__(self, memo):
+        return PerformanceNote(self.start_beat, deepcopy(self.length, memo), deepcopy(self.pitch, memo),
+                               deepcopy(self.volume, memo), deepcopy(self.properties, memo))
+
+    def __reduce__(self):
+        return PerformanceNote, (self.start_beat, self.length, self.pitch, self.volume, self.properties)
+
+
+class ColumnarVoice(MutableSequence):
+    """
+    A list-like container of notes for a voice of a :class:`PerformancePart`, which stores the notes column by column
+    (in NumPy arrays of start beats, lengths, pitches and volumes) instead of as individual
+    :class:`PerformanceNote` objects. Envelopes, chords and tied lengths go in a side table, and each distinct
+    :class:`~scamp.note_properties.NoteProperties` is stored only once, so that a voice of a million notes takes up
+    a small fraction of the memory that a list of PerformanceNotes would. (See the `columnar` argument of
+    :class:`PerformancePart`.)
+
+    Indexing or iterating returns PerformanceNote views onto the columns, which are created as needed and can be
+    read and altered just like ordinary notes. Numbers are stored as floats. Since notes with equal properties share
+    the same NoteProperties object, assign a new properties object to a note rather than altering its properties in
+    place. (Quantization takes care of this by turning columnar voices back into lists of ordinary notes.)
+
+    :param notes: PerformanceNotes with which to fill the voice
+    """
+
+    _COLUMNS = ("start_beat", "length", "pitch", "volume")
+
+    def __init__(self, notes: Iterable[PerformanceNote] = ()):
+        self._size = 0
+        self._columns = {column: np.empty(16) for column in ColumnarVoice._COLUMNS}
+        self._property_ids = np.empty(16, dtype=np.int32)
+        # maps (column, index) to the value for values that aren't plain numbers (the column itself holds a NaN)
+        self._side_table = {}
+        # the distinct properties objects, along with lookups by object id (for objects in the table) and by repr
+        self._properties = []
+        self._property_ids_by_object_id = {}
+        self._property_ids_by_repr = {}
+        # the views that currently exist, by index, so that the same note is always represented by the same object
+        self._views = weakref.WeakValueDictionary()
+        for note in notes:
+            self.append(note)
+
+    def _intern_properties(self, properties):
+        property_id = self._property_ids_by_object_id.get(id(properties))
+        if property_id is not None:
+            return property_id
+        same_repr_ids = self._property_ids_by_repr.setdefault(repr(properties), [])
+        for property_id in same_repr_ids:
+            if self._properties[property_id] == properties:
+                return property_id
+        property_id = len(self._properties)
+        self._properties.append(properties)
+        self._property_ids_by_object_id[id(properties)] = property_id
+        same_repr_ids.append(property_id)
+        return property_id
+
+    def _get_value(self, column, index):
+        value = self._columns[column][index].item()
+        # (NaN is the only value not equal to itself)
+        return self._side_table.get((column, index), value) if value != value else value
+
+    def _set_value(self, column, index, value):
+        self._side_table.pop((column, index), None)
+        if isinstance(value, Real):
+            self._columns[column][index] = value
+        else:
+            self._columns[column][index] = np.nan
+            self._side_table[(column, index)] = value
+
+    def _normalize_index(self, index):
+        if not -self._size <= index < self._size:
+            raise IndexError("ColumnarVoice index out of range")
+        return index % self._size
+
+    def _get_view(self, index):
+        view = self._views.get(index)
+        if view is None:
+            view = self._views[index] = _ColumnarNoteView(self, index)
+        return view
+
+    def _reorder(self, order):
+        """
+        Rearranges the notes so that the note at index order[i] ends up at index i. Notes whose indices are left out
+        of `order` are removed.
+        """
+        order = np.asarray(order, dtype=np.intp)
+        new_indices = np.full(self._size, -1, dtype=np.intp)
+        new_indices[order] = np.arange(len(order))
+        # views of removed notes take their values with them, so this has to happen before the columns change
+        views = sorted(self._views.items())
+        for index, view in views:
+            if new_indices[index] < 0:
+                del self._views[index]
+                view._detach()
+        for column in self._columns.values():
+            column[:len(order)] = column[order]
+        self._property_ids[:len(order)] = self._property_ids[order]
+        self._side_table = {(column, int(new_indices[index])): value
+                            for (column, index), value in self._side_table.items() if new_indices[index] >= 0}
+        self._views = weakref.WeakValueDictionary()
+        for index, view in views:
+            if new_indices[index] >= 0:
+                view._index = int(new_indices[index])
+                self._views[view._index] = view
+        self._size = len(order)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self._get_view(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get_view(i) for i in range(*index.indices(self._size))]
+        return self._get_view(self._normalize_index(index))
+
+    def __setitem__(self, index, note):
+        if isinstance(index, slice):
+            notes = list(self)
+            notes[index] = note
+            self.clear()
+            self.extend(notes)
+            return
+        index = self._normalize_index(index)
+        view = self._views.pop(index, None)
+        if view is not None:
+            # the note being replaced takes its values with it
+            view._detach()
+        for column in ColumnarVoice._COLUMNS:
+            self._set_value(column, index, getattr(note, column))
+        self._property_ids[index] = self._intern_properties(note.properties)
+
+    def __delitem__(self, index):
+        indices_to_remove = range(*index.indices(self._size)) if isinstance(index, slice) \
+            else (self._normalize_index(index), )
+        self._reorder(np.delete(np.arange(self._size), indices_to_remove))
+
+    def append(self, note: PerformanceNote) -> None:
+        """
+        Adds a note to the end of this voice.
+
+        :param note: the note to add
+        """
+        if self._size == len(self._property_ids):
+            # double the capacity of the arrays
+            for column in ColumnarVoice._COLUMNS:
+                self._columns[column] = np.concatenate((self._columns[column], np.empty(self._size)))
+            self._property_ids = np.concatenate((self._property_ids, np.empty(self._size, dtype=np.int32)))
+        self._size += 1
+        self._property_ids[self._size - 1] = self._intern_properties(note.properties)
+        for column in ColumnarVoice._COLUMNS:
+            self._set_value(column, self._size - 1, getattr(note, column))
+
+    def clear(self) -> None:
+        """
+        Removes all notes from this voice.
+        """
+        self._reorder(())
+
+    def insert(self, index: int, note: PerformanceNote) -> None:
+        """
+        Inserts a note before the given index.
+
+        :param index: where to insert the note
+        :param note: the note to insert
+        """
+        index = min(max(index + self._size if index < 0 else index, 0), self._size)
+        self.append(note)
+        self._reorder(np.concatenate((np.arange(index), [self._size - 1], np.arange(index, self._size - 1))))
+
+    def sort(self, key: Callable = None, reverse: bool = False) -> None:
+        """
+        Sorts the notes in place (by start beat, unless a key function is given), like `list.sort`.
+        """
+        if key is None and not reverse:
+            order = np.argsort(self._columns["start_beat"][:self._size], kind="stable")
+        else:
+            order = sorted(range(self._size), key=lambda i: self[i] if key is None else key(self[i]), reverse=reverse)
+        self._reorder(order)
+
+    def _apply_vectorized_filter(self, column, filter_function, start_beat=0, stop_beat=None):
+        """
+        Applies a filter function to the given column (e.g. "pitch") for the notes starting in the given range, calling
+        it on an array of all the numerical values at once, and separately on each value from the side table.
+        """
+        start_beats = self._columns["start_beat"][:self._size]
+        in_range = start_beats >= start_beat
+        if stop_beat is not None:
+            in_range &= start_beats < stop_beat
+        side_indices = [index for (side_column, index) in self._side_table if side_column == column]
+        is_numerical = np.ones(self._size, dtype=bool)
+        is_numerical[side_indices] = False
+        array_indices = np.flatnonzero(in_range & is_numerical)
+        if len(array_indices) > 0:
+            self._columns[column][array_indices] = filter_function(self._columns[column][array_indices])
+        for index in side_indices:
+            if in_range[index]:
+                self._set_value(column, index, filter_function(self._side_table[(column, index)]))
+
+    def _remap_beats(self, beat_function):
+        """
+        Moves the start and end (and any tie points) of every note according to a function that maps arrays of old
+        beats to arrays of new beats.
+        """
+        start_beats, lengths = self._columns["start_beat"][:self._size], self._columns["length"][:self._size]
+        tied_lengths = {index: value for (column, index), value in self._side_table.items() if column == "length"}
+        tie_points = [start_beats[index] + x for index, value in tied_lengths.items()
+                      for x in itertools.accumulate(value)]
+        new_beats = beat_function(np.concatenate((start_beats, start_beats + lengths, tie_points)))
+        new_start_beats = new_beats[:self._size]
+        # (the tied lengths are NaN in the column, and stay that way)
+        lengths[:] = new_beats[self._size:2 * self._size] - new_start_beats
+        start_beats[:] = new_start_beats
+        tie_points_used = 2 * self._size
+        for index, value in tied_lengths.items():
+            new_tie_points = new_beats[tie_points_used:tie_points_used + len(value)]
+            tie_points_used += len(value)
+            # each tied segment runs from one of its boundaries to the next
+            new_lengths = np.diff(new_tie_points, prepend=new_start_beats[index])
+            self._side_table[("length", index)] = tuple(new_lengths.tolist())
+        for (column, index), value in self._side_table.items():
+            if column in ("pitch", "volume") and isinstance(value, Envelope):
+                value.normalize_to_duration(self[index].length_sum())
+
+    def _in_start_beat_order(self, indices):
+        # the given note indices, ordered by start beat (ties keeping their order in the voice)
+        return indices[np.argsort(self._columns["start_beat"][indices], kind="stable")]
+
+    def _notes_starting_between(self, start_beat: float, stop_beat: float = None) -> Iterator[PerformanceNote]:
+        """
+        Iterates through the notes starting at or after start_beat and before stop_beat (or until the end if stop_beat
+        is None) in order of start beat. The notes are found from the start beat column, and views onto them are only
+        created as they are reached, so that none are kept alive once the caller is done with them.
+        """
+        start_beats = self._columns["start_beat"][:self._size]
+        if np.all(start_beats[1:] >= start_beats[:-1]):
+            # as is normal, since PerformancePart.add_note keeps voices sorted
+            indices = range(np.searchsorted(start_beats, start_beat, side="left"),
+                            self._size if stop_beat is None else np.searchsorted(start_beats, stop_beat, side="left"))
+        else:
+            in_range = start_beats >= start_beat
+            if stop_beat is not None:
+                in_range &= start_beats < stop_beat
+            indices = self._in_start_beat_order(np.flatnonzero(in_range)).tolist()
+        return (self._get_view(index) for index in indices)
+
+    def _notes_sounding_at(self, beat: float) -> list[PerformanceNote]:
+        """
+        List of the notes that start at or before the given beat and end after it, in order of start beat, found from
+        the start beat and length columns.
+        """
+        start_beats = self._columns["start_beat"][:self._size]
+        end_beats = start_beats + self._columns["length"][:self._size]
+        for (column, index), value in self._side_table.items():
+            if column == "length":
+                # tied lengths are NaN in the column
+                end_beats[index] = start_beats[index] + sum(value)
+        indices = self._in_start_beat_order(np.flatnonzero((start_beats <= beat) & (end_beats > beat)))
+        return [self._get_view(index) for index in indices.tolist()]
+
+    def to_notes(self) -> list[PerformanceNote]:
+        """
+        Returns a list of ordinary (independent) PerformanceNotes with the same values as the notes in this voice.
+        """
+        return [deepcopy(note) for note in self]
+
+    def __deepcopy__(self, memo):
+        copy = ColumnarVoice()
+        copy._size = self._size
+        copy._columns = {column: array.copy() for column, array in self._columns.items()}
+        copy._property_ids = self._property_ids.copy()
+        copy._side_table = deepcopy(self._side_table, memo)
+        for properties in deepcopy(self._properties, memo):
+            copy._property_ids_by_object_id[id(properties)] = len(copy._properties)
+            copy._property_ids_by_repr.setdefault(repr(properties), []).append(len(copy._properties))
+            copy._properties.append(properties)
+        return copy
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # views (which are only weakly referenced) and object ids don't survive pickling
+        del state["_views"], state["_property_ids_by_object_id"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views = weakref.WeakValueDictionary()
+        self._property_ids_by_object_id = {id(properties): i for i, properties in enumerate(self._properties)}
+
+    def __repr__(self):
+        return "ColumnarVoice({})".format(list(self))
+
+
 class _NoteFiltersMixin:
 
     def apply_note_filter(self, filter_function: Callable[[PerformanceNote], None],
@@ -406,11 +801,13 @@ class _NoteFiltersMixin:
         """
         for note in self.get_note_iterator(start_beat, stop_beat, selected_voices):
             filter_function(note)
+        # the filter may have moved notes around, in which case the sorted note index needs rebuilding
+        self.invalidate_note_index()
         return self
 
     def apply_pitch_filter(self, filter_function: Callable[[Envelope | float], Envelope | float],
                            start_beat: float = 0, stop_beat: float = None,
-                           selected_voices: Sequence[str] = None):
+                           selected_voices: Sequence[str] = None, vectorized: bool = False):
         """
         Applies a filter function to transform the pitch of every note in this Performance.
 
@@ -420,12 +817,17 @@ class _NoteFiltersMixin:
         :param start_beat: beat to start on
         :param stop_beat: beat to stop on (None keeps going until the end of the part)
         :param selected_voices: which voices to take notes from (defaults to all if None)
+        :param vectorized: if True, the filter function is called on NumPy arrays of the numerical pitches of many notes
+            at once, which is far faster for large performances (the function must therefore work element-wise, as
+            arithmetic does). Non-numerical pitches are still passed in one at a time. The resulting pitches are floats.
         :return: self, for chaining purposes
         """
-        def _note_filter(performance_note):
-            performance_note.pitch = filter_function(performance_note.pitch)
-
-        self.apply_note_filter(_note_filter, start_beat, stop_beat, selected_voices)
+        if vectorized:
+            self._apply_vectorized_filter("pitch", filter_function, start_beat, stop_beat, selected_voices)
+            return self
+        # (this doesn't go through apply_note_filter, since pitch changes leave the note index valid)
+        for note in self.get_note_iterator(start_beat, stop_beat, selected_voices):
+            note.pitch = filter_function(note.pitch)
         return self
 
     def transpose(self, interval: float):
@@ -440,7 +842,7 @@ class _NoteFiltersMixin:
 
     def apply_volume_filter(self, filter_function: Callable[[Envelope | float], Envelope | float],
                             start_beat: float = 0, stop_beat: float = None,
-                            selected_voices: Sequence[str] = None):
+                            selected_voices: Sequence[str] = None, vectorized: bool = False):
         """
         Applies a filter function to transform the volume of every note in this Performance.
 
@@ -449,14 +851,245 @@ class _NoteFiltersMixin:
         :param start_beat: beat to start on
         :param stop_beat: beat to stop on (None keeps going until the end of the part)
         :param selected_voices: which voices to take notes from (defaults to all if None)
+        :param vectorized: if True, the filter function is called on NumPy arrays of the numerical volumes of many
+            notes at once (see :func:`apply_pitch_filter`)
         :return: self, for chaining purposes
         """
-        def _note_filter(performance_note):
-            performance_note.volume = filter_function(performance_note.volume)
-
-        self.apply_note_filter(_note_filter, start_beat, stop_beat, selected_voices)
+        if vectorized:
+            self._apply_vectorized_filter("volume", filter_function, start_beat, stop_beat, selected_voices)
+            return self
+        for note in self.get_note_iterator(start_beat, stop_beat, selected_voices):
+            note.volume = filter_function(note.volume)
         return self
 
+    def scale_volume(self, factor: float):
+        """
+        Multiplies the volume of all notes in this Performance by the given factor.
+
+        :param factor: the factor by which to scale the volumes
+        :return: self, for chaining purposes
+        """
+        return self.apply_volume_filter(lambda v: v * factor)
+
+
+def _note_start_beat(note: PerformanceNote) -> float:
+    return note.start_beat
+
+
+def _sample_envelope_for_midi(envelope: Envelope, length: float, step: float, offset: float, min_spacing: float,
+                              to_midi_range: Callable) -> Iterator[tuple[float, int]]:
+    """
+    Yields (time, midi value) pairs for the given envelope, one at each point within the first `length` beats where
+    the midi value actually changes (but no closer together than min_spacing). to_midi_range takes a NumPy array of
+    envelope values and scales and clips them to the range of midi values; the result is truncated to integers.
+    """
+    times, values = sample_envelope(envelope, step, offset, min_spacing,
+                                    quantize=lambda x: to_midi_range(x).astype(int))
+    for time, value in zip(times, values):
+        if time >= length:
+            break
+        yield float(time), int(value)
+
+
+def _write_notes_to_midi_file_track(notes: Iterable[PerformanceNote], midi_file: MIDIFile, track_num: int,
+                                    max_channels: int, ring_time: float, pitch_bend_range: float,
+                                    envelope_precision: float) -> None:
+    """
+    Does the work of :func:`PerformancePart.write_to_midi_file_track`, given the part's notes in order of start beat.
+    """
+    t = 0
+    note_id_generator = itertools.count()
+    mcm = MIDIChannelManager(max_channels, time_func=lambda: t, ring_time=ring_time)
+
+    if pitch_bend_range != 2:
+        for chan in range(16):
+            midi_file.addControllerEvent(track_num, chan, 0, 101, 0)
+            midi_file.addControllerEvent(track_num, chan, 0, 100, 0)
+            midi_file.addControllerEvent(track_num, chan, 0, 6, pitch_bend_range)
+            midi_file.addControllerEvent(track_num, chan, 0, 100, 127)
+
+    # heap of (end beat, note id) for the notes that are still sounding
+    note_ends = []
+    for note_or_chord in notes:
+        while len(note_ends) > 0 and note_ends[0][0] <= note_or_chord.start_beat:
+            t, note_id = heapq.heappop(note_ends)
+            mcm.end_note(note_id)
+
+        chord_members = [note_or_chord] if not hasattr(note_or_chord.pitch, '__len__') \
+            else [PerformanceNote(note_or_chord.start_beat, note_or_chord.length, note_or_chord.pitch[i],
+                                  note_or_chord.volume, note_or_chord.properties)
+                  for i in range(len(note_or_chord.pitch))]
+
+        for note in chord_members:
+            note_id = next(note_id_generator)
+            t = note.start_beat
+
+            cc_start_values = note.properties.get_midi_cc_start_values()
+            starting_pitch = note.pitch.start_level() if isinstance(note.pitch, Envelope) else note.pitch
+            int_pitch = int(starting_pitch)
+            pitch_bend = "variable" if isinstance(note.pitch, Envelope) else starting_pitch - int_pitch
+
+            channel = mcm.assign_note_to_channel(
+                note_id, int_pitch, pitch_bend,
+                "variable" if any(isinstance(x, Envelope) for x in note.properties.get_midi_cc_params().values())
+                or isinstance(note.volume, Envelope)
+                else cc_start_values
+            )
+            # Go through all of cc_start_values and send the appropriate midi messages to get it started
+            # If it's an envelope, then schedule all of the cc messages
+
+            if isinstance(note.pitch, Envelope):
+                for bend_time, bend_value in _sample_envelope_for_midi(
+                        note.pitch, note.length_sum(), pitch_bend_range / 8192, int_pitch, envelope_precision,
+                        lambda pitches: np.clip((pitches - int_pitch) * 8192 / pitch_bend_range, -8192, 8191)):
+                    midi_file.addPitchWheelEvent(track_num, channel, t + bend_time, bend_value)
+            else:
+                midi_file.addPitchWheelEvent(
+                    track_num, channel, t, int(max(-8192, min(8192, pitch_bend * 8192 / pitch_bend_range))))
+
+            if isinstance(note.volume, Envelope):
+                start_volume = note.volume.max_level()
+                for cc_time, cc_value in _sample_envelope_for_midi(
+                        note.volume, note.length_sum(), start_volume / 127, 0, envelope_precision,
+                        lambda volumes: np.clip(volumes / start_volume * 127, 0, 127)):
+                    midi_file.addControllerEvent(track_num, channel, t + cc_time, 11, cc_value)
+            else:
+                start_volume = note.volume
+
+            for cc_num, cc_value in note.properties.get_midi_cc_params().items():
+                if isinstance(cc_value, Envelope):
+                    for cc_time, quantized_cc_value in _sample_envelope_for_midi(
+                            cc_value, note.length_sum(), 1 / 127, 0, envelope_precision,
+                            lambda values: np.clip(values * 127, 0, 127)):
+                        midi_file.addControllerEvent(track_num, channel, t + cc_time, cc_num, quantized_cc_value)
+                else:
+                    midi_file.addControllerEvent(
+                        track_num, channel, t, cc_num,
+                        int(max(0, min(127, cc_value * 127)))
+                    )
+
+            midi_file.addNote(track_num, channel, int_pitch, t, note.length_sum(), int(start_volume * 127))
+
+            # note ids increase with each note, so notes ending at the same time are cut off in the order they began
+            heapq.heappush(note_ends, (t + note.length_sum(), note_id))
+    while len(note_ends) > 0:
+        t, note_id = heapq.heappop(note_ends)
+        mcm.end_note(note_id)
+
+
+def _midi_track_data(notes: Sequence[PerformanceNote], max_channels: int, ring_time: float,
+                     pitch_bend_range: float, envelope_precision: float) -> bytes:
+    """
+    Runs in a worker process during a parallel :func:`Performance.export_to_midi_file`: writes the given notes to a
+    MIDI track, and returns that track's encoded events (without the end-of-track event, which midiutil adds when
+    the file is written). This goes through the same steps that MIDIFile.close performs for each track, and needs
+    no knowledge of the other tracks, since the file doesn't shift the time origin.
+    """
+    midi_file = MIDIFile(1)
+    _write_notes_to_midi_file_track(notes, midi_file, 0, max_channels, ring_time, pitch_bend_range,
+                                    envelope_precision)
+    # in a format 1 file, track 0 is the tempo track, and our track is the next one
+    track = midi_file.tracks[1]
+    track.closeTrack()
+    track.MIDIEventList.sort(key=sort_events)
+    track.adjustTimeAndOrigin(0, False)
+    track.writeEventsToStream()
+    return track.MIDIdata
+
+
+class _NoteList(list):
+    """
+    The list of notes in a voice of a :class:`PerformancePart`. It is an ordinary list, except that it counts the
+    changes made to it, so that the part can tell at a glance whether its sorted index of the voice is up to date.
+    """
+
+    version = 0
+
+
+def _counting_changes(list_method):
+    @wraps(list_method)
+    def method(self, *args, **kwargs):
+        self.version += 1
+        return list_method(self, *args, **kwargs)
+    return method
+
+
+for _method_name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "pop",
+                     "remove", "clear", "sort", "reverse"):
+    setattr(_NoteList, _method_name, _counting_changes(getattr(list, _method_name)))
+del _method_name
+
+
+class _NoteIndex:
+    """
+    The notes of a voice of a :class:`PerformancePart` (stored as a list), sorted by start beat (ties keeping their
+    order in the voice, just like a stable sort). Alongside the notes, it keeps the running maximum of their end beats,
+    which is non-decreasing and can therefore be bisected to find the earliest note that could still be sounding at a
+    given beat.
+
+    It also records the state it was built from: the voice object, its length, its version (if it is a
+    :class:`_NoteList`) and the number of changes made to the timing of notes. If any of these has changed, the notes
+    may have been added, removed, replaced or moved, and the index needs rebuilding. Checking this takes constant time.
+
+    :param voice: the list of notes to index
+    """
+
+    def __init__(self, voice: list[PerformanceNote]):
+        self.voice = voice
+        self.notes = sorted(voice, key=_note_start_beat)
+        self.start_beats = [note.start_beat for note in self.notes]
+        # running maximum of the end beats; None when it needs to be recalculated
+        self._max_end_beats = None
+        self.sync()
+
+    def sync(self) -> None:
+        """
+        Records the current state of the voice (and of the timing of notes) as the one that this index reflects.
+        """
+        self.length = len(self.voice)
+        self.version = getattr(self.voice, "version", None)
+        self.timing_changes = PerformanceNote._timing_changes
+
+    def is_up_to_date(self, voice: list[PerformanceNote]) -> bool:
+        """
+        Whether this index still reflects the given voice.
+        """
+        return voice is self.voice and len(voice) == self.length and \
+            getattr(voice, "version", None) == self.version and PerformanceNote._timing_changes == self.timing_changes
+
+    def insert(self, note: PerformanceNote) -> None:
+        """
+        Inserts a note just added to the end of the voice (after any notes with the same start beat).
+        """
+        i = bisect.bisect_right(self.start_beats, note.start_beat)
+        self.start_beats.insert(i, note.start_beat)
+        self.notes.insert(i, note)
+        if self._max_end_beats is not None:
+            if i == len(self.notes) - 1:
+                # appending, as is usual when notes come in from a transcription
+                self._max_end_beats.append(max(self._max_end_beats[-1], note.end_beat) if i > 0 else note.end_beat)
+            else:
+                self._max_end_beats = None
+
+    def notes_starting_between(self, start_beat: float, stop_beat: float = None) -> list[PerformanceNote]:
+        """
+        List of the notes starting at or after start_beat and before stop_beat (or until the end if stop_beat is None)
+        """
+        start_index = bisect.bisect_left(self.start_beats, start_beat)
+        stop_index = len(self.notes) if stop_beat is None else bisect.bisect_left(self.start_beats, stop_beat)
+        return self.notes[start_index:stop_index]
+
+    def notes_sounding_at(self, beat: float) -> list[PerformanceNote]:
+        """
+        List of the notes that start at or before the given beat and end after it.
+        """
+        if self._max_end_beats is None:
+            self._max_end_beats = list(itertools.accumulate((note.end_beat for note in self.notes), max))
+        # no note before the first one whose running max end beat passes the given beat can still be sounding
+        first_candidate = bisect.bisect_right(self._max_end_beats, beat)
+        last_candidate = bisect.bisect_right(self.start_beats, beat)
+        return [note for note in self.notes[first_candidate:last_candidate] if note.end_beat > beat]
+
 
 class PerformancePart(SavesToJSON, _NoteFiltersMixin):
 
@@ -471,16 +1104,20 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
         to lists of notes.
     :param instrument_id: a json serializable record of the instrument used
     :param voice_quantization_records: a record of how this part was quantized if it has been quantized
+    :param columnar: if True, the voices of this part are stored as :class:`ColumnarVoice` objects, which take up far
+        less memory than lists of PerformanceNotes. Useful for very large (e.g. algorithmically generated)
+        performances.
     :ivar instrument: the ScampInstrument associated with this part; used for playback
     :ivar name: The name of this part
-    :ivar voices: dictionary mapping voice names to lists of notes.
+    :ivar voices: dictionary mapping voice names to lists of notes (or ColumnarVoices, if columnar).
     :ivar instrument_id: a json serializable record of the instrument used
     :ivar voice_quantization_records: dictionary mapping voice names to QuantizationRecords, if this is quantized
+    :ivar columnar: whether or not new voices are stored as ColumnarVoices
     """
 
     def __init__(self, instrument: ScampInstrument = None, name: str = None, voices: dict | Sequence = None,
                  instrument_id: tuple[str, int] = None, voice_quantization_records: dict = None,
-                 clef_preference: Sequence[str | tuple[str, Real]] = None):
+                 clef_preference: Sequence[str | tuple[str, Real]] = None, columnar: bool = False):
         self.instrument = instrument  # A ScampInstrument instance
         self.clef_preference = clef_preference if clef_preference is not None \
             else instrument.resolve_clef_preference() if instrument is not None \
@@ -523,16 +1160,26 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
                 assert all(isinstance(x, PerformanceNote) for x in voices)
                 self.voices = {"_unspecified_": voices}
 
+        self.columnar = columnar
+        for voice_name, voice in self.voices.items():
+            if columnar and not isinstance(voice, ColumnarVoice):
+                self.voices[voice_name] = ColumnarVoice(voice)
+            elif not isinstance(voice, (ColumnarVoice, _NoteList)):
+                self.voices[voice_name] = _NoteList(voice)
+
         # a record of the quantization that was applied to this part, if any
         self.voice_quantization_records = voice_quantization_records
+        # sorted indices of the notes in each voice stored as a list, built as needed; maps voice names to _NoteIndex
+        # objects. (Columnar voices are searched directly instead.)
+        self._note_indices = {}
 
-    def add_note(self, note: PerformanceNote, voice: str = None) -> PerformanceNote:
+    @staticmethod
+    def _get_voice_name(note: PerformanceNote, voice: str = None) -> str:
         """
-        Add a new Performance note to this PerformancePart.
+        The name of the voice that the given note belongs in.
 
-        :param note: the note to add
-        :param voice: name of the voice to which to add it (defaults to "_unspecified_")
-        :return: the note you just added (for chaining purposes)
+        :param note: the note in question
+        :param voice: name of a voice to use regardless of the note's properties
         """
         # the voice kwarg here is only used when reconstructing this from a json serialization
         if voice is not None:
@@ -551,11 +1198,24 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
             voice_name = str(int(voice_name))
         except ValueError:
             pass
+        return voice_name
+
+    def add_note(self, note: PerformanceNote, voice: str = None) -> PerformanceNote:
+        """
+        Add a new Performance note to this PerformancePart.
+
+        :param note: the note to add
+        :param voice: name of the voice to which to add it (defaults to "_unspecified_")
+        :return: the note you just added (for chaining purposes)
+        """
+        voice_name = PerformancePart._get_voice_name(note, voice)
 
         # make sure we have an entry for the desired voice, or create one if not
         if voice_name not in self.voices:
-            self.voices[voice_name] = []
+            self.voices[voice_name] = ColumnarVoice() if self.columnar else _NoteList()
         voice = self.voices[voice_name]
+        note_index = self._note_indices.get(voice_name)
+        index_was_up_to_date = note_index is not None and note_index.is_up_to_date(voice)
 
         last_note_start_beat = voice[-1].start_beat if len(voice) > 0 else 0
         voice.append(note)
@@ -563,6 +1223,10 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
             # always keep self.notes sorted; if we're appending something that shouldn't be at the
             # very end, we'll need to sort the list after appending. This probably doesn't come up much.
             voice.sort()  # they are defined to sort by start_beat
+        elif index_was_up_to_date:
+            # keep the index up to date, rather than rebuilding it when it's next needed
+            note_index.insert(note)
+            note_index.sync()
         return note
 
     def new_note(self, start_beat: float, length, pitch, volume, properties: dict) -> PerformanceNote:
@@ -608,17 +1272,105 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
         :return: an iterator
         """
         # we can be given a list of voices to play, or if none is specified, we play all of them
-        selected_voices = self.voices.keys() if selected_voices is None else selected_voices
-        all_notes = list(itertools.chain(*[self.voices[x] for x in selected_voices]))
-        all_notes.sort()
+        voice_iterators = [
+            voice._notes_starting_between(start_beat, stop_beat) if isinstance(voice, ColumnarVoice)
+            else iter(self._get_note_index(voice_name).notes_starting_between(start_beat, stop_beat))
+            for voice_name, voice in self._get_selected_voices(selected_voices)
+        ]
+        # (heapq.merge is stable, so simultaneous notes come out in the order of their voices)
+        return voice_iterators[0] if len(voice_iterators) == 1 else heapq.merge(*voice_iterators, key=_note_start_beat)
+
+    def get_notes_sounding_at(self, beat: float, selected_voices: Sequence[str] = None) -> list[PerformanceNote]:
+        """
+        Returns a list of the notes in the selected voices that are sounding at the given beat, i.e. that start at or
+        before it and end after it. (In order of start beat.)
 
-        def iterator():
-            note_index = bisect.bisect_left(all_notes, start_beat)
-            while note_index < len(all_notes) and (stop_beat is None or all_notes[note_index].start_beat < stop_beat):
-                yield all_notes[note_index]
-                note_index += 1
+        :param beat: the beat in question
+        :param selected_voices: which voices to take notes from (defaults to all if None)
+        """
+        voice_notes = [
+            voice._notes_sounding_at(beat) if isinstance(voice, ColumnarVoice)
+            else self._get_note_index(voice_name).notes_sounding_at(beat)
+            for voice_name, voice in self._get_selected_voices(selected_voices)
+        ]
+        return voice_notes[0] if len(voice_notes) == 1 else list(heapq.merge(*voice_notes, key=_note_start_beat))
+
+    def invalidate_note_index(self) -> None:
+        """
+        This part keeps the notes of each voice indexed by start beat, so as to find notes in a given range without
+        re-sorting them. Notes added via :func:`add_note` (or :func:`new_note`) are incorporated into this index, and
+        it is rebuilt automatically after any other change: a voice being replaced, notes being added to, removed from,
+        replaced in or reordered within a voice, or the start beat or length of any note changing. The one exception
+        is a voice that has been replaced by hand with a plain list; if notes in such a list are replaced, this should
+        be called afterwards. (Columnar voices are not indexed, but searched directly.)
+        """
+        self._note_indices.clear()
 
-        return iterator()
+    def _apply_vectorized_filter(self, attribute, filter_function, start_beat, stop_beat, selected_voices):
+        for voice_name in (self.voices if selected_voices is None else selected_voices):
+            voice = self.voices[voice_name]
+            if isinstance(voice, ColumnarVoice):
+                voice._apply_vectorized_filter(attribute, filter_function, start_beat, stop_beat)
+                continue
+            notes = [note for note in voice
+                     if note.start_beat >= start_beat and (stop_beat is None or note.start_beat < stop_beat)]
+            numerical_notes = [note for note in notes if isinstance(getattr(note, attribute), Real)]
+            if len(numerical_notes) > 0:
+                new_values = filter_function(np.array([getattr(note, attribute) for note in numerical_notes],
+                                                      dtype=float))
+                for note, new_value in zip(numerical_notes, np.broadcast_to(new_values, len(numerical_notes)).tolist()):
+                    setattr(note, attribute, new_value)
+            for note in notes:
+                if not isinstance(getattr(note, attribute), Real):
+                    setattr(note, attribute, filter_function(getattr(note, attribute)))
+
+    def _remap_beats(self, beat_function: Callable[[np.ndarray], np.ndarray]) -> None:
+        """
+        Moves the start and end (and any tie points) of every note according to a function that maps arrays of old
+        beats to arrays of new beats, such that all the beats in the part are remapped at once.
+        """
+        notes = []
+        for voice in self.voices.values():
+            if isinstance(voice, ColumnarVoice):
+                voice._remap_beats(beat_function)
+            else:
+                notes.extend(voice)
+
+        # the start beat and the end beat of each tied segment for each note, one after the other
+        beats = []
+        for note in notes:
+            beats.extend(itertools.accumulate(note.length if hasattr(note.length, "__len__") else (note.length, ),
+                                              initial=note.start_beat))
+        new_beats = beat_function(np.array(beats, dtype=float)).tolist()
+
+        beats_used = 0
+        for note in notes:
+            num_segments = len(note.length) if hasattr(note.length, "__len__") else 1
+            note_beats = new_beats[beats_used:beats_used + num_segments + 1]
+            beats_used += num_segments + 1
+            note.start_beat = note_beats[0]
+            # each tied segment runs from one of its boundaries to the next
+            new_lengths = tuple(end - start for start, end in zip(note_beats, note_beats[1:]))
+            note.length = new_lengths if hasattr(note.length, "__len__") else new_lengths[0]
+            if isinstance(note.pitch, Envelope):
+                note.pitch.normalize_to_duration(note.length_sum())
+            if isinstance(note.volume, Envelope):
+                note.volume.normalize_to_duration(note.length_sum())
+            for param, value in note.properties.extra_playback_parameters.items():
+                if isinstance(param, Envelope):
+                    value.normalize_to_duration(note.length_sum())
+        self.invalidate_note_index()
+
+    def _get_selected_voices(self, selected_voices: Sequence[str] = None) -> list[tuple[str, list | ColumnarVoice]]:
+        return list(self.voices.items()) if selected_voices is None \
+            else [(voice_name, self.voices[voice_name]) for voice_name in selected_voices]
+
+    def _get_note_index(self, voice_name: str) -> _NoteIndex:
+        voice = self.voices[voice_name]
+        note_index = self._note_indices.get(voice_name)
+        if note_index is None or not note_index.is_up_to_date(voice):
+            note_index = self._note_indices[voice_name] = _NoteIndex(voice)
+        return note_index
 
     def play(self, start_beat: float = 0, stop_beat: float = None, instrument: ScampInstrument = None,
              clock: Clock = None, blocking: bool = True, tempo_envelope: TempoEnvelope = None,
@@ -653,7 +1405,6 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
         def _play_thread(child_clock=None):
             child_clock = current_clock() if child_clock is None else child_clock
             note_iterator = self.get_note_iterator(start_beat, stop_beat, selected_voices)
-            self.get_note_iterator(start_beat, stop_beat)
             try:
                 current_note = next(note_iterator)
             except StopIteration:
@@ -722,97 +1473,14 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
             manually.
         :param envelope_precision: For glissandi, volume curves, and any other parameter that is being given an
             :class:`~expenvelope.envelope.Envelope`, this is the temporal precision of the corresponding midi events.
+            Events are placed exactly where the quantized midi value changes, but no closer together than this.
         """
-        t = 0
-        note_id_generator = itertools.count()
-        mcm = MIDIChannelManager(max_channels, time_func=lambda: t, ring_time=ring_time)
-
-        if pitch_bend_range != 2:
-            for chan in range(16):
-                midi_file.addControllerEvent(track_num, chan, 0, 101, 0)
-                midi_file.addControllerEvent(track_num, chan, 0, 100, 0)
-                midi_file.addControllerEvent(track_num, chan, 0, 6, pitch_bend_range)
-                midi_file.addControllerEvent(track_num, chan, 0, 100, 127)
-
-        event_cue = []
-        for note_or_chord in self.get_note_iterator():
-            while len(event_cue) > 0 and event_cue[0][0] <= note_or_chord.start_beat:
-                event = event_cue.pop(0)
-                t = event[0]
-                event[1]()
-
-            chord_members = [note_or_chord] if not hasattr(note_or_chord.pitch, '__len__') \
-                else [PerformanceNote(note_or_chord.start_beat, note_or_chord.length, note_or_chord.pitch[i],
-                                      note_or_chord.volume, note_or_chord.properties)
-                      for i in range(len(note_or_chord.pitch))]
-
-            for note in chord_members:
-                note_id = next(note_id_generator)
-                t = note.start_beat
-
-                cc_start_values = note.properties.get_midi_cc_start_values()
-                starting_pitch = note.pitch.start_level() if isinstance(note.pitch, Envelope) else note.pitch
-                int_pitch = int(starting_pitch)
-                pitch_bend = "variable" if isinstance(note.pitch, Envelope) else starting_pitch - int_pitch
-
-                channel = mcm.assign_note_to_channel(
-                    note_id, int_pitch, pitch_bend,
-                    "variable" if any(isinstance(x, Envelope) for x in note.properties.get_midi_cc_params().values())
-                    or isinstance(note.volume, Envelope)
-                    else cc_start_values
-                )
-                # Go through all of cc_start_values and send the appropriate midi messages to get it started
-                # If it's an envelope, then schedule all of the cc messages
-
-                if isinstance(note.pitch, Envelope):
-                    for i in range(int(note.length_sum() / envelope_precision)):
-                        midi_file.addPitchWheelEvent(
-                            track_num, channel, t + i * envelope_precision,
-                            int(max(-8192, min(8191, (note.pitch.value_at(
-                                i * envelope_precision) - int_pitch) * 8192 / pitch_bend_range)))
-                        )
-                else:
-                    midi_file.addPitchWheelEvent(
-                        track_num, channel, t, int(max(-8192, min(8192, pitch_bend * 8192 / pitch_bend_range))))
-
-                if isinstance(note.volume, Envelope):
-                    start_volume = note.volume.max_level()
-                    for i in range(int(note.length_sum() / envelope_precision)):
-                        midi_file.addControllerEvent(
-                            track_num, channel, t + i * envelope_precision, 11,
-                            int(max(0, min(127, (note.volume.value_at(i * envelope_precision) / start_volume) * 127)))
-                        )
-                else:
-                    start_volume = note.volume
-
-                for cc_num, cc_value in note.properties.get_midi_cc_params().items():
-                    if isinstance(cc_value, Envelope):
-                        for i in range(int(note.length_sum() / envelope_precision)):
-                            midi_file.addControllerEvent(
-                                track_num, channel, t + i * envelope_precision, cc_num,
-                                int(max(0, min(127, (cc_value.value_at(i * envelope_precision) * 127))))
-                            )
-                    else:
-                        midi_file.addControllerEvent(
-                            track_num, channel, t, cc_num,
-                            int(max(0, min(127, cc_value * 127)))
-                        )
-
-                midi_file.addNote(track_num, channel, int_pitch, t, note.length_sum(), int(start_volume * 127))
-
-                def cutoff_note(which=note_id):
-                    mcm.end_note(which)
-
-                event_cue.append((t + note.length_sum(), cutoff_note))
-                event_cue.sort(key=lambda cue_event: cue_event[0])
-        while len(event_cue) > 0:
-            event = event_cue.pop(0)
-            t = event[0]
-            event[1]()
+        _write_notes_to_midi_file_track(self.get_note_iterator(), midi_file, track_num, max_channels, ring_time,
+                                        pitch_bend_range, envelope_precision)
 
     def quantize(self, quantization_scheme: QuantizationScheme = "default",
                  onset_weighting: float = "default",
-                 termination_weighting: float = "default") -> PerformancePart:
+                 termination_weighting: float = "default", parallel: bool | int = False) -> PerformancePart:
         """
         Quantizes this PerformancePart according to the quantization_scheme
 
@@ -822,18 +1490,20 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param parallel: if True, quantize the voices of this part in a pool of worker processes, one per CPU; if an
+            integer, use that many worker processes. The result is the same either way.
         :return: this PerformancePart, having been quantized
         """
         if quantization_scheme == "default":
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
         quantize_performance_part(self, quantization_scheme, onset_weighting=onset_weighting,
-                                  termination_weighting=termination_weighting)
+                                  termination_weighting=termination_weighting, parallel=parallel)
         return self
 
     def quantized(self, quantization_scheme: QuantizationScheme = "default",
                   onset_weighting: float = "default",
-                  termination_weighting: float = "default") -> PerformancePart:
+                  termination_weighting: float = "default", parallel: bool | int = False) -> PerformancePart:
         """
         Same as quantize, except that it returns a new copy, rather than changing this PerformancePart in place.
 
@@ -843,17 +1513,24 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param parallel: if True, quantize the voices of this part in a pool of worker processes, one per CPU; if an
+            integer, use that many worker processes. The result is the same either way.
         :return: a quantized copy of this PerformancePart
         """
         if quantization_scheme == "default":
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
-        copy = PerformancePart(instrument=self.instrument, name=self.name, voices=deepcopy(self.voices),
-                               instrument_id=self._instrument_id)
+        copy = self._unquantized_copy()
         quantize_performance_part(copy, quantization_scheme, onset_weighting=onset_weighting,
-                                  termination_weighting=termination_weighting)
+                                  termination_weighting=termination_weighting, parallel=parallel)
         return copy
 
+    def _unquantized_copy(self) -> PerformancePart:
+        voices = {voice_name: deepcopy(voice) if isinstance(voice, ColumnarVoice) else [note._copy() for note in voice]
+                  for voice_name, voice in self.voices.items()}
+        return PerformancePart(instrument=self.instrument, name=self.name, voices=voices,
+                               instrument_id=self._instrument_id, columnar=self.columnar)
+
     def is_quantized(self) -> bool:
         """
         Checks if this part has been quantized
@@ -892,19 +1569,21 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
         return 0 if longest_quantization_record is None else \
             len(self._get_longest_quantization_record().quantized_measures)
 
-    def to_staff_group(self) -> StaffGroup:
+    def to_staff_group(self, parallel: bool | int = False) -> StaffGroup:
         """
         Converts this PerformancePart to a StaffGroup object.
         (Quantizes in a default way, if necessary, but it should be quantized already.)
 
+        :param parallel: if True, construct the measures in a pool of worker processes, one per CPU; if an integer, use
+            that many worker processes. (See :func:`~scamp.score.StaffGroup.from_quantized_performance_parts`.)
         :return: a new StaffGroup made from this PerformancePart
         """
         if not self.is_quantized():
             logging.warning("PerformancePart was not quantized before calling to_staff_group(); "
                             "quantizing according to default quantization time_signature")
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
-            return self.quantized(quantization_scheme).to_staff_group()
-        return StaffGroup.from_quantized_performance_part(self)
+            return self.quantized(quantization_scheme, parallel=parallel).to_staff_group(parallel=parallel)
+        return StaffGroup.from_quantized_performance_parts([self], parallel=parallel)[0]
 
     def name_count(self) -> int:
         """
@@ -915,13 +1594,17 @@ class PerformancePart(SavesToJSON, _NoteFiltersMixin):
         return self._instrument_id[1]
 
     def _to_dict(self):
-        return {
+        json_dict = {
             "name": self.name,
             "instrument_id": self._instrument_id,
             "clef_preference": self.clef_preference,
-            "voices": self.voices,
+            "voices": {voice_name: voice.to_notes() if isinstance(voice, ColumnarVoice) else voice
+                       for voice_name, voice in self.voices.items()},
             "voice_quantization_records": self.voice_quantization_records
         }
+        if self.columnar:
+            json_dict["columnar"] = True
+        return json_dict
 
     @classmethod
     def _from_dict(cls, json_dict):
@@ -959,14 +1642,16 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
         self.tempo_envelope = TempoEnvelope() if tempo_envelope is None else tempo_envelope
         assert isinstance(self.parts, list) and all(isinstance(x, PerformancePart) for x in self.parts)
 
-    def new_part(self, instrument: ScampInstrument = None) -> PerformancePart:
+    def new_part(self, instrument: ScampInstrument = None, columnar: bool = False) -> PerformancePart:
         """
         Construct and add a new PerformancePart to this Performance
 
         :param instrument: the instrument to use as a default for playing back the part
+        :param columnar: if True, the part stores its notes in memory-efficient columnar form (see
+            :class:`PerformancePart`)
         :return: the newly constructed part
         """
-        new_part = PerformancePart(instrument)
+        new_part = PerformancePart(instrument, columnar=columnar)
         self.parts.append(new_part)
         return new_part
 
@@ -1035,23 +1720,31 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
         :param selected_voices: which voices to take notes from (defaults to all if None)
         :return: an iterator
         """
-        part_note_iterators = [p.get_note_iterator(start_beat, stop_beat, selected_voices) for p in self.parts]
+        # heapq.merge is stable, so simultaneous notes come out in the order of their parts
+        return heapq.merge(*(p.get_note_iterator(start_beat, stop_beat, selected_voices) for p in self.parts),
+                           key=_note_start_beat)
 
-        next_notes = []
-        for part_note_iterator in part_note_iterators:
-            try:
-                next_notes.append(next(part_note_iterator))
-            except StopIteration:
-                next_notes.append(None)
+    def get_notes_sounding_at(self, beat: float, selected_voices: Sequence[str] = None) -> list[PerformanceNote]:
+        """
+        Returns a list of the notes in the selected voices (of all parts) that are sounding at the given beat, i.e.
+        that start at or before it and end after it. (In order of start beat.)
 
-        while not all(x is None for x in next_notes):
-            note_to_pop = min(range(len(next_notes)),
-                              key=lambda i: next_notes[i].start_beat if next_notes[i] is not None else float("inf"))
-            yield next_notes[note_to_pop]
-            try:
-                next_notes[note_to_pop] = next(part_note_iterators[note_to_pop])
-            except StopIteration:
-                next_notes[note_to_pop] = None
+        :param beat: the beat in question
+        :param selected_voices: which voices to take notes from (defaults to all if None)
+        """
+        return list(heapq.merge(*(p.get_notes_sounding_at(beat, selected_voices) for p in self.parts),
+                                key=_note_start_beat))
+
+    def invalidate_note_index(self) -> None:
+        """
+        Calls :func:`PerformancePart.invalidate_note_index` on every part.
+        """
+        for part in self.parts:
+            part.invalidate_note_index()
+
+    def _apply_vectorized_filter(self, attribute, filter_function, start_beat, stop_beat, selected_voices):
+        for part in self.parts:
+            part._apply_vectorized_filter(attribute, filter_function, start_beat, stop_beat, selected_voices)
 
     def remap_to_tempo(self, tempo: TempoEnvelope | float):
         """
@@ -1062,27 +1755,14 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
         :return: self, for chaining purposes
         """
         tempo_envelope = tempo if isinstance(tempo, TempoEnvelope) else TempoEnvelope(tempo)
+        old_tempo_envelope = self.tempo_envelope
+
+        def _remap_beats(beats):
+            # all of the beats in a part get converted to times and back to beats in one go
+            return beats_at_times(tempo_envelope, times_at_beats(old_tempo_envelope, beats))
+
         for part in self.parts:
-            for voice in part.voices:
-                for note in part.voices[voice]:
-                    original_start_beat = note.start_beat
-                    note.start_beat = tempo_envelope.beat_at_time(self.tempo_envelope.time_at_beat(note.start_beat))
-                    if isinstance(note.length, tuple):
-                        division_points = [original_start_beat  + x for x in itertools.accumulate(note.length)]
-                        note.length = tuple(
-                            tempo_envelope.beat_at_time(self.tempo_envelope.time_at_beat(x)) - note.start_beat
-                            for x in division_points
-                        )
-                    else:
-                        note.length = tempo_envelope.beat_at_time(self.tempo_envelope.time_at_beat(
-                            original_start_beat + note.length)) - note.start_beat
-                    if isinstance(note.pitch, Envelope):
-                        note.pitch.normalize_to_duration(note.length_sum())
-                    if isinstance(note.volume, Envelope):
-                        note.volume.normalize_to_duration(note.length_sum())
-                    for param, value in note.properties.extra_playback_parameters.items():
-                        if isinstance(param, Envelope):
-                            value.normalize_to_duration(note.length_sum())
+            part._remap_beats(_remap_beats)
         self.tempo_envelope = tempo_envelope
         return self
 
@@ -1161,7 +1841,7 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
         return self
 
     def quantize(self, quantization_scheme: QuantizationScheme = "default", onset_weighting: float = "default",
-                 termination_weighting: float = "default") -> Performance:
+                 termination_weighting: float = "default", parallel: bool | int = False) -> Performance:
         """
         Quantizes all parts according to the quantization_scheme
 
@@ -1171,19 +1851,22 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param parallel: if True, quantize the voices of all the parts in a pool of worker processes, one per CPU; if
+            an integer, use that many worker processes. The result is the same either way, but this can save a lot
+            of time for performances with many parts. (On platforms where worker processes are spawned, the calling
+            script needs an `if __name__ == '__main__':` guard.)
         :return: this Performance, having been quantized
         """
         if quantization_scheme == "default":
             logging.warning("No quantization scheme given; quantizing according to default time signature.")
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
-        for part in self.parts:
-            part.quantize(quantization_scheme, onset_weighting=onset_weighting,
-                          termination_weighting=termination_weighting)
+        quantize_performance_parts(self.parts, quantization_scheme, onset_weighting=onset_weighting,
+                                   termination_weighting=termination_weighting, parallel=parallel)
         return self
 
     def quantized(self, quantization_scheme: QuantizationScheme = "default", onset_weighting: float = "default",
-                  termination_weighting: float = "default") -> Performance:
+                  termination_weighting: float = "default", parallel: bool | int = False) -> Performance:
         """
         Same as quantize, except that it returns a new copy, rather than changing this Performance in place.
 
@@ -1193,14 +1876,17 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
             value defined in the quantization_settings.
         :param termination_weighting: how much to weight note terminations in the quantization. If "default", uses the
             default value defined in the quantization_settings.
+        :param parallel: if True, quantize the voices of all the parts in a pool of worker processes, one per CPU; if
+            an integer, use that many worker processes. (See :func:`Performance.quantize`.)
         :return: a quantized copy of this Performance
         """
         if quantization_scheme == "default":
             quantization_scheme = QuantizationScheme.from_time_signature(quantization_settings.default_time_signature)
 
-        return Performance([part.quantized(quantization_scheme, onset_weighting=onset_weighting,
-                                           termination_weighting=termination_weighting)
-                            for part in self.parts], tempo_envelope=self.tempo_envelope)
+        part_copies = [part._unquantized_copy() for part in self.parts]
+        quantize_performance_parts(part_copies, quantization_scheme, onset_weighting=onset_weighting,
+                                   termination_weighting=termination_weighting, parallel=parallel)
+        return Performance(part_copies, tempo_envelope=self.tempo_envelope)
 
     def is_quantized(self) -> bool:
         """
@@ -1220,7 +1906,7 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
 
     def export_to_midi_file(self, output_file, flatten_tempo_to=None, max_channels: int = 16,
                             ring_time: float = 0.5,  pitch_bend_range: float = 2, envelope_precision: float = 0.01,
-                            tempo_precision: float = 0.1):
+                            tempo_precision: float = 0.1, parallel: bool | int = False):
         """
         Exports the Performance to a MIDI file.
 
@@ -1241,6 +1927,9 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
             :class:`~expenvelope.envelope.Envelope`, this is the temporal precision of the corresponding midi events.
         :param tempo_precision: if flatten_tempo_changes is False, then this determines the precision of tempo change
             MIDI events during gradual accelerandi/ritardandi.
+        :param parallel: if True, write the parts' tracks in a pool of worker processes, one per CPU; if an integer,
+            use that many worker processes. The resulting file is identical. (As with parallel quantization, on
+            platforms where worker processes are spawned, the calling script must be importable without side effects.)
         """
         midi_file = MIDIFile(len(self.parts))
         if flatten_tempo_to:
@@ -1256,9 +1945,22 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
                         midi_file.addTempo(0, t, self.tempo_envelope.tempo_at(t))
             midi_file.addTempo(0, self.tempo_envelope.end_time(),
                                self.tempo_envelope.tempo_at(self.tempo_envelope.end_time()))
-        for i, part in enumerate(self.parts):
-            part.write_to_midi_file_track(midi_file, i, max_channels=max_channels, ring_time=ring_time,
-                                          pitch_bend_range=pitch_bend_range, envelope_precision=envelope_precision)
+        num_workers = min(len(self.parts), (os.cpu_count() or 1) if parallel is True else int(parallel))
+        if num_workers > 1:
+            # each worker encodes a whole track, which then gets slotted into the file as an already closed track
+            # (track 0 being the tempo track); midiutil just adds the end-of-track event when writing it
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                track_data = executor.map(
+                    _midi_track_data, [list(part.get_note_iterator()) for part in self.parts],
+                    *(itertools.repeat(x) for x in (max_channels, ring_time, pitch_bend_range, envelope_precision))
+                )
+                for track, data in zip(midi_file.tracks[1:], track_data):
+                    track.MIDIdata = data
+                    track.closed = True
+        else:
+            for i, part in enumerate(self.parts):
+                part.write_to_midi_file_track(midi_file, i, max_channels=max_channels, ring_time=ring_time,
+                                              pitch_bend_range=pitch_bend_range, envelope_precision=envelope_precision)
         if hasattr(output_file, 'write'):
             midi_file.writeFile(output_file)
         else:
@@ -1268,7 +1970,7 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
     def to_score(self, quantization_scheme: QuantizationScheme = None, time_signature: str | Sequence = None,
                  bar_line_locations: Sequence[float] = None, max_divisor: int = None,
                  max_divisor_indigestibility: int = None, simplicity_preference: float = None, title: str = "default",
-                 composer: str = "default") -> Score:
+                 composer: str = "default", parallel: bool | int = False) -> Score:
         """
         Convert this Performance (list of note events in continuous time and pitch) to a Score object, which represents
         the music in traditional western notation. In the process, the music must be quantized, for which two different
@@ -1299,12 +2001,14 @@ class Performance(SavesToJSON, _NoteFiltersMixin):
             error) to infinity, with a typical value somewhere around 1.
         :param title: Title of the piece to be printed on the score.
         :param composer: Composer of the piece to be printed on the score.
+        :param parallel: if True, quantize the performance and construct the score's measures in a pool of worker
+            processes, one per CPU; if an integer, use that many worker processes. The resulting Score is the same.
         :return: the resulting Score object, which can then be rendered either as XML or LilyPond
         """
         return Score.from_performance(
             self, quantization_scheme, time_signature=time_signature, bar_line_locations=bar_line_locations,
             max_divisor=max_divisor, max_divisor_indigestibility=max_divisor_indigestibility,
-            simplicity_preference=simplicity_preference, title=title, composer=composer
+            simplicity_preference=simplicity_preference, title=title, composer=composer, parallel=parallel
         )
 
     def _to_dict(self):
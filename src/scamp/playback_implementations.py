@@ -31,6 +31,10 @@ import logging
 from .settings import playback_settings
 from .utilities import SavesToJSON, resolve_path
 import math
+import time
+import weakref
+from threading import Lock
+from clockblocks import current_clock, Moment, DeadClockError
 
 
 class PlaybackImplementation(SavesToJSON):
@@ -124,6 +128,10 @@ class _MIDIPlaybackImplementation(PlaybackImplementation):
         since they could potentially change pitch or volume; with this flags, we know they won't, so they can share
         the same MIDI channels, only using an extra one due to microtonality.
     :param volume_cc_num: The cc value used for volume changes. Defaults to 11 (expression).
+
+    Pitch bend and cc messages (including volume changes) are only sent when they would actually change the
+    (quantized) value that the channel already has. The number of messages skipped this way is kept in
+    :code:`elided_message_counts`.
     """
 
     def __init__(self, num_channels: int = 8, note_on_and_off_only: bool = False,
@@ -134,6 +142,10 @@ class _MIDIPlaybackImplementation(PlaybackImplementation):
         self.midi_channel_manager = MIDIChannelManager(num_channels)
         self.volume_cc_num = volume_cc_num
         self._note_info = {}
+        # the last midi value sent for each (channel, "pitch_bend") or (channel, cc number), unless the channels are
+        # shared with other implementations, in which case _get_channel_state points elsewhere
+        self._channel_state = {}
+        self.elided_message_counts = {"pitch_bend": 0, "cc": 0}
 
     # -------------------------- Abstract methods to be implemented by subclasses--------------
 
@@ -190,12 +202,65 @@ class _MIDIPlaybackImplementation(PlaybackImplementation):
 
     def volume_cc(self, chan, volume_from_0_to_1) -> None:
         """
-        Sends a midi expression message
+        Sends a midi expression message, unless the channel is already set to this volume
 
         :param chan: channel to send message on
         :param volume_from_0_to_1: volume to send (NB: scaled from 0 to 1)
         """
-        self.cc(chan, self.volume_cc_num, volume_from_0_to_1)
+        self._cc_if_changed(chan, self.volume_cc_num, volume_from_0_to_1)
+
+    # ------------------------------ Redundant Message Elimination ------------------------------
+
+    def _quantize_pitch_bend(self, bend_in_semitones: float) -> int:
+        """
+        The 14-bit pitch bend value (from -8192 to 8191) that a bend would be sent as. Override this in subclasses
+        that quantize pitch bends differently.
+        """
+        return max(-8192, min(8191, int(bend_in_semitones / getattr(self, "max_pitch_bend", 2) * 8192)))
+
+    def _quantize_cc(self, value_from_0_to_1: float) -> int:
+        """
+        The 7-bit value that a cc value would be sent as. Override this in subclasses that quantize cc values
+        differently.
+        """
+        return max(0, min(127, int(value_from_0_to_1 * 127)))
+
+    def _get_channel_state(self, chan: int) -> tuple[dict, int]:
+        """
+        The dictionary recording the last pitch bend and cc values sent on the given channel, along with the channel
+        number that they are recorded under in it. By default, this is a dictionary belonging to this implementation.
+        Override this in subclasses whose channels can also be written to by other implementations, so that the values
+        sent by all of them are recorded in the same place.
+        """
+        return self._channel_state, chan
+
+    def _pitch_bend_if_changed(self, chan: int, bend_in_semitones: float) -> None:
+        channel_state, state_chan = self._get_channel_state(chan)
+        quantized_bend = self._quantize_pitch_bend(bend_in_semitones)
+        if channel_state.get((state_chan, "pitch_bend")) == quantized_bend:
+            self.elided_message_counts["pitch_bend"] += 1
+        else:
+            channel_state[(state_chan, "pitch_bend")] = quantized_bend
+            self.pitch_bend(chan, bend_in_semitones)
+
+    def _cc_if_changed(self, chan: int, cc_number: int, value_from_0_to_1: float) -> None:
+        channel_state, state_chan = self._get_channel_state(chan)
+        quantized_value = self._quantize_cc(value_from_0_to_1)
+        if channel_state.get((state_chan, cc_number)) == quantized_value:
+            self.elided_message_counts["cc"] += 1
+        else:
+            channel_state[(state_chan, cc_number)] = quantized_value
+            self.cc(chan, cc_number, value_from_0_to_1)
+
+    def forget_channel_state(self) -> None:
+        """
+        Forgets what pitch bend and cc values have been sent on each channel, so that they all get sent again. Useful
+        if the receiving synthesizer has been reset.
+        """
+        for chan in range(self.num_channels):
+            channel_state, state_chan = self._get_channel_state(chan)
+            for key in [key for key in channel_state if key[0] == state_chan]:
+                del channel_state[key]
 
     # -------------------------------- Main Playback Methods --------------------------------
 
@@ -230,13 +295,13 @@ class _MIDIPlaybackImplementation(PlaybackImplementation):
                 cc_values if this_note_fixed else "variable"
             )
 
-        self.pitch_bend(chan, pitch_bend)
+        self._pitch_bend_if_changed(chan, pitch_bend)
 
         if not self.note_on_and_off_only:
             # start it at the max volume that it will ever reach, and use expression to get to the start volume
             self.volume_cc(chan, volume / this_note_info["max_volume"] if this_note_info["max_volume"] > 0 else 0)
             for cc_num, cc_value in cc_values.items():
-                self.cc(chan, cc_num, cc_value)
+                self._cc_if_changed(chan, cc_num, cc_value)
 
         self.note_on(chan, int_pitch, this_note_info["max_volume"])
 
@@ -259,7 +324,7 @@ class _MIDIPlaybackImplementation(PlaybackImplementation):
         if note_id in self._note_info:  # make sure the note is active
             this_note_info = self._note_info[note_id]
             if not this_note_info["prematurely_ended"]:
-                self.pitch_bend(this_note_info["channel"], new_pitch - this_note_info["midi_note"])
+                self._pitch_bend_if_changed(this_note_info["channel"], new_pitch - this_note_info["midi_note"])
 
     def change_note_volume(self, note_id, new_volume):
         if self.note_on_and_off_only:
@@ -276,7 +341,7 @@ class _MIDIPlaybackImplementation(PlaybackImplementation):
             this_note_info = self._note_info[note_id]
             if not this_note_info["prematurely_ended"] and parameter_name.isdigit() and 0 <= int(parameter_name) < 128:
                 cc_number = int(parameter_name)
-                self.cc(this_note_info["channel"], cc_number, new_value)
+                self._cc_if_changed(this_note_info["channel"], cc_number, new_value)
 
 
 class SoundfontPlaybackImplementation(_MIDIPlaybackImplementation):
@@ -298,13 +363,22 @@ class SoundfontPlaybackImplementation(_MIDIPlaybackImplementation):
         dynamic pitch/volume/parameter changes. Without this flag, notes will all be placed on separate MIDI channels,
         since they could potentially change pitch or volume; with this flags, we know they won't, so they can share
         the same MIDI channels, only using an extra one due to microtonality.
+    :param sequencer_latency: If None, MIDI events are sent to FluidSynth the moment the clock thread gets around to
+        sending them, so their timing is subject to thread wake-up latency. If a number of seconds, events are instead
+        timestamped with the clock's scheduled time plus this latency and handed to the FluidSynth sequencer, making
+        their timing sample-accurate (at the cost of that fixed delay). Ignored while recording to a file, since the
+        recording would miss sequenced events. Defaults to the value defined in
+        playback_settings.soundfont_sequencer_latency.
     """
 
     soundfont_hosts = {}
+    # offline hosts render in the score time of a particular master clock (typically a Session), so each master clock
+    # gets a host of its own, which goes away along with it
+    offline_soundfont_hosts = weakref.WeakKeyDictionary()
 
     def __init__(self, bank_and_preset: tuple[int, int] = (0, 0), soundfont: str = "default", num_channels: int = 8,
                  audio_driver: str = "default", max_pitch_bend: int = "default", note_on_and_off_only: bool = False,
-                 volume_cc_num: int = 11):
+                 volume_cc_num: int = 11, sequencer_latency: float | None = "default"):
         super().__init__(num_channels, note_on_and_off_only, volume_cc_num)
 
         # we hold onto these arguments for the purposes of json serialization
@@ -315,6 +389,7 @@ class SoundfontPlaybackImplementation(_MIDIPlaybackImplementation):
 
         self.max_pitch_bend = max_pitch_bend
         self.soundfont = playback_settings.default_soundfont if soundfont == "default" else soundfont
+        self.sequencer_latency = sequencer_latency
 
         # The soundfont host is shared between all instances of SoundfontPlaybackImplementation sharing the same
         # audio driver. (Theoretically, if you created two SoundfontPlaybackImplementations using different drivers
@@ -324,10 +399,17 @@ class SoundfontPlaybackImplementation(_MIDIPlaybackImplementation):
         # (either from first run or from null value in the JSON) which routes to _dependencies.probe_audio_driver()
         # soundfont_hosts dict is therefore keyed by the real driver, not by a placeholder.
         audio_driver = playback_settings.default_audio_driver if self.audio_driver == "default" else self.audio_driver
-        if audio_driver in SoundfontPlaybackImplementation.soundfont_hosts:
-            self.soundfont_host = SoundfontPlaybackImplementation.soundfont_hosts[audio_driver]
+        if audio_driver == "offline":
+            clock = current_clock()
+            if clock is None:
+                raise ValueError("Offline rendering must be set up from within a clock (typically a Session).")
+            soundfont_hosts, host_key = SoundfontPlaybackImplementation.offline_soundfont_hosts, clock.master
         else:
-            self.soundfont_host = SoundfontPlaybackImplementation.soundfont_hosts[audio_driver] = \
+            soundfont_hosts, host_key = SoundfontPlaybackImplementation.soundfont_hosts, audio_driver
+        if host_key in soundfont_hosts:
+            self.soundfont_host = soundfont_hosts[host_key]
+        else:
+            self.soundfont_host = soundfont_hosts[host_key] = \
                 SoundfontHost(
                     self.soundfont, audio_driver,
                     recording_file_path=resolve_path(playback_settings.recording_file_path)
@@ -337,8 +419,11 @@ class SoundfontPlaybackImplementation(_MIDIPlaybackImplementation):
                 )
         if self.soundfont not in self.soundfont_host.soundfont_ids:
             self.soundfont_host.load_soundfont(self.soundfont)
-        self.soundfont_instrument = self.soundfont_host.add_instrument(self.num_channels, self.bank_and_preset,
-                                                                       self.soundfont)
+        self.soundfont_instrument = self.soundfont_host.add_instrument(
+            self.num_channels, self.bank_and_preset, self.soundfont,
+            sequencer_latency=playback_settings.soundfont_sequencer_latency
+            if self.sequencer_latency == "default" else self.sequencer_latency
+        )
         self.set_max_pitch_bend(playback_settings.default_max_soundfont_pitch_bend
                                 if self.max_pitch_bend == "default" else self.max_pitch_bend)
 
@@ -366,7 +451,8 @@ class SoundfontPlaybackImplementation(_MIDIPlaybackImplementation):
             "soundfont": self.soundfont,
             "num_channels": self.num_channels,
             "audio_driver": self.audio_driver,
-            "max_pitch_bend": self.max_pitch_bend
+            "max_pitch_bend": self.max_pitch_bend,
+            "sequencer_latency": self.sequencer_latency
         }
 
     @classmethod
@@ -389,11 +475,15 @@ class MIDIStreamPlaybackImplementation(_MIDIPlaybackImplementation):
         dynamic pitch/volume/parameter changes. Without this flag, notes will all be placed on separate MIDI channels,
         since they could potentially change pitch or volume; with this flags, we know they won't, so they can share
         the same MIDI channels, only using an extra one due to microtonality.
+    :param queued_output: if True, messages are handed off to a background thread to be sent, so that the clock
+        thread doesn't wait on the MIDI output, and pitch bend and cc messages that are superseded before they get sent
+        are dropped. Defaults to playback_settings.streaming_midi_queued_output. (See also
+        :func:`get_midi_output_stats`.)
     """
 
     def __init__(self, midi_output_device: str = "default", num_channels=8, midi_output_name: str | None = None,
                  max_pitch_bend: int = "default", note_on_and_off_only: bool = False, start_channel=0,
-                 volume_cc_num: int = 11):
+                 volume_cc_num: int = 11, queued_output: bool = "default"):
         super().__init__(num_channels, note_on_and_off_only, volume_cc_num)
 
         # we hold onto these arguments for the purposes of json serialization
@@ -403,15 +493,19 @@ class MIDIStreamPlaybackImplementation(_MIDIPlaybackImplementation):
         self.num_channels = num_channels
         self.midi_output_device = midi_output_device
         self.midi_output_name = midi_output_name
+        self.queued_output = queued_output
 
         midi_output_name = "SCAMP" if midi_output_name is None else midi_output_name
+        queued_output = playback_settings.streaming_midi_queued_output if queued_output == "default" \
+            else queued_output
 
         # since rtmidi can only have 16 output channels, we need to create several output devices if we are using more
         if start_channel + num_channels <= 16:
-            self.rt_simple_outs = [SimpleRtMidiOut(midi_output_device, midi_output_name)]
+            self.rt_simple_outs = [SimpleRtMidiOut(midi_output_device, midi_output_name, queued_output)]
         else:
             self.rt_simple_outs = [
-                SimpleRtMidiOut(midi_output_device, midi_output_name + " chans {}-{}".format(chan, chan + 15))
+                SimpleRtMidiOut(midi_output_device, midi_output_name + " chans {}-{}".format(chan, chan + 15),
+                                queued_output)
                 for chan in range(0, start_channel + num_channels, 16)
             ]
 
@@ -425,6 +519,15 @@ class MIDIStreamPlaybackImplementation(_MIDIPlaybackImplementation):
         rt_simple_out = self.rt_simple_outs[chan // 16]
         return rt_simple_out, adjusted_chan
 
+    def _get_channel_state(self, chan):
+        # other instruments may be sending to the same port and channels, so we go by what the port has been sent
+        rt_simple_out, adjusted_chan = self._get_rt_simple_out_and_channel(chan)
+        return rt_simple_out.channel_state, adjusted_chan
+
+    def _quantize_pitch_bend(self, bend_in_semitones):
+        # the 14-bit value that the port is actually sent (see pitch_bend), which is what its channel state records
+        return max(-8192, min(int(bend_in_semitones / self.max_pitch_bend * 8192), 8191)) + 8192
+
     def note_on(self, chan: int, pitch: int, velocity_from_0_to_1: float):
         # unless it's the standard value of two semitones, reinforce the max pitch bend at the start of every note,
         # since we may start recording partway through
@@ -477,7 +580,8 @@ class MIDIStreamPlaybackImplementation(_MIDIPlaybackImplementation):
             "midi_output_device": self.midi_output_device,
             "num_channels": self.num_channels,
             "midi_output_name": self.midi_output_name,
-            "max_pitch_bend": self.max_pitch_bend
+            "max_pitch_bend": self.max_pitch_bend,
+            "queued_output": self.queued_output
         }
 
     @classmethod
@@ -494,10 +598,14 @@ class OSCPlaybackImplementation(PlaybackImplementation):
     :param message_prefix: prefix used in the address of all messages sent. Defaults to the name of the instrument
     :param osc_message_addresses: dictionary mapping the kind of the message to the address for that message. Defaults
          to playback_settings.osc_message_addresses
+    :param bundle_messages: if True, all of the messages produced at the same moment in the clock system are sent
+        together as a single OSC bundle, time-tagged with the (ideal, lag-free) time at which they were scheduled.
+    :param bundle_latency: when bundling messages, this many seconds are added to the time tag of each bundle, so that
+        a receiver that schedules bundles (like SuperCollider) can play them back with precise timing.
     """
 
     def __init__(self, port: int, ip_address: str = "127.0.0.1", message_prefix: str = "scamp",
-                 osc_message_addresses: dict = "default"):
+                 osc_message_addresses: dict = "default", bundle_messages: bool = False, bundle_latency: float = 0):
         super().__init__()
         # the output client for OSC messages
         # by default the IP address is the local 127.0.0.1
@@ -507,44 +615,126 @@ class OSCPlaybackImplementation(PlaybackImplementation):
         self.client = pythonosc.udp_client.SimpleUDPClient(ip_address, port)
         # the first part of the osc message; used to distinguish between instruments
         # by default uses the name of the instrument with spaces removed
-        self.message_prefix = message_prefix
+        self._message_prefix = message_prefix
 
-        self.osc_message_addresses = playback_settings.osc_message_addresses
+        self._osc_message_addresses = playback_settings.osc_message_addresses
         if osc_message_addresses != "default":
             assert isinstance(osc_message_addresses, dict), "osc_message_addresses argument must be a complete or " \
                                                             "incomplete dictionary of alternate osc messages"
             # for each type of osc message, use the one specified in the osc_message_addresses argument if available,
             # falling back to the one in playback_settings if it's not available
-            self.osc_message_addresses = {key: osc_message_addresses[key] if key in osc_message_addresses else value
-                                          for key, value in playback_settings.osc_message_addresses.items()}
+            self._osc_message_addresses = {key: osc_message_addresses[key] if key in osc_message_addresses else value
+                                           for key, value in playback_settings.osc_message_addresses.items()}
+        self._build_addresses()
+
+        self.bundle_messages = bundle_messages
+        self.bundle_latency = bundle_latency
+        self._bundle_lock = Lock()
+        self._bundle_builder = None
+        self._bundle_size = 0
+        self._bundle_time = None
 
         self._currently_playing = []
+        self._note_clocks = {}
+
+    @property
+    def message_prefix(self) -> str:
+        """
+        Prefix used in the address of all messages sent.
+        """
+        return self._message_prefix
+
+    @message_prefix.setter
+    def message_prefix(self, value: str):
+        self._message_prefix = value
+        self._build_addresses()
+
+    @property
+    def osc_message_addresses(self) -> dict:
+        """
+        Dictionary mapping the kind of the message to the address for that message.
+        """
+        return self._osc_message_addresses
+
+    @osc_message_addresses.setter
+    def osc_message_addresses(self, value: dict):
+        self._osc_message_addresses = value
+        self._build_addresses()
+
+    def _build_addresses(self):
+        # the full addresses are worked out once in advance, rather than being formatted for every message
+        self._addresses = {kind: "/{}/{}".format(self._message_prefix, address)
+                           for kind, address in self._osc_message_addresses.items()}
+        self._parameter_addresses = {}
+
+    def _get_parameter_address(self, parameter_name):
+        if parameter_name not in self._parameter_addresses:
+            self._parameter_addresses[parameter_name] = "{}/{}".format(self._addresses["change_parameter"],
+                                                                       parameter_name)
+        return self._parameter_addresses[parameter_name]
+
+    def _send(self, address, args, note_id=None):
+        # animation steps run as leaf actions on the scheduler, outside of any clock, so for those we fall back to the
+        # clock that the note was started on
+        clock = current_clock() or self._note_clocks.get(note_id)
+        if not self.bundle_messages or clock is None:
+            self.client.send_message(address, args)
+            return
+        with self._bundle_lock:
+            tick = clock.scheduler.time
+            if self._bundle_time is not None and tick != self._bundle_time:
+                self._send_bundle()
+            if self._bundle_time is None:
+                try:
+                    # this runs once everything already scheduled for this moment has happened. (Anything that gets
+                    # sent at this moment after that just ends up in another bundle with the same time tag.)
+                    clock.master.schedule_action(self.flush_bundle, Moment.after_time(0))
+                except DeadClockError:
+                    self.client.send_message(address, args)
+                    return
+                self._bundle_time = tick
+                time_tag = time.time() - clock.scheduler.lag() + self.bundle_latency
+                self._bundle_builder = pythonosc.osc_bundle_builder.OscBundleBuilder(time_tag)
+            self._bundle_builder.add_content(pythonosc.osc_message_builder.build_msg(address, args))
+            self._bundle_size += 1
+
+    def _send_bundle(self):
+        if self._bundle_size > 0:
+            self.client.send(self._bundle_builder.build())
+        self._bundle_size = 0
+        self._bundle_time = None
+
+    def flush_bundle(self) -> None:
+        """
+        When bundling messages, sends any messages that are waiting to go out in the current bundle. (This happens
+        automatically at the end of each moment in the clock system, so generally doesn't need to be called.)
+        """
+        with self._bundle_lock:
+            self._send_bundle()
 
     def start_note(self, note_id: int, pitch: float, volume: float, properties: NoteProperties,
                    note_info_dict: dict) -> None:
-        self.client.send_message("/{}/{}".format(self.message_prefix, self.osc_message_addresses["start_note"]),
-                                 [note_id, pitch, volume])
+        if self.bundle_messages:
+            self._note_clocks[note_id] = note_info_dict.get("clock")
+        self._send(self._addresses["start_note"], [note_id, pitch, volume], note_id)
         self._currently_playing.append(note_id)
         for param, value in properties.extra_playback_parameters.items():
             self.change_note_parameter(note_id, param, value.start_level() if hasattr(value, 'start_level') else value)
 
     def end_note(self, note_id: int) -> None:
-        self.client.send_message("/{}/{}".format(self.message_prefix,
-                                                 self.osc_message_addresses["end_note"]), [note_id])
+        self._send(self._addresses["end_note"], [note_id], note_id)
         if note_id in self._currently_playing:
             self._currently_playing.remove(note_id)
+        self._note_clocks.pop(note_id, None)
 
     def change_note_pitch(self, note_id: int, new_pitch: float) -> None:
-        self.client.send_message("/{}/{}".format(self.message_prefix, self.osc_message_addresses["change_pitch"]),
-                                 [note_id, new_pitch])
+        self._send(self._addresses["change_pitch"], [note_id, new_pitch], note_id)
 
     def change_note_volume(self, note_id: int, new_volume: float) -> None:
-        self.client.send_message("/{}/{}".format(self.message_prefix, self.osc_message_addresses["change_volume"]),
-                                 [note_id, new_volume])
+        self._send(self._addresses["change_volume"], [note_id, new_volume], note_id)
 
     def change_note_parameter(self, note_id: int, parameter_name: str, new_value: float) -> None:
-        self.client.send_message("/{}/{}/{}".format(
-            self.message_prefix, self.osc_message_addresses["change_parameter"], parameter_name), [note_id, new_value])
+        self._send(self._get_parameter_address(parameter_name), [note_id, new_value], note_id)
 
     def set_max_pitch_bend(self, semitones: int) -> None:
         """
@@ -557,7 +747,9 @@ class OSCPlaybackImplementation(PlaybackImplementation):
             "port": self.port,
             "ip_address": self.ip_address,
             "message_prefix": self.message_prefix,
-            "osc_message_addresses": self.osc_message_addresses
+            "osc_message_addresses": self.osc_message_addresses,
+            "bundle_messages": self.bundle_messages,
+            "bundle_latency": self.bundle_latency
         }
 
     @classmethod
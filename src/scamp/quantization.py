@@ -21,20 +21,27 @@ Module containing classes and functions related to the quantization of performan
 
 from __future__ import annotations
 from fractions import Fraction
-from .utilities import indigestibility, is_multiple, is_x_pow_of_y, round_to_multiple, sum_nested_list, prime_factor, \
+from .utilities import indigestibility, is_multiple, is_x_pow_of_y, sum_nested_list, prime_factor, \
     SavesToJSON, memoize
 from ._metric_structure import MetricStructure
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from .settings import quantization_settings, engraving_settings
 from expenvelope import Envelope
 from numbers import Number
-from typing import Sequence, Iterator, TYPE_CHECKING
+from typing import Sequence, Iterator, Callable, Hashable, TYPE_CHECKING
+import bisect
+import itertools
+import logging
+import os
 import textwrap
+import numpy as np
 from . import _abjad_facade as af
 
 if TYPE_CHECKING:
     # Import abjad only for type checking, not at runtime
     import abjad
+    from .performance import PerformanceNote, PerformancePart
 
 
 ##################################################################################################################
@@ -271,6 +278,7 @@ class BeatQuantizationScheme:
         )))
 
     @staticmethod
+    @memoize(key=lambda length, divisors: (length, tuple(divisors)))
     def _get_divisor_indigestibilities(length: float, divisors: Sequence[int]) -> Sequence[float]:
         """
         Returns the indigestibilities for a given set of divisors of a given length, taking into account how those
@@ -309,7 +317,7 @@ class BeatQuantizationScheme:
                 divisor_indigestibility += 1
 
             out.append(divisor_indigestibility)
-        return out
+        return tuple(out)
 
     @staticmethod
     def _get_divisor_undesirabilities(divisor_indigestibilities, simplicity_preference):
@@ -425,7 +433,9 @@ class MeasureQuantizationScheme:
             for group in groups
         ))
 
-    @memoize
+    @memoize(key=lambda self, subdivision_length: (
+            tuple(beat_scheme.length for beat_scheme in self.beat_schemes), repr(self.beat_groupings), subdivision_length
+    ))
     def get_beat_hierarchies(self, subdivision_length: float) -> Sequence[int]:
         """
         Generates a list of hierarchies representing how nested a subdivision is within the metric structure.
@@ -514,6 +524,7 @@ class QuantizationScheme:
         assert all(isinstance(x, MeasureQuantizationScheme) for x in measure_schemes)
         self.measure_schemes = measure_schemes
         self.loop = loop
+        self._compiled = None
 
     @classmethod
     def from_attributes(cls, time_signature: str | TimeSignature | Sequence = None,
@@ -637,6 +648,151 @@ class QuantizationScheme:
                 yield beat_scheme, t
                 t += beat_scheme.length
 
+    def compile(self) -> CompiledQuantizationScheme:
+        """
+        Returns a :class:`CompiledQuantizationScheme` for this scheme: a table of its beats and their candidate
+        divisors that is built up once and then shared by every voice and part quantized with this scheme. The same
+        table is returned on subsequent calls, unless the measure schemes or loop setting have since been changed.
+        """
+        if self._compiled is None or not self._compiled._is_compiled_from(self):
+            self._compiled = CompiledQuantizationScheme(self)
+        return self._compiled
+
+
+DivisorTable = namedtuple("DivisorTable", "divisors undesirabilities division_lengths")
+DivisorTable.__doc__ = """The candidate divisors for a beat, in a form ready for quantization (named tuple)
+
+:param divisors: tuple of the allowed divisors
+:param undesirabilities: NumPy array of the undesirability of each divisor
+:param division_lengths: NumPy array of the length, in quarter notes, of the divisions resulting from each divisor
+"""
+
+
+class CompiledQuantizationScheme:
+    """
+    A flat table of the measures and beats of a :class:`QuantizationScheme`, along with the candidate divisors and
+    undesirabilities of each distinct beat scheme. Since a QuantizationScheme goes on forever (either looping or
+    repeating its last measure), the table is extended lazily, as far as it is asked about. Rather than constructing
+    one of these directly, call :func:`QuantizationScheme.compile`, which reuses the same table for every voice.
+
+    :param quantization_scheme: the QuantizationScheme to compile
+    :ivar quantization_scheme: the QuantizationScheme compiled
+    :ivar beat_schemes: list of the BeatQuantizationScheme for each beat tabulated so far
+    :ivar beat_starts: NumPy array of the start beat of each beat tabulated so far
+    :ivar beat_lengths: NumPy array of the length of each beat tabulated so far
+    :ivar measure_schemes: list of the MeasureQuantizationScheme for each measure tabulated so far
+    :ivar measure_starts: list of the start beat of each measure tabulated so far
+    :ivar measure_first_beats: list of the index (in the beat table) of the first beat of each measure tabulated so far
+    """
+
+    #: number of measures the table is initially extended by; each further extension doubles the table
+    INITIAL_NUM_MEASURES = 16
+
+    def __init__(self, quantization_scheme: QuantizationScheme):
+        self.quantization_scheme = quantization_scheme
+        self._source = (tuple(quantization_scheme.measure_schemes), quantization_scheme.loop)
+        self.beat_schemes = []
+        self.beat_starts = np.empty(0)
+        self.beat_lengths = np.empty(0)
+        self.measure_schemes = []
+        self.measure_starts = []
+        self.measure_first_beats = []
+        self._end_beat = 0
+        self._divisor_tables = {}
+
+    def __getstate__(self):
+        # the divisor tables are keyed by object id, which doesn't survive pickling (e.g. when sent to a worker process)
+        state = self.__dict__.copy()
+        state["_divisor_tables"] = {}
+        return state
+
+    def _is_compiled_from(self, quantization_scheme):
+        source_measure_schemes, source_loop = self._source
+        return source_loop == quantization_scheme.loop \
+            and len(source_measure_schemes) == len(quantization_scheme.measure_schemes) \
+            and all(a is b for a, b in zip(source_measure_schemes, quantization_scheme.measure_schemes))
+
+    def _extend(self):
+        """
+        Doubles the number of measures (and beats) in the table.
+        """
+        source_measure_schemes, loop = self._source
+        num_new_measures = max(len(self.measure_schemes), CompiledQuantizationScheme.INITIAL_NUM_MEASURES)
+        new_beat_starts, new_beat_lengths = [], []
+        t = self._end_beat
+        for measure_index in range(len(self.measure_schemes), len(self.measure_schemes) + num_new_measures):
+            # when looping, cycle through the measure schemes; otherwise repeat the last one once we run out
+            measure_scheme = source_measure_schemes[measure_index % len(source_measure_schemes)] if loop \
+                else source_measure_schemes[min(measure_index, len(source_measure_schemes) - 1)]
+            self.measure_schemes.append(measure_scheme)
+            self.measure_starts.append(t)
+            self.measure_first_beats.append(len(self.beat_schemes))
+            # (the beat start times are accumulated just as in QuantizationScheme.beat_scheme_iterator)
+            beat_t = t
+            for beat_scheme in measure_scheme.beat_schemes:
+                self.beat_schemes.append(beat_scheme)
+                new_beat_starts.append(beat_t)
+                new_beat_lengths.append(beat_scheme.length)
+                beat_t += beat_scheme.length
+            t += measure_scheme.length
+        self._end_beat = t
+        self.beat_starts = np.concatenate((self.beat_starts, new_beat_starts))
+        self.beat_lengths = np.concatenate((self.beat_lengths, new_beat_lengths))
+
+    def get_beat(self, index: int) -> tuple[BeatQuantizationScheme, float]:
+        """
+        Returns a tuple of (beat_scheme, start_beat) for the beat at the given index.
+        """
+        while index >= len(self.beat_schemes):
+            self._extend()
+        return self.beat_schemes[index], self.beat_starts[index].item()
+
+    def get_measure(self, index: int) -> tuple[MeasureQuantizationScheme, float]:
+        """
+        Returns a tuple of (measure_scheme, start_beat) for the measure at the given index.
+        """
+        while index >= len(self.measure_schemes):
+            self._extend()
+        return self.measure_schemes[index], self.measure_starts[index]
+
+    def beat_index_at(self, beat: float) -> int:
+        """
+        Returns the index of the beat that contains the given time (in quarter notes since the start).
+        """
+        while beat >= self._end_beat:
+            self._extend()
+        return max(0, int(np.searchsorted(self.beat_starts, beat, side="right")) - 1)
+
+    def measure_scheme_iterator(self) -> Iterator[tuple[MeasureQuantizationScheme, float]]:
+        """
+        Iterates through the measures in the table, extending it as needed, returning tuples of
+        (measure_scheme, start_beat). (Equivalent to :func:`QuantizationScheme.measure_scheme_iterator`.)
+        """
+        for i in itertools.count():
+            yield self.get_measure(i)
+
+    def beat_scheme_iterator(self) -> Iterator[tuple[BeatQuantizationScheme, float]]:
+        """
+        Iterates through the beats in the table, extending it as needed, returning tuples of (beat_scheme, start_beat).
+        (Equivalent to :func:`QuantizationScheme.beat_scheme_iterator`.)
+        """
+        for i in itertools.count():
+            yield self.get_beat(i)
+
+    def get_divisor_table(self, beat_scheme: BeatQuantizationScheme) -> DivisorTable:
+        """
+        Returns the :class:`DivisorTable` for the given beat scheme, constructing it the first time it is asked for.
+        """
+        if id(beat_scheme) not in self._divisor_tables:
+            divisors = tuple(divisor for divisor, _ in beat_scheme.quantization_divisions)
+            # we hold on to the beat scheme too, so that its id can't be reused by a different object
+            self._divisor_tables[id(beat_scheme)] = beat_scheme, DivisorTable(
+                divisors,
+                np.array([undesirability for _, undesirability in beat_scheme.quantization_divisions], dtype=float),
+                beat_scheme.length / np.array(divisors, dtype=float)
+            )
+        return self._divisor_tables[id(beat_scheme)][1]
+
 
 ##################################################################################################################
 #                                             Quantization Records
@@ -716,6 +872,211 @@ class QuantizationRecord(SavesToJSON):
         )
 
 
+##################################################################################################################
+#                                           Incremental Quantization
+##################################################################################################################
+
+
+class IncrementalQuantizer:
+    """
+    Quantizes notes as they come in, rather than all at once at the end, finalizing each measure as soon as nothing
+    still to come could affect it. This allows a long live transcription to be turned into notation as it goes, a
+    measure or two behind the playing, without having to hold on to all of the notes. (See the `quantizer` argument
+    of :func:`~scamp.transcriber.Transcriber.start_transcribing`.)
+
+    Notes are added with :func:`add_note`, in any order, and each voice is quantized separately, as in
+    :func:`~scamp.performance.Performance.quantize`. Since notes generally arrive only once they have finished, the
+    quantizer has to be told, by calling :func:`advance`, the earliest beat at which anything still to be added could
+    start; every measure ending by then is finalized. The measures, and the divisors chosen for their beats, are the
+    same as those that quantizing all of the notes at once would have produced. To that end, measures that start
+    after every note so far has ended are held back until more notes arrive (and dropped by :func:`finish` if none
+    do), as is the measure before them while there are notes that could still turn out to end right at its end.
+
+    :param quantization_scheme: the QuantizationScheme to use
+    :param on_measure: function called for each finalized measure as `on_measure(voice, quantized_measure, notes)`,
+        where `voice` is the voice given to :func:`add_note`, `quantized_measure` is a :class:`QuantizedMeasure`, and
+        `notes` is a list of the notes that became fully quantized when that measure was finalized (i.e. those that
+        end in it), with simultaneous notes merged into chords. If None, these tuples are appended to
+        `finalized_measures` instead.
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :ivar finalized_measures: list of (voice, quantized_measure, notes) tuples for the finalized measures, if no
+        `on_measure` function was given. (Clear it out as you go to keep memory use bounded.)
+    """
+
+    def __init__(self, quantization_scheme: QuantizationScheme, on_measure: Callable = None,
+                 onset_weighting: float = "default", termination_weighting: float = "default",
+                 inner_split_weighting: float = "default"):
+        if not isinstance(quantization_scheme, QuantizationScheme):
+            raise ValueError("Couldn't understand quantization scheme.")
+        self.quantization_scheme = quantization_scheme
+        self.on_measure = on_measure
+        self.weightings = (
+            quantization_settings.onset_weighting if onset_weighting == "default" else onset_weighting,
+            quantization_settings.termination_weighting if termination_weighting == "default"
+            else termination_weighting,
+            quantization_settings.inner_split_weighting if inner_split_weighting == "default"
+            else inner_split_weighting
+        )
+        self.finalized_measures = []
+        self._voices = {}
+
+    def add_note(self, note: PerformanceNote, voice: Hashable = "_unspecified_") -> None:
+        """
+        Adds a note to be quantized. The note is quantized in place, and is handed back (via `on_measure` or
+        `finalized_measures`) once the measure in which it ends has been finalized.
+
+        :param note: the PerformanceNote to quantize
+        :param voice: any hashable value identifying the voice that the note belongs to
+        """
+        if voice not in self._voices:
+            self._voices[voice] = _IncrementalVoiceQuantizer(self.quantization_scheme.compile(), self.weightings)
+        self._voices[voice].add_note(note)
+
+    def advance(self, beat: float) -> None:
+        """
+        Declares that nothing still to be added starts before the given beat, finalizing every measure that ends by
+        then (in every voice).
+
+        :param beat: the earliest beat at which any note still to be added could start
+        """
+        for voice, voice_quantizer in self._voices.items():
+            while voice_quantizer.next_measure_end <= beat:
+                self._finalize_next_measure(voice, voice_quantizer)
+
+    def finish(self) -> None:
+        """
+        Finalizes as many measures as it takes for every note added so far to be fully quantized.
+        """
+        for voice, voice_quantizer in self._voices.items():
+            while voice_quantizer.has_pending_events():
+                self._finalize_next_measure(voice, voice_quantizer)
+            held_back = voice_quantizer.held_back_measures
+            num_needed = sum(1 for quantized_measure, _ in held_back
+                             if quantized_measure.start_beat < voice_quantizer.end_beat)
+            if num_needed == 0 and any(len(notes) > 0 for _, notes in held_back):
+                num_needed = 1
+            # Like in _construct_quantization_record, we avoid final measures that start after every note has ended.
+            # (Any notes in them ended right at the start, having had their termination quantized in the first beat,
+            # so they are handed back with the last measure that is needed instead.)
+            for _, notes in held_back[num_needed:]:
+                held_back[num_needed - 1][1].extend(notes)
+            for quantized_measure, notes in held_back[:num_needed]:
+                self._emit(voice, quantized_measure, notes)
+            held_back.clear()
+
+    def _finalize_next_measure(self, voice, voice_quantizer):
+        """
+        Finalizes the next measure of the given voice. Measures that start after every note so far has ended are held
+        back, since they won't be needed if no more notes come. So is the last of the other measures, if there are
+        notes (still to come, or in those held back measures) that might end right at its end, so that these notes
+        can be handed back along with it.
+        """
+        voice_quantizer.held_back_measures.append(voice_quantizer.finalize_next_measure())
+        held_back = voice_quantizer.held_back_measures
+        num_needed = sum(1 for quantized_measure, _ in held_back
+                         if quantized_measure.start_beat < voice_quantizer.end_beat)
+        notes_to_hand_back = voice_quantizer.has_pending_events() or \
+            any(len(notes) > 0 for _, notes in held_back[num_needed:])
+        num_to_emit = num_needed - 1 if notes_to_hand_back else num_needed
+        for quantized_measure, notes in held_back[:max(num_to_emit, 0)]:
+            self._emit(voice, quantized_measure, notes)
+        del held_back[:max(num_to_emit, 0)]
+
+    def _emit(self, voice, quantized_measure, notes):
+        notes.sort(key=lambda note: note.start_beat)
+        _collapse_chords(notes)
+        if self.on_measure is not None:
+            self.on_measure(voice, quantized_measure, notes)
+        else:
+            self.finalized_measures.append((voice, quantized_measure, notes))
+
+
+class _IncrementalVoiceQuantizer:
+    """
+    Keeps track of the incremental quantization of a single voice for the :class:`IncrementalQuantizer`. The onsets,
+    terminations and inner splits of notes that have been added are kept in sorted lists until the measure that they
+    fall in is finalized.
+    """
+
+    def __init__(self, compiled_scheme, weightings):
+        self.compiled_scheme = compiled_scheme
+        self.weightings = weightings
+        self._measure_scheme_iterator = compiled_scheme.measure_scheme_iterator()
+        self._next_measure_scheme, self._next_measure_start = next(self._measure_scheme_iterator)
+        self._onsets, self._terminations, self._inner_splits = [], [], []
+        # the latest quantized end of any note so far, and the finalized measures that haven't been handed back yet
+        # (see IncrementalQuantizer._finalize_next_measure)
+        self.end_beat = 0
+        self.held_back_measures = []
+
+    @property
+    def next_measure_end(self):
+        return self._next_measure_start + self._next_measure_scheme.length
+
+    def has_pending_events(self):
+        return len(self._onsets) + len(self._terminations) + len(self._inner_splits) > 0
+
+    def add_note(self, note):
+        if engraving_settings.glissandi.control_point_policy == "split":
+            note._divide_length_at_gliss_control_points()
+
+        if note.start_beat < self._next_measure_start:
+            logging.warning(f"Note starting at beat {note.start_beat} was added to an IncrementalQuantizer after "
+                            f"its measure was finalized; quantizing it in the next measure instead.")
+
+        bisect.insort(self._onsets, (note.start_beat, note), key=_event_time)
+        bisect.insort(self._terminations, (note.start_beat + note.length_sum(), note), key=_event_time)
+        if hasattr(note.length, "__len__"):
+            t = note.start_beat
+            for length_segment in note.length[:-1]:
+                t += length_segment
+                bisect.insort(self._inner_splits, (t, note), key=_event_time)
+
+    def finalize_next_measure(self):
+        """
+        Quantizes the events in the next measure, returning the resulting QuantizedMeasure and the notes that ended in
+        the measure, and were therefore fully quantized.
+        """
+        measure_scheme, measure_start = self._next_measure_scheme, self._next_measure_start
+        beats = []
+        t = measure_start
+        for beat_scheme in measure_scheme.beat_schemes:
+            beat_end = t + beat_scheme.length
+            beats.append((beat_scheme, t, _take_events_before(self._onsets, beat_end),
+                          _take_events_before(self._terminations, beat_end),
+                          _take_events_before(self._inner_splits, beat_end)))
+            t = beat_end
+
+        beat_divisors = _get_best_divisors_for_beats(beats, self.compiled_scheme, *self.weightings)
+        _quantize_beats(beats, beat_divisors)
+
+        # every note's termination comes after its onset and inner splits, so once it has been quantized, the note
+        # is done with
+        finished_notes = [note for beat in beats for _, note in beat[3]]
+        for note in finished_notes:
+            _finish_quantizing_note(note)
+            self.end_beat = max(note.end_beat, self.end_beat)
+
+        self._next_measure_scheme, self._next_measure_start = next(self._measure_scheme_iterator)
+        return _construct_quantized_measure(measure_scheme, measure_start, beat_divisors), finished_notes
+
+
+def _event_time(event):
+    return event[0]
+
+
+def _take_events_before(events, beat):
+    """
+    Removes and returns all of the events (sorted (time, note) tuples) that occur before the given beat.
+    """
+    num_events_before = bisect.bisect_left(events, beat, key=_event_time)
+    taken_events = events[:num_events_before]
+    del events[:num_events_before]
+    return taken_events
+
+
 ##################################################################################################################
 #                                           Quantization functions
 ##################################################################################################################
@@ -723,7 +1084,7 @@ class QuantizationRecord(SavesToJSON):
 
 def quantize_performance_part(part: PerformancePart, quantization_scheme: QuantizationScheme,
                               onset_weighting: float = "default",  termination_weighting: float = "default",
-                              inner_split_weighting: float = "default"):
+                              inner_split_weighting: float = "default", parallel: bool | int = False):
     """
     Quantizes a performance part (in place) and sets its voice_quantization_records
 
@@ -732,21 +1093,90 @@ def quantize_performance_part(part: PerformancePart, quantization_scheme: Quanti
     :param onset_weighting: How much do we care about accurate onsets
     :param termination_weighting: How much do we care about accurate terminations
     :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :param parallel: if True, quantize the voices in a pool of worker processes, one per CPU; if an integer, use that
+        many worker processes. (See :func:`quantize_performance_parts`.)
     :return: a QuantizationRecord, detailing all of the time signatures, beat divisions selected, etc.
     """
+    quantize_performance_parts([part], quantization_scheme, onset_weighting, termination_weighting,
+                               inner_split_weighting, parallel)
+
+
+def quantize_performance_parts(parts: Sequence[PerformancePart], quantization_scheme: QuantizationScheme,
+                               onset_weighting: float = "default",  termination_weighting: float = "default",
+                               inner_split_weighting: float = "default", parallel: bool | int = False):
+    """
+    Quantizes several performance parts (in place) and sets their voice_quantization_records. Each voice is quantized
+    independently, so when `parallel` is set, the voices of all the parts are shared out among a pool of worker
+    processes. The result is identical to quantizing them one after the other (though the notes' properties objects
+    are replaced by the copies that come back from the workers).
+
+    Note that on platforms where worker processes are spawned rather than forked, the calling script has to be
+    importable without side effects (i.e. its top-level code should be inside an `if __name__ == '__main__':` block).
+
+    :param parts: a list of PerformanceParts
+    :param quantization_scheme: a QuantizationScheme
+    :param onset_weighting: How much do we care about accurate onsets
+    :param termination_weighting: How much do we care about accurate terminations
+    :param inner_split_weighting: How much do we care about inner segmentation timing (e.g. tuple note lengths)
+    :param parallel: if True, quantize the voices in a pool of worker processes, one per CPU; if an integer, use that
+        many worker processes. If False (the default), or if there's only one voice, everything happens in this
+        process.
+    """
     if not isinstance(quantization_scheme, QuantizationScheme):
         raise ValueError("Couldn't understand quantization scheme.")
 
-    part.voice_quantization_records = {}
-
-    for voice_name, voice in list(part.voices.items()):
-        quantization_record = _quantize_performance_voice(voice, quantization_scheme,
-                                                          onset_weighting, termination_weighting, inner_split_weighting)
-        # make any simultaneous notes in the part chords
-        _collapse_chords(voice)
-        # break the voice into a list of non-overlapping voices. If there was no overlap, this has length 1
-        non_overlapping_voices = _separate_into_non_overlapping_voices(voice)
+    from .performance import ColumnarVoice
+    for part in parts:
+        for voice_name, voice in part.voices.items():
+            if isinstance(voice, ColumnarVoice):
+                # notes in a columnar voice share their properties objects, which quantization alters, so
+                # quantization works on ordinary notes instead
+                part.voices[voice_name] = voice.to_notes()
+
+    parts_and_voices = [(part, voice_name, voice) for part in parts for voice_name, voice in list(part.voices.items())]
+    num_workers = min(len(parts_and_voices), (os.cpu_count() or 1) if parallel is True else int(parallel))
+
+    for part in parts:
+        part.voice_quantization_records = {}
+        # quantization moves notes around and replaces the voices
+        part.invalidate_note_index()
+
+    if num_workers > 1:
+        # send each voice to the workers in a compact form, as a list of (start_beat, length, pitch, volume,
+        # properties) tuples, and get back the separated voices as lists of (original index, start_beat, length,
+        # pitch, volume, properties) tuples along with the quantization record
+        voices_data = [[(note.start_beat, note.length, note.pitch, note.volume, note.properties) for note in voice]
+                       for _, _, voice in parts_and_voices]
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_initialize_quantization_worker,
+                                 initargs=(quantization_settings, engraving_settings)) as executor:
+            results = list(executor.map(
+                _quantize_voice_data, voices_data, *(itertools.repeat(x) for x in (
+                    quantization_scheme, onset_weighting, termination_weighting, inner_split_weighting
+                )), chunksize=max(1, len(voices_data) // (4 * num_workers))
+            ))
+
+        quantized_voices = []
+        for (_, _, voice), (separated_voices_data, quantization_record) in zip(parts_and_voices, results):
+            separated_voices = []
+            for separated_voice_data in separated_voices_data:
+                separated_voice = []
+                for index, start_beat, length, pitch, volume, properties in separated_voice_data:
+                    # update the original note objects, so that they are the ones that end up in the part
+                    note = voice[index]
+                    note.start_beat, note.length, note.pitch, note.volume, note.properties = \
+                        start_beat, length, pitch, volume, properties
+                    separated_voice.append(note)
+                separated_voices.append(separated_voice)
+            quantized_voices.append((separated_voices, quantization_record))
+    else:
+        quantized_voices = [
+            _quantize_and_separate_voice(voice, quantization_scheme, onset_weighting, termination_weighting,
+                                         inner_split_weighting)
+            for _, _, voice in parts_and_voices
+        ]
 
+    for (part, voice_name, _), (non_overlapping_voices, quantization_record) in zip(parts_and_voices,
+                                                                                    quantized_voices):
         for i, new_voice in enumerate(non_overlapping_voices):
             if i == 0:
                 # the first of the non-overlapping voices just retains the old voice name
@@ -765,6 +1195,48 @@ def quantize_performance_part(part: PerformancePart, quantization_scheme: Quanti
             part.voice_quantization_records[new_voice_name] = quantization_record
 
 
+def _quantize_and_separate_voice(voice, quantization_scheme, onset_weighting, termination_weighting,
+                                 inner_split_weighting):
+    """
+    Quantizes a voice (modifying notes in place), merges simultaneous notes into chords, and splits it up into
+    non-overlapping voices.
+
+    :return: tuple of (list of non-overlapping voices, QuantizationRecord)
+    """
+    quantization_record = _quantize_performance_voice(voice, quantization_scheme,
+                                                      onset_weighting, termination_weighting, inner_split_weighting)
+    # make any simultaneous notes in the part chords
+    _collapse_chords(voice)
+    # break the voice into a list of non-overlapping voices. If there was no overlap, this has length 1
+    return _separate_into_non_overlapping_voices(voice), quantization_record
+
+
+def _initialize_quantization_worker(parent_quantization_settings, parent_engraving_settings):
+    # worker processes load their settings fresh from the settings files, so bring them in line with the settings
+    # in the parent process, which may have been altered by the script
+    quantization_settings.__dict__.update(parent_quantization_settings.__dict__)
+    engraving_settings.__dict__.update(parent_engraving_settings.__dict__)
+
+
+def _quantize_voice_data(voice_data, quantization_scheme, onset_weighting, termination_weighting,
+                         inner_split_weighting):
+    """
+    Runs in a worker process: reconstructs a voice sent in the compact form used by
+    :func:`quantize_performance_parts`, quantizes and separates it, and returns the result in compact form.
+    """
+    from .performance import PerformanceNote
+    voice = [PerformanceNote(*note_data) for note_data in voice_data]
+    original_indices = {id(note): i for i, note in enumerate(voice)}
+    separated_voices, quantization_record = _quantize_and_separate_voice(
+        voice, quantization_scheme, onset_weighting, termination_weighting, inner_split_weighting
+    )
+    return [
+        [(original_indices[id(note)], note.start_beat, note.length, note.pitch, note.volume, note.properties)
+         for note in separated_voice]
+        for separated_voice in separated_voices
+    ], quantization_record
+
+
 def _quantize_performance_voice(voice, quantization_scheme, onset_weighting="default", termination_weighting="default",
                                 inner_split_weighting="default"):
     """
@@ -807,40 +1279,71 @@ def _quantize_performance_voice(voice, quantization_scheme, onset_weighting="def
     raw_terminations.sort(key=lambda x: x[0])
     raw_inner_splits.sort(key=lambda x: x[0])
 
-    beat_scheme_iterator = quantization_scheme.beat_scheme_iterator()
-    beat_divisors = []
+    compiled_scheme = quantization_scheme.compile()
+    beat_scheme_iterator = compiled_scheme.beat_scheme_iterator()
+    # (beat scheme, beat start, onsets, terminations, inner splits) for each beat
+    beats = []
+
+    # how far we've gotten through each of the sorted lists of events
+    onset_index = termination_index = inner_split_index = 0
 
-    while len(raw_onsets) + len(raw_inner_splits) + len(raw_terminations) > 0:
-        # First, use all the onsets, inner splits, and terminations in this beat to determine the best divisor
+    while onset_index < len(raw_onsets) or termination_index < len(raw_terminations) \
+            or inner_split_index < len(raw_inner_splits):
+        # First, gather up all the onsets, inner splits, and terminations in this beat
         beat_scheme, beat_start = next(beat_scheme_iterator)
         assert isinstance(beat_scheme, BeatQuantizationScheme)
         beat_end = beat_start + beat_scheme.length
 
         # find the onsets in this beat
-        onsets_in_this_beat = []
-        while len(raw_onsets) > 0 and raw_onsets[0][0] < beat_end:
-            onsets_in_this_beat.append(raw_onsets.pop(0))
+        beat_start_index = onset_index
+        while onset_index < len(raw_onsets) and raw_onsets[onset_index][0] < beat_end:
+            onset_index += 1
+        onsets_in_this_beat = raw_onsets[beat_start_index:onset_index]
 
         # find the terminations in this beat
-        terminations_in_this_beat = []
-        while len(raw_terminations) > 0 and raw_terminations[0][0] < beat_end:
-            terminations_in_this_beat.append(raw_terminations.pop(0))
+        beat_start_index = termination_index
+        while termination_index < len(raw_terminations) and raw_terminations[termination_index][0] < beat_end:
+            termination_index += 1
+        terminations_in_this_beat = raw_terminations[beat_start_index:termination_index]
 
         # find the inner splits in this beat
-        inner_splits_in_this_beat = []
-        while len(raw_inner_splits) > 0 and raw_inner_splits[0][0] < beat_end:
-            inner_splits_in_this_beat.append(raw_inner_splits.pop(0))
+        beat_start_index = inner_split_index
+        while inner_split_index < len(raw_inner_splits) and raw_inner_splits[inner_split_index][0] < beat_end:
+            inner_split_index += 1
+        inner_splits_in_this_beat = raw_inner_splits[beat_start_index:inner_split_index]
+
+        beats.append((beat_scheme, beat_start, onsets_in_this_beat, terminations_in_this_beat,
+                      inner_splits_in_this_beat))
+
+    # Use all the onsets, inner splits, and terminations in each beat to determine the best divisor for it
+    # (this is done for all the beats at once, since it's much faster that way)
+    beat_divisors = _get_best_divisors_for_beats(beats, compiled_scheme, onset_weighting, termination_weighting,
+                                                 inner_split_weighting)
+
+    _quantize_beats(beats, beat_divisors)
+
+    last_note_end_beat = 0
+    for note in voice:
+        _finish_quantizing_note(note)
+        last_note_end_beat = max(note.end_beat, last_note_end_beat)
+
+    return _construct_quantization_record(beat_divisors, last_note_end_beat, compiled_scheme)
+
 
-        if len(onsets_in_this_beat) + len(terminations_in_this_beat) + len(inner_splits_in_this_beat) == 0:
+def _quantize_beats(beats, beat_divisors):
+    """
+    Quantizes (in place) the notes that start, end or have inner splits in the given beats, using the given divisors.
+
+    :param beats: list of (beat scheme, beat start, onsets, terminations, inner splits) tuples, as passed to
+        :func:`_get_best_divisors_for_beats`
+    :param beat_divisors: the divisor chosen for each beat
+    """
+    for (beat_scheme, beat_start, onsets_in_this_beat, terminations_in_this_beat, inner_splits_in_this_beat), \
+            best_divisor in zip(beats, beat_divisors):
+        if best_divisor is None:
             # an empty beat, nothing to see here
-            beat_divisors.append(None)
             continue
-
-        best_divisor = _get_best_divisor_for_beat(
-            beat_scheme, beat_start, onsets_in_this_beat, terminations_in_this_beat, inner_splits_in_this_beat,
-            onset_weighting, termination_weighting, inner_split_weighting
-        )
-        beat_divisors.append(best_divisor)
+        beat_end = beat_start + beat_scheme.length
 
         # Now, quantize all of the notes that start or end in this beat accordingly
         division_length = beat_scheme.length / best_divisor
@@ -877,28 +1380,25 @@ def _quantize_performance_voice(voice, quantization_scheme, onset_weighting="def
             else:
                 note.properties.temp["split_points"] = [quantized_split_beat]
 
-    last_note_end_beat = 0
-    for note in voice:
-        # now that all the start and end points have been adjusted,
-        # we implement the quantized split points where applicable
-        if "split_points" in note.properties.temp:
-            last_split_point = note.start_beat
-            new_lengths = []
-            for split_point in sorted(note.properties.temp["split_points"]):
-                if round(split_point - last_split_point, 10) > 0:
-                    new_lengths.append(split_point - last_split_point)
-                last_split_point = split_point
-            if round(note.end_beat - last_split_point, 10) > 0:
-                new_lengths.append(note.end_beat - last_split_point)
-            note.length = tuple(new_lengths)
-
-        last_note_end_beat = max(note.end_beat, last_note_end_beat)
 
-        # also normalize the pitch envelopes
-        if isinstance(note.pitch, Envelope):
-            note.pitch.normalize_to_duration(note.length_sum())
+def _finish_quantizing_note(note):
+    """
+    Once all of a note's start, end and inner split points have been quantized, implements the quantized split
+    points (where applicable) and normalizes its pitch envelope to its new length.
+    """
+    if "split_points" in note.properties.temp:
+        last_split_point = note.start_beat
+        new_lengths = []
+        for split_point in sorted(note.properties.temp["split_points"]):
+            if round(split_point - last_split_point, 10) > 0:
+                new_lengths.append(split_point - last_split_point)
+            last_split_point = split_point
+        if round(note.end_beat - last_split_point, 10) > 0:
+            new_lengths.append(note.end_beat - last_split_point)
+        note.length = tuple(new_lengths)
 
-    return _construct_quantization_record(beat_divisors, last_note_end_beat, quantization_scheme)
+    if isinstance(note.pitch, Envelope):
+        note.pitch.normalize_to_duration(note.length_sum())
 
 
 def _collapse_chords(notes):
@@ -908,15 +1408,15 @@ def _collapse_chords(notes):
 
     :param notes: a list of PerformanceNotes
     """
-    i = 1
-    while i < len(notes):
-        if notes[i - 1].attempt_chord_merger_with(notes[i]):
-            # if the merger is successful, notes[i] has been incorporated into notes[i-1]
-            # so we can simply pop notes[i] and not increment
-            notes.pop(i)
-        else:
-            # otherwise, since the merger fails, we simply increment i
-            i += 1
+    if len(notes) == 0:
+        return
+    collapsed_notes = [notes[0]]
+    for note in notes[1:]:
+        # if the merger is successful, note has been incorporated into the previous note, so we leave it out;
+        # otherwise it becomes the note that subsequent notes try to merge with
+        if not collapsed_notes[-1].attempt_chord_merger_with(note):
+            collapsed_notes.append(note)
+    notes[:] = collapsed_notes
 
 
 def _separate_into_non_overlapping_voices(notes, max_overlap=1e-10):
@@ -944,48 +1444,62 @@ def _separate_into_non_overlapping_voices(notes, max_overlap=1e-10):
     return voices
 
 
-def _get_best_divisor_for_beat(beat_scheme, beat_start_time, onsets_in_beat, terminations_in_beat, inner_splits_in_beat,
-                               onset_weighting, termination_weighting, inner_split_weighting):
-    # try out each quantization division of a beat and return the best fit
-    best_divisor = None
-    best_error = float("inf")
-
-    for divisor, undesirability in beat_scheme.quantization_divisions:
-        division_length = beat_scheme.length / divisor
-        total_squared_onset_error = 0
-        total_squared_termination_error = 0
-        total_squared_inner_split_error = 0
-
-        for onset in onsets_in_beat:
-            time_since_beat_start = onset[0] - beat_start_time
-            # squared distance from closest division of the beat
-            total_squared_onset_error += \
-                (time_since_beat_start - round_to_multiple(time_since_beat_start, division_length)) ** 2
-
-        for termination in terminations_in_beat:
-            time_since_beat_start = termination[0] - beat_start_time
-            # squared distance from closest division of the beat
-            total_squared_termination_error += \
-                (time_since_beat_start - round_to_multiple(time_since_beat_start, division_length)) ** 2
-
-        for inner_split in inner_splits_in_beat:
-            time_since_beat_start = inner_split[0] - beat_start_time
-            # squared distance from closest division of the beat
-            total_squared_inner_split_error += \
-                (time_since_beat_start - round_to_multiple(time_since_beat_start, division_length)) ** 2
-
-        this_div_error_score = undesirability * (termination_weighting * total_squared_termination_error +
-                                                 onset_weighting * total_squared_onset_error +
-                                                 inner_split_weighting * total_squared_inner_split_error)
-
-        if this_div_error_score < best_error:
-            best_divisor = divisor
-            best_error = this_div_error_score
-
-    return best_divisor
-
-
-def _construct_quantization_record(beat_divisors, end_beat, quantization_scheme):
+def _get_best_divisors_for_beats(beats, compiled_scheme, onset_weighting, termination_weighting,
+                                 inner_split_weighting):
+    """
+    Finds the best divisor for each of the given beats, i.e. the one that minimizes the weighted squared error of
+    quantizing its onsets, terminations and inner splits, multiplied by the divisor's undesirability. All beats that
+    share a BeatQuantizationScheme are done together, by building a matrix of the squared error for every event (row)
+    and divisor (column) and adding up the rows for each beat.
+
+    :param beats: list of (beat scheme, beat start, onsets, terminations, inner splits) tuples, where the last three
+        are lists of (time, note) tuples
+    :param compiled_scheme: the CompiledQuantizationScheme from which to get the divisor tables for the beat schemes
+    :return: list of the best divisor for each beat, or None for beats with nothing in them
+    """
+    best_divisors = [None] * len(beats)
+
+    beat_indices_by_scheme = {}
+    for i, (beat_scheme, _, onsets, terminations, inner_splits) in enumerate(beats):
+        if len(onsets) + len(terminations) + len(inner_splits) > 0:
+            beat_indices_by_scheme.setdefault(id(beat_scheme), (beat_scheme, []))[1].append(i)
+
+    for beat_scheme, beat_indices in beat_indices_by_scheme.values():
+        divisors, undesirabilities, division_lengths = compiled_scheme.get_divisor_table(beat_scheme)
+
+        def total_squared_errors(which_events):
+            # an (events x divisors) matrix of the squared distance from each event to the closest division of its beat
+            times_since_beat_start, counts = [], []
+            for i in beat_indices:
+                beat_start, events = beats[i][1], beats[i][which_events]
+                times_since_beat_start.extend(event[0] - beat_start for event in events)
+                counts.append(len(events))
+            times_since_beat_start = np.array(times_since_beat_start, dtype=float)[:, np.newaxis]
+            squared_errors = \
+                (times_since_beat_start - np.rint(times_since_beat_start / division_lengths) * division_lengths) ** 2
+
+            # add up the rows for each beat. We add the first event of every beat, then the second event of every
+            # beat that has one, and so on, so that each total is added up in the same order as a simple loop would.
+            counts = np.array(counts, dtype=int)
+            first_rows = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            totals = np.zeros((len(beat_indices), len(divisors)))
+            for k in range(counts.max(initial=0)):
+                has_kth_event = counts > k
+                totals[has_kth_event] += squared_errors[first_rows[has_kth_event] + k]
+            return totals
+
+        error_scores = undesirabilities * (termination_weighting * total_squared_errors(3) +
+                                           onset_weighting * total_squared_errors(2) +
+                                           inner_split_weighting * total_squared_errors(4))
+
+        # argmin picks the first of any tied divisors
+        for i, best_divisor_index in zip(beat_indices, np.argmin(error_scores, axis=1)):
+            best_divisors[i] = divisors[best_divisor_index]
+
+    return best_divisors
+
+
+def _construct_quantization_record(beat_divisors, end_beat, compiled_scheme):
     """
     Constructs a QuantizationRecord from the given scheme and divisors
 
@@ -994,49 +1508,67 @@ def _construct_quantization_record(beat_divisors, end_beat, quantization_scheme)
         In this case, it's termination gets quantized in the first beat of the next measure, so we have a beat divisor
         in that measure but no actual notes there. By checking if we've hit the end_beat we can avoid constructing
         that extra measure.
-    :param quantization_scheme: the quantization scheme being used
+    :param compiled_scheme: the (compiled) quantization scheme being used
     :return: a QuantizationRecord
     """
     assert isinstance(beat_divisors, list)
     quantized_measures = []
+    # how many of the beat divisors we've used up
+    beat_index = 0
 
-    for measure_scheme, t in quantization_scheme.measure_scheme_iterator():
-        measure_start_beat = t
-        beats = []
-        # min_duple_subdivision is used to figure out the tiniest duple slice we break the beats into
-        # We use it to calculate beat depths, i.e. how nested in the hierarchy the different time points are
-        min_duple_subdivision = float("inf")
-
-        for beat_scheme in measure_scheme.beat_schemes:
-            divisor = beat_divisors.pop(0) if len(beat_divisors) > 0 else None
-            beats.append(
-                QuantizedBeat(t, t - measure_start_beat, beat_scheme.length, divisor)
-            )
-            if divisor is not None:
-                # look at the slices we cut the beat into
-                subdivision_length = beat_scheme.length / divisor
-                # in case the subdivision length is 3/16 or something like that, turn it into 1/16. (This can happen
-                # if we're in a compound time signature, dividing 1.5 into 8 or something, and not allowing that to
-                # be expressed as a tuplet.)
-                subdivision_length /= Fraction(subdivision_length).limit_denominator().numerator
-                # if the subdivision length is a power of 2, make min_duple_subdivision at least that fine
-                if is_x_pow_of_y(subdivision_length, 2) and subdivision_length < min_duple_subdivision:
-                    min_duple_subdivision = subdivision_length
-
-            # at bare minimum, min_duple_subdivision, must be as fine as the denominator of the beat length
-            # e.g. if the beat length is 0.75, we need min_duple_subdivision to be no bigger than 0.25
-            if 1 / beat_scheme.length_as_fraction.denominator < min_duple_subdivision:
-                min_duple_subdivision = 1 / beat_scheme.length_as_fraction.denominator
-
-            t += beat_scheme.length
-
-        beat_depths = (0.5, measure_scheme.get_beat_hierarchies(0.5)) if min_duple_subdivision > 0.5 \
-            else (min_duple_subdivision, measure_scheme.get_beat_hierarchies(min_duple_subdivision))
-
-        quantized_measure = QuantizedMeasure(measure_start_beat, measure_scheme.length, beats,
-                                             measure_scheme.time_signature, beat_depths)
+    for measure_scheme, t in compiled_scheme.measure_scheme_iterator():
+        num_beats = len(measure_scheme.beat_schemes)
+        measure_divisors = beat_divisors[beat_index:beat_index + num_beats]
+        measure_divisors.extend([None] * (num_beats - len(measure_divisors)))
+        beat_index += num_beats
 
+        quantized_measure = _construct_quantized_measure(measure_scheme, t, measure_divisors)
         quantized_measures.append(quantized_measure)
 
-        if len(beat_divisors) == 0 or t >= end_beat:
+        last_beat = quantized_measure.beats[-1]
+        if beat_index >= len(beat_divisors) or last_beat.start_beat + last_beat.length >= end_beat:
             return QuantizationRecord(quantized_measures)
+
+
+def _construct_quantized_measure(measure_scheme, measure_start_beat, beat_divisors):
+    """
+    Constructs a QuantizedMeasure from the given measure scheme and the divisors chosen for its beats
+
+    :param measure_scheme: the MeasureQuantizationScheme for this measure
+    :param measure_start_beat: the beat at which the measure starts
+    :param beat_divisors: the divisor chosen for each beat of the measure (None for empty beats)
+    :return: a QuantizedMeasure
+    """
+    t = measure_start_beat
+    beats = []
+    # min_duple_subdivision is used to figure out the tiniest duple slice we break the beats into
+    # We use it to calculate beat depths, i.e. how nested in the hierarchy the different time points are
+    min_duple_subdivision = float("inf")
+
+    for beat_scheme, divisor in zip(measure_scheme.beat_schemes, beat_divisors):
+        beats.append(
+            QuantizedBeat(t, t - measure_start_beat, beat_scheme.length, divisor)
+        )
+        if divisor is not None:
+            # look at the slices we cut the beat into
+            subdivision_length = beat_scheme.length / divisor
+            # in case the subdivision length is 3/16 or something like that, turn it into 1/16. (This can happen
+            # if we're in a compound time signature, dividing 1.5 into 8 or something, and not allowing that to
+            # be expressed as a tuplet.)
+            subdivision_length /= Fraction(subdivision_length).limit_denominator().numerator
+            # if the subdivision length is a power of 2, make min_duple_subdivision at least that fine
+            if is_x_pow_of_y(subdivision_length, 2) and subdivision_length < min_duple_subdivision:
+                min_duple_subdivision = subdivision_length
+
+        # at bare minimum, min_duple_subdivision, must be as fine as the denominator of the beat length
+        # e.g. if the beat length is 0.75, we need min_duple_subdivision to be no bigger than 0.25
+        if 1 / beat_scheme.length_as_fraction.denominator < min_duple_subdivision:
+            min_duple_subdivision = 1 / beat_scheme.length_as_fraction.denominator
+
+        t += beat_scheme.length
+
+    beat_depths = (0.5, measure_scheme.get_beat_hierarchies(0.5)) if min_duple_subdivision > 0.5 \
+        else (min_duple_subdivision, measure_scheme.get_beat_hierarchies(min_duple_subdivision))
+
+    return QuantizedMeasure(measure_start_beat, measure_scheme.length, beats,
+                            measure_scheme.time_signature, beat_depths)
@@ -25,10 +25,11 @@ from numbers import Real
 from . import settings
 from .settings import quantization_settings, engraving_settings
 from expenvelope import Envelope
-from .quantization import QuantizationRecord, QuantizationScheme, QuantizedMeasure, TimeSignature
+from .quantization import QuantizationRecord, QuantizationScheme, QuantizedMeasure, TimeSignature, \
+    _initialize_quantization_worker
 from . import performance as performance_module  # to distinguish it from variables named performance
 from .utilities import prime_factor, floor_x_to_pow_of_y, is_x_pow_of_y, ceil_to_multiple, floor_to_multiple, \
-    beat_is_before
+    beat_is_before, memoize
 from ._engraving_translations import length_to_note_type, get_xml_notehead, get_lilypond_notehead_tweaks, \
     articulation_to_xml_element_name, notations_to_xml_notations_element, attach_abjad_notation_to_note, \
     xml_barline_to_lilypond
@@ -38,16 +39,21 @@ import pymusicxml
 from pymusicxml.score_components import _XMLNote, MusicXMLComponent
 from ._dependencies import get_abjad
 from . import _abjad_facade as af
+from . import _music_xml_streaming
+from ._music_xml_streaming import MusicXMLCache
 import math
 from fractions import Fraction
-from copy import deepcopy
-from itertools import accumulate, count
+from itertools import accumulate, count, islice
 import textwrap
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
 from collections import namedtuple
 from abc import ABC, abstractmethod
 import logging
+from xml.etree import ElementTree
 from ._metric_structure import MetricStructure
-from typing import Sequence, Type, Iterator, TYPE_CHECKING
+from typing import Sequence, Type, Iterator, TextIO, TYPE_CHECKING
 from clockblocks import TempoEnvelope
 from clockblocks.utilities import snap_float_to_nice_decimal
 
@@ -116,7 +122,9 @@ def _length_to_undotted_constituents(length):
     return length_parts
 
 
+@memoize
 def _get_beat_division_hierarchy(beat_length, beat_divisor, small_to_big=True):
+    # note: the returned tuples are shared between calls
     # In general, it's best to divide a beat into the smaller prime factors first. For instance, a 6 tuple is probably
     # easiest as two groups of 3 rather than 3 groups of 2. (This is definitely debatable and context dependent.)
     # An special case occurs when the beat naturally wants to divide a certain way. For instance, a beat of length 1.5
@@ -138,7 +146,33 @@ def _get_beat_division_hierarchy(beat_length, beat_divisor, small_to_big=True):
             # (Note that we sorted the natural factors from big to small so that the small ones get
             # pushed to the front last and end up at the very beginning of the queue)
 
-    return MetricStructure.from_string("*".join(str(x) for x in divisor_factors), True).get_beat_depths()
+    return tuple(MetricStructure.from_string("*".join(str(x) for x in divisor_factors), True).get_beat_depths())
+
+
+@memoize
+def _get_beat_division_hierarchies(beat_length, beat_divisor):
+    """
+    Returns the two candidate hierarchies for dividing a beat of the given length into beat_divisor parts: one going
+    from small to big prime factors, and one from big to small (so for one 6 is 3x2, for the other it's 2x3). Tuplet
+    divisions are made worse than duplet divisions in both. If they are identical (e.g. if there's only one type of
+    prime anyway), the second is None. The returned tuples are shared between calls.
+    """
+    beat_division_hierarchy = _get_beat_division_hierarchy(beat_length, beat_divisor)
+    beat_division_hierarchy2 = _get_beat_division_hierarchy(beat_length, beat_divisor, False)
+    # makes triplets get treated as worse than duplets
+    return tuple(_worsen_hierarchy_tuples(beat_division_hierarchy, in_place=False)), \
+        tuple(_worsen_hierarchy_tuples(beat_division_hierarchy2, in_place=False)) \
+        if beat_division_hierarchy2 != beat_division_hierarchy else None
+
+
+def _rhythm_spelling_settings_key():
+    """
+    The engraving settings that affect how a note is spelled within a beat. These form part of the key under which
+    spellings are memoized, so that changing the settings leads to fresh spellings rather than stale ones.
+    """
+    return (engraving_settings.max_dots_allowed, engraving_settings.beat_hierarchy_spacing,
+            engraving_settings.num_divisions_penalty, engraving_settings.rest_beat_hierarchy_spacing,
+            engraving_settings.rest_num_divisions_penalty)
 
 
 def _worsen_hierarchy_tuples(hierarchy, how_much=1, in_place=True):
@@ -177,15 +211,16 @@ def _worsen_hierarchy_tuples(hierarchy, how_much=1, in_place=True):
     return hierarchy
 
 
-# TODO: MEMOIZE THE SHIT OUT OF THIS!!!
+@memoize(key=lambda beat_hierarchy: tuple(beat_hierarchy))
 def _get_beat_division_grids(beat_hierarchy):
+    # note: the returned lists are shared between calls, and should not be altered
     out = []
     for thresh in range(max(beat_hierarchy)):
         out.append([x for x in range(len(beat_hierarchy)) if beat_hierarchy[x] <= thresh])
     return out
 
 
-# should maybe memoize?
+@memoize(maxsize=1024)
 def _is_single_note_viable_grouping(length_in_subdivisions, max_dots=1):
     """
     This tests if a note that is length_in_subdivisions subdivisions long can be represented by a single note.
@@ -316,6 +351,7 @@ def _get_num_bad_crossings(recombination_option, hierarchies):
         return sum(hierarchies[x] < threshold for x in range(start_segment+1, end_segment))
 
 
+@memoize(maxsize=1024)
 def _get_recombination_options(*component_lengths):
     if len(component_lengths) == 1:
         return component_lengths,
@@ -856,7 +892,7 @@ class Score(ScoreComponent, ScoreContainer):
                          quantization_scheme: QuantizationScheme = None, time_signature: str | Sequence = None,
                          bar_line_locations: Sequence[float] = None, max_divisor: int = None,
                          max_divisor_indigestibility: int = None, simplicity_preference: float = None,
-                         title: str = "default", composer: str = "default") -> Score:
+                         title: str = "default", composer: str = "default", parallel: bool | int = False) -> Score:
         """
         Builds a new Score from a Performance (list of note events in continuous time and pitch). In the process,
         the music must be quantized, for which two different options are available: one can either pass a
@@ -888,6 +924,8 @@ class Score(ScoreComponent, ScoreContainer):
             error) to infinity, with a typical value somewhere around 1.
         :param title: Title of the piece to be printed on the score.
         :param composer: Composer of the piece to be printed on the score.
+        :param parallel: if True, quantize the performance and construct the score's measures in a pool of worker
+            processes, one per CPU; if an integer, use that many worker processes. The resulting Score is the same.
         :return: the resulting Score object, which can then be rendered either as XML or LilyPond
         """
 
@@ -908,28 +946,32 @@ class Score(ScoreComponent, ScoreContainer):
                                  "can be defined, but not both.")
 
         return Score.from_quantized_performance(
-            performance if quantization_scheme is None else performance.quantized(quantization_scheme),
-            title=title, composer=composer
+            performance if quantization_scheme is None
+            else performance.quantized(quantization_scheme, parallel=parallel),
+            title=title, composer=composer, parallel=parallel
         )
 
     @classmethod
     def from_quantized_performance(cls, performance: performance_module.Performance,
-                                   title: str = "default", composer: str = "default") -> Score:
+                                   title: str = "default", composer: str = "default",
+                                   parallel: bool | int = False) -> Score:
         """
         Constructs a new Score from an already quantized Performance.
         
         :param performance: the quantized Performance to convert into a new score
         :param title: title to give the score
         :param composer: composer to put on the score
+        :param parallel: if True, construct the measures of all the parts in a pool of worker processes, one per CPU;
+            if an integer, use that many worker processes. The resulting Score is the same. (See
+            :func:`StaffGroup.from_quantized_performance_parts`.)
         """
         if not performance.is_quantized():
             raise ValueError("Performance was not quantized.")
+        # if this is an empty part, and we're not including empty parts, skip it
+        parts = [part for part in performance.parts
+                 if not (engraving_settings.ignore_empty_parts and part.num_measures() == 0)]
         contents = []
-        for part in performance.parts:
-            if engraving_settings.ignore_empty_parts and part.num_measures() == 0:
-                # if this is an empty part, and we're not including empty parts, skip it
-                continue
-            staff_group = StaffGroup.from_quantized_performance_part(part)
+        for staff_group in StaffGroup.from_quantized_performance_parts(parts, parallel=parallel):
             if len(staff_group.staves) > 1:
                 contents.append(staff_group)
             elif len(staff_group.staves) == 1:
@@ -1141,11 +1183,24 @@ class Score(ScoreComponent, ScoreContainer):
                 staff.measures[-1].barline = self.final_bar_line
 
         # go through and add all of the tempo marks to the xml score
+        for xml_measure, measure_annotations in zip(xml_score.parts[0].measures, self._get_xml_tempo_annotations()):
+            xml_measure.directions_with_displacements = measure_annotations
+        return xml_score
+
+    def _get_xml_tempo_annotations(self) -> list[list[tuple[pymusicxml.Direction, float]]]:
+        """
+        Works out the metronome marks, accel./rit. indications and guide marks to attach to the measures of the first
+        staff in the MusicXML output.
+
+        :return: a list, for each measure up to the last one with any annotations, of (direction, beat within measure)
+            tuples, sorted by beat within measure
+        """
         key_points, guide_marks = self._get_tempo_key_points_and_guide_marks()
+        annotations = []
 
         measure_start = 0  # running counter of the beat at the start of the measure
-        # go through each measure and add the tempo annotations
-        for xml_measure, score_measure in zip(xml_score.parts[0].measures, self.staves[0].measures):
+        # go through each measure and make the tempo annotations
+        for score_measure in self.staves[0].measures:
             # if there's no more key points or guide marks, we're done
             if len(key_points) + len(guide_marks) == 0:
                 break
@@ -1193,11 +1248,109 @@ class Score(ScoreComponent, ScoreContainer):
                      guide_mark_location - measure_start)
                 )
 
-            # sort and add all the annotations to the pymusicxml.Measure object
+            # sort the annotations and save them with this measure
             this_measure_annotations.sort(key=lambda x: x[1])
-            xml_measure.directions_with_displacements = this_measure_annotations
+            annotations.append(this_measure_annotations)
             measure_start += score_measure.length
-        return xml_score
+        return annotations
+
+    def export_music_xml(self, file_path: str, pretty_print: bool = True, streaming: bool = False,
+                         cache: MusicXMLCache = None) -> None:
+        """
+        Convert and wrap as a MusicXML score, and save to the given path.
+
+        :param file_path: file path to save to
+        :param pretty_print: whether or not to take the extra space and format the file with indentations, etc.
+        :param streaming: if True, write the file measure by measure using :func:`write_music_xml`, rather than
+            building up the whole MusicXML document first. The file is the same either way, but streaming keeps
+            memory use flat for very long scores.
+        :param cache: a :class:`~scamp._music_xml_streaming.MusicXMLCache` holding measures rendered in previous
+            exports, so that only measures that have changed since then are rendered again. (Implies streaming.)
+        """
+        if streaming or cache is not None:
+            with open(file_path, "w") as file:
+                self.write_music_xml(file, pretty_print=pretty_print, cache=cache)
+        else:
+            ScoreComponent.export_music_xml(self, file_path, pretty_print=pretty_print)
+
+    def write_music_xml(self, file: TextIO, pretty_print: bool = True, cache: MusicXMLCache = None) -> None:
+        """
+        Writes this score as MusicXML to the given text file object, one measure at a time. Each measure is converted,
+        written out and discarded as soon as any glissandi running through it have been joined up, so that only a
+        few measures' worth of MusicXML exists at any moment, however long the score is. The output is the same as
+        that of :func:`export_music_xml` without streaming.
+
+        :param file: a file object opened for writing text (or anything else with a `write` method taking a string)
+        :param pretty_print: whether or not to take the extra space and format the file with indentations, etc.
+        :param cache: a :class:`~scamp._music_xml_streaming.MusicXMLCache` holding measures rendered in previous
+            exports. Measures found in it are copied from it rather than converted and rendered again, and measures
+            that aren't are added to it.
+        """
+        # the header (title, composer and part list) is rendered by pymusicxml from a score with empty parts
+        xml_parts = [pymusicxml.PartGroup([pymusicxml.Part(staff.name) for staff in part.staves])
+                     if isinstance(part, StaffGroup) else pymusicxml.Part(part.name) for part in self.parts]
+        xml_score = pymusicxml.Score(xml_parts, self.title, self.composer)
+        score_element, = xml_score.render()
+        part_ids = [xml_part.part_id for xml_part in xml_score.parts]
+
+        _music_xml_streaming.write_header(file, pretty_print)
+        _music_xml_streaming.write_start_tag(file, "score-partwise", {}, 0, pretty_print)
+        for element in score_element:
+            if element.tag != "part":
+                _music_xml_streaming.write_element(file, element, 1, pretty_print)
+
+        tempo_annotations = self._get_xml_tempo_annotations()
+        settings_key = engraving_settings.json_dumps() if cache is not None else None
+        for staff_num, (staff, part_id) in enumerate(zip(self.staves, part_ids)):
+            spanner_numberer = _music_xml_streaming.SpannerNumberer()
+            _music_xml_streaming.write_start_tag(file, "part", {"id": "P{}".format(part_id)}, 1, pretty_print)
+            for start, end in staff._get_music_xml_chunks():
+                annotations = tempo_annotations[start:end] if staff_num == 0 else []
+                final_bar_line = self.final_bar_line if end == len(staff.measures) else None
+                if cache is None:
+                    Score._write_music_xml_measures(file, staff.measures[start:end], start, annotations,
+                                                    final_bar_line, spanner_numberer, pretty_print)
+                    continue
+
+                source_id_labels = {}
+                key = cache.key([
+                    pretty_print, settings_key, start, final_bar_line, spanner_numberer.get_state(),
+                    [[[ElementTree.tostring(element, "unicode") for element in direction.render()], displacement]
+                     for measure_annotations in annotations for direction, displacement in measure_annotations],
+                    [measure._get_music_xml_key_data(source_id_labels) for measure in staff.measures[start:end]]
+                ])
+                cached = cache.get(key)
+                if cached is None:
+                    chunk_file = io.StringIO()
+                    Score._write_music_xml_measures(chunk_file, staff.measures[start:end], start, annotations,
+                                                    final_bar_line, spanner_numberer, pretty_print)
+                    xml = chunk_file.getvalue()
+                    cache.put(key, xml, spanner_numberer.get_state())
+                else:
+                    xml, spanner_state = cached
+                    spanner_numberer.set_state(spanner_state)
+                file.write(xml)
+            _music_xml_streaming.write_end_tag(file, "part", 1, pretty_print)
+        _music_xml_streaming.write_end_tag(file, "score-partwise", 0, pretty_print)
+
+    @staticmethod
+    def _write_music_xml_measures(file, measures, first_measure_index, tempo_annotations, final_bar_line,
+                                  spanner_numberer, pretty_print):
+        """
+        Converts, renders and writes a run of measures from one of the staves, as returned by
+        :func:`Staff._get_music_xml_chunks`. (Helper for :func:`write_music_xml`.)
+        """
+        xml_measures = Staff._convert_measures_to_music_xml(measures)
+        for i, xml_measure in enumerate(xml_measures):
+            xml_measure.number = first_measure_index + i + 1
+            if i < len(tempo_annotations):
+                xml_measure.directions_with_displacements = tempo_annotations[i]
+            spanner_numberer.renumber_spanners(xml_measure)
+        if final_bar_line is not None:
+            xml_measures[-1].barline = final_bar_line
+        for xml_measure in xml_measures:
+            for element in xml_measure.render():
+                _music_xml_streaming.write_element(file, element, 2, pretty_print)
 
     # Override the signatures of these three methods for the Score class, so they wrap as file by default
 
@@ -1220,6 +1373,19 @@ class Score(ScoreComponent, ScoreContainer):
 _NumberedVoiceFragment = namedtuple("_NumberedVoiceFragment", "voice_num start_measure_num measures_with_quantizations")
 _NamedVoiceFragment = namedtuple("_NamedVoiceFragment", "average_pitch start_measure_num measures_with_quantizations")
 
+# number of note source ids set aside for each run of measures constructed in a worker process
+_WORKER_SOURCE_ID_BLOCK_SIZE = 2 ** 32
+
+
+def _construct_measures(measure_specs, first_source_id):
+    """
+    Runs in a worker process during a parallel :func:`StaffGroup.from_quantized_performance_parts`: constructs a
+    Measure from each of the given measure specs, giving any notes that get split up source ids starting from
+    first_source_id.
+    """
+    performance_module.PerformanceNote._start_ids_at(first_source_id)
+    return [Staff._construct_measure(*spec) for spec in measure_specs]
+
 
 class StaffGroup(ScoreComponent, ScoreContainer):
 
@@ -1265,6 +1431,62 @@ class StaffGroup(ScoreComponent, ScoreContainer):
 
         :param quantized_performance_part: an already quantized PerformancePart
         """
+        return cls.from_quantized_performance_parts([quantized_performance_part])[0]
+
+    @classmethod
+    def from_quantized_performance_parts(cls, quantized_performance_parts: Sequence[performance_module.PerformancePart],
+                                         parallel: bool | int = False) -> list[StaffGroup]:
+        """
+        Constructs a new StaffGroup from each of the given already quantized PerformanceParts. The bulk of the work
+        lies in constructing the measures, each of which can be done independently, so when `parallel` is set, the
+        measures of all the parts are shared out in contiguous runs among a pool of worker processes. (Laying out the
+        voices on staves, and assembling the results, happens in this process.) The StaffGroups are the same as when
+        constructing them one after another.
+
+        Note that on platforms where worker processes are spawned rather than forked, the calling script has to be
+        importable without side effects (i.e. its top-level code should be inside an `if __name__ == '__main__':` block).
+
+        :param quantized_performance_parts: a list of already quantized PerformanceParts
+        :param parallel: if True, construct the measures in a pool of worker processes, one per CPU; if an integer, use
+            that many worker processes. If False (the default), everything happens in this process.
+        """
+        layouts = [StaffGroup._lay_out_quantized_performance_part(part) for part in quantized_performance_parts]
+        measure_specs = [spec for _, _, staff_layouts in layouts for _, staff_specs in staff_layouts
+                         for spec in staff_specs]
+        num_workers = min(len(measure_specs), (os.cpu_count() or 1) if parallel is True else int(parallel))
+
+        if num_workers > 1:
+            chunk_size = max(1, len(measure_specs) // (4 * num_workers))
+            chunks = [measure_specs[i:i + chunk_size] for i in range(0, len(measure_specs), chunk_size)]
+            # notes split up within a measure are given a new source id (used to tie them back together), so each
+            # chunk gets a separate block of ids, to make sure that the workers don't hand out the same ones
+            first_ids = [performance_module.PerformanceNote._reserve_id_block(_WORKER_SOURCE_ID_BLOCK_SIZE)
+                         for _ in chunks]
+            with ProcessPoolExecutor(max_workers=num_workers, initializer=_initialize_quantization_worker,
+                                     initargs=(quantization_settings, engraving_settings)) as executor:
+                measures = [measure for chunk_measures in executor.map(_construct_measures, chunks, first_ids)
+                            for measure in chunk_measures]
+        else:
+            measures = [Staff._construct_measure(*spec) for spec in measure_specs]
+
+        measures_iterator = iter(measures)
+        return [
+            cls([Staff(list(islice(measures_iterator, len(staff_specs))), name=staff_name)
+                 for staff_name, staff_specs in staff_layouts], name=name, clef_choices=clef_choices)
+            for name, clef_choices, staff_layouts in layouts
+        ]
+
+    @staticmethod
+    def _lay_out_quantized_performance_part(quantized_performance_part):
+        """
+        Works out how to lay out the voices of an already quantized PerformancePart on staves, without yet
+        constructing any measures.
+
+        :param quantized_performance_part: an already quantized PerformancePart
+        :return: tuple of (staff group name, clef choices, staff layouts), where each staff layout is a tuple of
+            (staff name, measure specs), and each measure spec is a tuple of arguments to
+            :func:`Staff._construct_measure`
+        """
         assert quantized_performance_part.is_quantized()
 
         fragments = StaffGroup._separate_voices_into_fragments(quantized_performance_part)
@@ -1273,7 +1495,7 @@ class StaffGroup(ScoreComponent, ScoreContainer):
         if quantized_performance_part.name_count() > 0:
             staff_group_name += " [{}]".format(quantized_performance_part.name_count() + 1)
 
-        return StaffGroup._from_measure_voice_grid(
+        return StaffGroup._lay_out_measure_voice_grid(
             measure_voice_grid, quantized_performance_part._get_longest_quantization_record(),
             name=staff_group_name, clef_choices=quantized_performance_part.clef_preference
         )
@@ -1336,7 +1558,7 @@ class StaffGroup(ScoreComponent, ScoreContainer):
             if len(note_list) == 0:
                 continue
 
-            note_list = deepcopy(note_list)
+            note_list = [note._copy() for note in note_list]
 
             quantization_record = quantized_performance_part.voice_quantization_records[voice_name]
             assert isinstance(quantization_record, QuantizationRecord)
@@ -1437,15 +1659,16 @@ class StaffGroup(ScoreComponent, ScoreContainer):
 
         return measure_grid
 
-    @classmethod
-    def _from_measure_voice_grid(cls, measure_bins, quantization_record: QuantizationRecord, name: str = None,
-                                 clef_choices: Sequence[str | tuple[str, Real]] = None):
+    @staticmethod
+    def _lay_out_measure_voice_grid(measure_bins, quantization_record: QuantizationRecord, name: str = None,
+                                    clef_choices: Sequence[str | tuple[str, Real]] = None):
         """
-        Creates a StaffGroup with Staves that accommodate engraving_settings.max_voices_per_part voices each
+        Lays out the voices on Staves that accommodate engraving_settings.max_voices_per_part voices each
 
         :param measure_bins: a list of voice lists (can be many voices each)
         :param quantization_record: a QuantizationRecord
         :param name: name for the staff group; the staves will get named, e.g. "piano [1]", "piano [2]", etc.
+        :return: a staff group layout, as described in :func:`StaffGroup._lay_out_quantized_performance_part`
         """
         num_staffs_required = 1 if len(measure_bins) == 0 else \
             int(max(math.ceil(len(x) / engraving_settings.max_voices_per_part) for x in measure_bins))
@@ -1485,17 +1708,13 @@ class StaffGroup(ScoreComponent, ScoreContainer):
 
         if all(len(x) == 0 for x in staves):
             # empty staff group; none of its staves have any contents
-            return cls([Staff([])])
+            return None, None, [(None, [])]
 
-        return cls(
-            [
-                Staff._from_measure_bins_of_voice_lists(
-                    staff, quantization_record.time_signatures,
-                    name=name + " ({})".format(str(i + 1)) if len(staves) > 1 else name
-                )
-                for i, staff in enumerate(staves)
-            ], name=name, clef_choices=clef_choices
-        )
+        return name, clef_choices, [
+            (name + " ({})".format(str(i + 1)) if len(staves) > 1 else name,
+             Staff._get_measure_specs(staff, quantization_record.time_signatures))
+            for i, staff in enumerate(staves)
+        ]
 
     def _set_clefs(self):
         if engraving_settings.clef_selection_policy == "part-wise":
@@ -1560,11 +1779,11 @@ class Staff(ScoreComponent, ScoreContainer):
         """
         return sum(m.length for m in self.measures[:-1]) + self.measures[-1].non_empty_length()
 
-    @classmethod
-    def _from_measure_bins_of_voice_lists(cls, measure_bins, time_signatures: Sequence[TimeSignature],
-                                          name: str = None) -> Staff:
+    @staticmethod
+    def _get_measure_specs(measure_bins, time_signatures: Sequence[TimeSignature]) -> list[tuple]:
         """
-        Constructs a Staff from a specially formatted list of measures
+        Gets the arguments to :func:`Staff._construct_measure` for each measure of a Staff, from a specially formatted
+        list of measures
 
         :param measure_bins: Expects a list of measure bins each of which is either:
 
@@ -1573,20 +1792,26 @@ class Staff(ScoreComponent, ScoreContainer):
                 - a list of PerformanceNotes or
                 - None, in the case of an empty voice
 
-            This format is constructed inside of StaffGroup._from_measure_voice_grid
+            This format is constructed inside of StaffGroup._lay_out_measure_voice_grid
         :param time_signatures: list of TimeSignature objects for each measure
+        :return: list of (measure content, time signature, show time signature) tuples
         """
-        # Expects a list of measure bins formatted as outputted by StaffGroup._from_measure_bins_of_voice_lists
+        # Expects a list of measure bins formatted as outputted by StaffGroup._lay_out_measure_voice_grid
         #   (1) None, indicating an empty measure
         #   (2) a list of voices, each of which is either:
         #       - a list of PerformanceNotes or
         #       - None, in the case of an empty voice
         time_signature_changes = [True] + [time_signatures[i - 1] != time_signatures[i]
                                            for i in range(1, len(time_signatures))]
-        return cls([Measure.from_list_of_performance_voices(measure_content, time_signature, show_time_signature)
-                    if measure_content is not None else Measure.empty_measure(time_signature, show_time_signature)
-                    for measure_content, time_signature, show_time_signature in zip(measure_bins, time_signatures,
-                                                                                    time_signature_changes)], name=name)
+        return list(zip(measure_bins, time_signatures, time_signature_changes))
+
+    @staticmethod
+    def _construct_measure(measure_content, time_signature: TimeSignature, show_time_signature: bool) -> Measure:
+        """
+        Constructs a Measure from one of the measure specs returned by :func:`Staff._get_measure_specs`
+        """
+        return Measure.from_list_of_performance_voices(measure_content, time_signature, show_time_signature) \
+            if measure_content is not None else Measure.empty_measure(time_signature, show_time_signature)
 
     def _to_abjad(self):
         # from the point of view of the source_id_dict (which helps us connect tied notes), the staff is
@@ -1598,11 +1823,42 @@ class Staff(ScoreComponent, ScoreContainer):
         return af.create_named_staff(contents, self.name)
 
     def to_music_xml(self) -> pymusicxml.Part:
+        return pymusicxml.Part(self.name, Staff._convert_measures_to_music_xml(self.measures))
+
+    @staticmethod
+    def _convert_measures_to_music_xml(measures: Sequence[Measure]) -> list[pymusicxml.Measure]:
+        # from the point of view of the source_id_dict (which helps us connect glissandi), this is the top level call
         source_id_dict = {}
-        measures = [measure.to_music_xml(source_id_dict) for measure in self.measures]
+        xml_measures = [measure.to_music_xml(source_id_dict) for measure in measures]
         for same_source_group in source_id_dict.values():
             _join_same_source_xml_note_group(same_source_group)
-        return pymusicxml.Part(self.name, measures)
+        return xml_measures
+
+    def _get_music_xml_chunks(self) -> list[tuple[int, int]]:
+        """
+        Divides the measures of this staff into runs that can be converted to MusicXML independently of one another,
+        by only ending a run at a barline that no glissando crosses. (The notes of a glissando, which share a source
+        id, have to be converted together, so that they can be joined up.) Most runs are a single measure.
+
+        :return: list of (start index, end index) tuples, where the end index is exclusive
+        """
+        # the source ids of the glissandi in each measure, and the last measure in which each one appears
+        measure_source_ids = [
+            [note.properties.temp["_source_id"] for voice in measure.voices if voice is not None
+             for note in voice.iterate_notes() if note.does_glissando() and "_source_id" in note.properties.temp]
+            for measure in self.measures
+        ]
+        last_measure_nums = {source_id: measure_num for measure_num, source_ids in enumerate(measure_source_ids)
+                             for source_id in source_ids}
+
+        chunks = []
+        chunk_start = chunk_reach = 0
+        for measure_num, source_ids in enumerate(measure_source_ids):
+            chunk_reach = max([chunk_reach] + [last_measure_nums[source_id] for source_id in source_ids])
+            if chunk_reach <= measure_num:
+                chunks.append((chunk_start, measure_num + 1))
+                chunk_start = measure_num + 1
+        return chunks
 
 
 _voice_names = [r'voiceOne', r'voiceTwo', r'voiceThree', r'voiceFour']
@@ -1737,6 +1993,24 @@ class Measure(ScoreComponent, ScoreContainer):
 
         return af.make_measure(abjad_voices, self.clef)
 
+    def _get_music_xml_key_data(self, source_id_labels: dict) -> list:
+        """
+        Returns (JSON-friendly) data capturing everything about this measure that goes into its MusicXML, for use in
+        the key of a :class:`~scamp._music_xml_streaming.MusicXMLCache`.
+
+        :param source_id_labels: dictionary in which the source ids of glissandi are given labels in order of
+            appearance, so that the key depends on which notes are joined up, but not on their arbitrary source ids
+        """
+        return [self.time_signature, self.show_time_signature, self.clef, [
+            None if voice is None else [voice.time_signature, [
+                [item.tuplet_divisions, item.normal_divisions, item.division_length,
+                 [note._get_music_xml_key_data(source_id_labels) for note in item.contents]]
+                if isinstance(item, Tuplet) else item._get_music_xml_key_data(source_id_labels)
+                for item in voice.contents
+            ]]
+            for voice in self.voices
+        ]]
+
     def to_music_xml(self, source_id_dict=None) -> pymusicxml.Measure:
         is_top_level_call = True if source_id_dict is None else False
         source_id_dict = {} if source_id_dict is None else source_id_dict
@@ -1913,17 +2187,9 @@ class Voice(ScoreComponent, ScoreContainer):
 
         # these versions go from small to big prime factors and vice-versa
         # so for one 6 is 3x2, for the other it's 2x3. We try both options in case one fits better
-        beat_division_hierarchy = _get_beat_division_hierarchy(beat_quantization.length, divisor)
-        beat_division_hierarchy2 = _get_beat_division_hierarchy(beat_quantization.length, divisor, False)
-
-        # if they're identical (e.g. if there's only one type of prime anyway) we only need to care about one version
-        if beat_division_hierarchy == beat_division_hierarchy2:
-            beat_division_hierarchy2 = None
-
-        # makes triplets get treated as worse than duplets
-        _worsen_hierarchy_tuples(beat_division_hierarchy)
-        if beat_division_hierarchy2 is not None:
-            _worsen_hierarchy_tuples(beat_division_hierarchy2)
+        # (if they're identical, beat_division_hierarchy2 is None and we only need to care about one version)
+        beat_division_hierarchy, beat_division_hierarchy2 = \
+            _get_beat_division_hierarchies(beat_quantization.length, divisor)
 
         note_list = tuplet.contents if tuplet is not None else []
 
@@ -1978,7 +2244,12 @@ class Voice(ScoreComponent, ScoreContainer):
         return [tuplet] if tuplet is not None else note_list
 
     @staticmethod
+    @memoize(maxsize=4096, key=lambda start_division, end_division, beat_division_hierarchy, is_rest=False: (
+        start_division, end_division, beat_division_hierarchy, is_rest, _rhythm_spelling_settings_key()
+    ))
     def _get_division_points_for_note(start_division, end_division, beat_division_hierarchy, is_rest=False):
+        # note: the result only depends on small integers, the (memoized) hierarchy tuple and the engraving settings,
+        # so it is memoized as a table of spellings. The returned division points are a tuple, shared between calls.
         beat_division_grids = _get_beat_division_grids(beat_division_hierarchy)[1:]
         current_division = start_division
         division_points = [current_division]
@@ -2564,6 +2835,12 @@ class NoteLike(ScoreComponent):
 
         return abjad_object
 
+    def _get_music_xml_key_data(self, source_id_labels: dict) -> list:
+        # see Measure._get_music_xml_key_data
+        source_id = self.properties.temp.get("_source_id") if self.does_glissando() else None
+        return [self.pitch, self.volume, self.written_length, self.properties,
+                None if source_id is None else source_id_labels.setdefault(source_id, len(source_id_labels))]
+
     def to_music_xml(self, source_id_dict=None) -> Sequence[_XMLNote]:
         if self.is_rest():
             return pymusicxml.Rest(self.written_length),
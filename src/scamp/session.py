@@ -24,12 +24,14 @@ from .transcriber import Transcriber
 from ._midi import get_available_midi_input_devices, get_port_number_of_midi_device, \
     print_available_midi_input_devices, print_available_midi_output_devices, start_midi_listener
 from .instruments import Ensemble, ScampInstrument
+from .playback_implementations import SoundfontPlaybackImplementation
 from clockblocks import Clock, ClockFamilyOptions
-from .utilities import SavesToJSON
+from .utilities import SavesToJSON, resolve_path
 from ._dependencies import pynput, pythonosc
 from .spelling import SpellingPolicy
 from typing import Iterator, Callable, Sequence
 from .performance import Performance
+from .quantization import IncrementalQuantizer
 import threading
 
 
@@ -58,6 +60,7 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
         Transcriber.__init__(self)
 
         self._listeners = {"midi": {}, "osc": {}}
+        self._rendering_offline = False
 
     def run_as_server(self) -> Session:
         """
@@ -68,6 +71,31 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
         """
         return super(Session, self).run_as_server()
 
+    def render_offline(self, file_path: str, tail_length: float = 1.0) -> None:
+        """
+        Renders everything forked on this Session to a .wav file, as fast as possible rather than in real time. To use
+        this, the Session's instruments need to have been created with the audio driver "offline" (e.g. by creating
+        the Session with :code:`default_audio_driver="offline"`); all of their audio is then pulled out of a
+        driverless FluidSynth instance at the exact score time of each event, so the output is identical from run
+        to run. This call fast-forwards until all child clocks have finished, and then writes out the file.
+
+        :param file_path: the .wav file to write to
+        :param tail_length: how many seconds to keep rendering after the last child clock finishes (for reverb
+            tails and such)
+        """
+        soundfont_host = SoundfontPlaybackImplementation.offline_soundfont_hosts.get(self.master)
+        if soundfont_host is None:
+            raise ValueError("Nothing to render offline; instruments must use the audio driver \"offline\".")
+        soundfont_host.start_rendering(resolve_path(file_path))
+        self._rendering_offline = True
+        try:
+            self.fast_forward()
+            self.wait_for_children_to_finish()
+        finally:
+            self.fast_forward(False)
+            self._rendering_offline = False
+            soundfont_host.stop_rendering(tail_length)
+
     # ----------------------------------- Listeners ----------------------------------
 
     @staticmethod
@@ -362,7 +390,8 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
     # --------------------------------- Transcription Stuff -------------------------------
 
     def start_transcribing(self, instrument_or_instruments: ScampInstrument | Sequence[ScampInstrument] = None,
-                           clock: Clock = None, units: str = "beats") -> Performance:
+                           clock: Clock = None, units: str = "beats", quantizer: IncrementalQuantizer = None,
+                           keep_notes: bool = True) -> Performance:
         """
         Starts transcribing everything played in this Session's (or by the given instruments) to a Performance.
         Defaults to using this Session as the clock.
@@ -370,6 +399,9 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
         :param instrument_or_instruments: which instruments to transcribe. Defaults to all session instruments
         :param clock: which clock to record on, i.e. what are all the timings notated relative to
         :param units: one of ["beats", "time"]. Do we use the beats of the clock or the time?
+        :param quantizer: (optional) an :class:`~scamp.quantization.IncrementalQuantizer` to quantize the notes as
+            they are played (see :func:`~scamp.transcriber.Transcriber.start_transcribing`)
+        :param keep_notes: if False, notes are only passed on to the quantizer, and not recorded in the Performance
 
         :return: the Performance we will be transcribing to
         """
@@ -379,7 +411,7 @@ class Session(Clock, Ensemble, Transcriber, SavesToJSON):
 
         return super().start_transcribing(
             self.instruments if instrument_or_instruments is None else instrument_or_instruments,
-            self if clock is None else clock, units=units
+            self if clock is None else clock, units=units, quantizer=quantizer, keep_notes=keep_notes
         )
 
     def _to_dict(self):
@@ -266,6 +266,12 @@ class PlaybackSettings(_ScampSettings):
     :ivar resize_parameter_envelopes: one of "never", "lists", and "always". This determines whether or not parameter
         envelopes are resized to the length of the note. The default value of "lists" does this resizing only when the
         envelope was created indirectly by passing a list to the parameter.
+    :ivar soundfont_sequencer_latency: if None (the default), soundfont playback sends MIDI events to FluidSynth
+        immediately. If a number of seconds, events are scheduled on the FluidSynth sequencer at the clock's scheduled
+        time plus this latency, making them sample-accurate at the cost of a fixed delay.
+    :ivar streaming_midi_queued_output: if True, streaming MIDI playback hands its messages off to a background thread
+        to be sent, rather than sending them from the clock thread. Redundant pitch bend and cc messages that pile up
+        in the queue are dropped. Defaults to False.
     """
 
     named_soundfonts: dict = field(default_factory=lambda: {"general_midi": "Merlin.sf2"})
@@ -314,6 +320,8 @@ class PlaybackSettings(_ScampSettings):
     # decide which underlying libfluidsynth to dlopen.
     use_bundled_pyfluidsynth: bool = True
     resize_parameter_envelopes: str = "lists"
+    soundfont_sequencer_latency: float | None = None
+    streaming_midi_queued_output: bool = False
     recording_file_path: str | None = None
     recording_time_range: list = field(default_factory=lambda: [0, "inf"])
 
@@ -19,8 +19,7 @@ Module containing the :class:`SpellingPolicy` class, which describes how pitches
 #  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
 
 from __future__ import annotations
-import functools
-from .utilities import SavesToJSON, NoteProperty
+from .utilities import SavesToJSON, NoteProperty, memoize
 from typing import Sequence, TYPE_CHECKING
 import pymusicxml
 
@@ -71,13 +70,13 @@ class SpellingPolicy(SavesToJSON, NoteProperty):
         self.step_alteration_pairs = step_alteration_pairs
 
     """
-    Note that functools.lru_cache results in the same classmethod calls returning identical objects
+    Note that memoization results in the same classmethod calls returning identical objects
     This is valuable because if we play a bunch of notes with properties="spelling: D major", then each time
     that string is converted to a SpellingPolicy class, it gets to reuse the same instance.
     """
 
     @classmethod
-    @functools.lru_cache()
+    @memoize
     def all_sharps(cls, including_white_keys: bool = False) -> SpellingPolicy:
         """
         Constructs a sharps-only SpellingPolicy
@@ -87,7 +86,7 @@ class SpellingPolicy(SavesToJSON, NoteProperty):
         return cls(_sharp_spellings_even_white_keys if including_white_keys else _sharp_spellings)
 
     @classmethod
-    @functools.lru_cache()
+    @memoize
     def all_flats(cls, including_white_keys: bool = False) -> SpellingPolicy:
         """
         Constructs a flats-only SpellingPolicy
@@ -97,7 +96,7 @@ class SpellingPolicy(SavesToJSON, NoteProperty):
         return cls(_flat_spellings_even_white_keys if including_white_keys else _flat_spellings)
 
     @classmethod
-    @functools.lru_cache()
+    @memoize
     def from_circle_of_fifths_position(cls, num_sharps_or_flats: int, avoid_double_accidentals: bool = False,
                                        template: Sequence[tuple[int, int]] = _c_standard_spellings) -> SpellingPolicy:
         """
@@ -132,7 +131,7 @@ class SpellingPolicy(SavesToJSON, NoteProperty):
         return cls(tuple(sorted(new_spellings, key=lambda x: (template.index((x[0], 0)) + x[1]) % 12)))
 
     @classmethod
-    @functools.lru_cache()
+    @memoize
     def from_string(cls, string_initializer: str) -> SpellingPolicy:
         """
         Constructs a SpellingPolicy from several possible input string formats
@@ -18,12 +18,14 @@
 #  ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++  #
 
 from __future__ import annotations
-from .performance import Performance
+from .performance import Performance, PerformanceNote, PerformancePart
+from .quantization import IncrementalQuantizer
 from expenvelope import Envelope
 from clockblocks import Clock, TempoEnvelope, TimeStamp
 from clockblocks.utilities import meaningfully_less_than, meaningfully_greater_than
 from .instruments import ScampInstrument
 from typing import Sequence
+from copy import deepcopy
 
 
 class Transcriber:
@@ -46,17 +48,26 @@ class Transcriber:
         return len(self._transcriptions_in_progress) > 0
 
     def start_transcribing(self, instrument_or_instruments: ScampInstrument | Sequence[ScampInstrument],
-                           clock: Clock, units: str = "beats") -> Performance:
+                           clock: Clock, units: str = "beats", quantizer: IncrementalQuantizer = None,
+                           keep_notes: bool = True) -> Performance:
         """
         Starts transcribing new performance on the given clock, consisting of the given instrument
 
         :param instrument_or_instruments: the instruments we notate in this Performance
         :param clock: which clock all timings are relative to
         :param units: one of ["beats", "time"]. Do we use the beats of the clock or the time?
+        :param quantizer: (optional) an :class:`~scamp.quantization.IncrementalQuantizer` to quantize the notes as
+            they are played. Each note is passed to it as it is transcribed, with the voice given as a tuple of
+            (PerformancePart, voice name), and measures are finalized as soon as no note still sounding (or yet to be
+            played) could affect them. The quantizer is finished off when the transcription is stopped.
+        :param keep_notes: if False, notes are only passed on to the quantizer, and not recorded in the Performance,
+            so that memory use stays bounded however long the transcription runs
         :return: the Performance that this transcription writes to, which will be updated as notes are played and acts
             as a handle when calling stop_transcribing.
         """
         assert units in ("beats", "time")
+        if not keep_notes and quantizer is None:
+            raise ValueError("Notes must be kept if there is no quantizer to pass them on to.")
 
         if not hasattr(instrument_or_instruments, "__len__"):
             instrument_or_instruments = [instrument_or_instruments]
@@ -77,7 +88,7 @@ class Transcriber:
         # see Clock.hold_scheduler.
         with clock.hold_scheduler():
             self._transcriptions_in_progress.append(
-                (performance, clock, TimeStamp.now(clock), units)
+                (performance, clock, TimeStamp.now(clock), units, quantizer, keep_notes)
             )
 
         return performance
@@ -98,7 +109,8 @@ class Transcriber:
             return
 
         # loop through all the transcriptions in progress
-        for performance, clock, transcription_start_stamp, units in self._transcriptions_in_progress:
+        for performance, clock, transcription_start_stamp, units, quantizer, keep_notes \
+                in self._transcriptions_in_progress:
             # To recover the note start beat and length in this transcription's clock, first subtract (from the
             # transcription start time stamp and from each other), and then resolve the resulting TimeStampInterval
             # to beats in the transcription clock.
@@ -204,10 +216,43 @@ class Transcriber:
             for instrument_part in performance.get_parts_by_instrument(instrument):
                 # it'd be kind of weird for more than one part to have the same instrument, but if they did,
                 # I suppose that each part should transcribe the note
-                instrument_part.new_note(
+                note = PerformanceNote(
                     note_start_beat, note_length_sections if note_length_sections is not None else note_length,
                     pitch, volume, note_info["properties"]
                 )
+                if quantizer is not None:
+                    # the quantizer alters the note in place, so if we're keeping it, it gets its own copy
+                    quantizer.add_note(deepcopy(note) if keep_notes else note,
+                                       (instrument_part, PerformancePart._get_voice_name(note)))
+                if keep_notes:
+                    instrument_part.add_note(note)
+
+            if quantizer is not None:
+                quantizer.advance(Transcriber._earliest_possible_note_start(
+                    performance, note_info, end_stamp, clock, transcription_start_stamp, units
+                ))
+
+    @staticmethod
+    def _earliest_possible_note_start(performance, finished_note_info, finished_note_end_stamp, clock,
+                                      transcription_start_stamp, units):
+        """
+        The earliest beat (or time) at which a note that has yet to be registered with a transcription could start,
+        given that the note described by finished_note_info just finished. Any note yet to be played starts after
+        now, and a note that is still sounding started when it started.
+        """
+        earliest_start = Transcriber._resolve_interval(
+            finished_note_end_stamp - transcription_start_stamp, clock, units
+        )
+        for part in performance.parts:
+            if part.instrument is None:
+                continue
+            for note_info in list(part.instrument._note_info_by_id.values()):
+                if note_info is finished_note_info or "no_transcribe" in note_info["flags"]:
+                    continue
+                earliest_start = min(earliest_start, Transcriber._resolve_interval(
+                    note_info["start_time_stamp"] - transcription_start_stamp, clock, units
+                ))
+        return earliest_start
 
     @staticmethod
     def _resolve_time_stamp(time_stamp, clock, units):
@@ -243,7 +288,9 @@ class Transcriber:
             if transcription is None:
                 raise ValueError("Cannot stop transcribing given performance, as it was never started!")
 
-        transcribed_performance, transcription_clock, transcription_start_stamp, units = transcription
+        transcribed_performance, transcription_clock, transcription_start_stamp, units, quantizer, _ = transcription
+        if quantizer is not None:
+            quantizer.finish()
         # the transcription start is now stored as a TimeStamp; resolve it to a beat for tempo extraction
         transcription_start_beat = transcription_start_stamp.beat_in_clock(transcription_clock)
         if units == "beats":
@@ -24,6 +24,8 @@ import sys
 import math
 import itertools
 import functools
+from threading import Lock
+from collections import OrderedDict, namedtuple
 from typing import Iterator, Type, Callable, Sequence, TypeVar
 from expenvelope.json_serializer import SavesToJSON, SavesToJSONMeta
 from clockblocks.utilities import meaningfully_less_than, meaningfully_greater_than
@@ -122,22 +124,112 @@ def resolve_package_path(path: str) -> str:
     return os.path.join(package_dir, path)
 
 
-def memoize(obj: Callable) -> Callable:
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+# maps the name of each registered cache to a tuple of (function returning its CacheInfo, function clearing it)
+_registered_caches = {}
+
+# separates positional from keyword arguments in memoization keys
+_kwargs_marker = object()
+# stands in for the key of a call whose arguments can't be hashed (and so can't be cached)
+_unhashable_marker = object()
+
+
+def register_cache(name: str, info_function: Callable, clear_function: Callable) -> None:
+    """
+    Registers a cache so that it is reported by :func:`get_cache_info` and emptied by :func:`clear_caches`.
+    (Functions decorated with :func:`memoize` are registered automatically.)
+
+    :param name: name under which to report the cache
+    :param info_function: function of no arguments returning a named tuple of cache statistics
+    :param clear_function: function of no arguments that empties the cache
+    """
+    _registered_caches[name] = (info_function, clear_function)
+
+
+def get_cache_info() -> dict[str, tuple]:
+    """
+    Returns the statistics of every registered cache, as a dictionary from cache name to a named tuple such as
+    (hits, misses, evictions, maxsize, currsize). Useful for checking how effective caching is in a long session.
     """
-    Decorator used for memoization (see https://en.wikipedia.org/wiki/Memoization)
+    return {name: info_function() for name, (info_function, _) in _registered_caches.items()}
+
+
+def clear_caches() -> None:
+    """
+    Empties every registered cache (including those of all memoized functions) and resets their statistics.
+    """
+    for _, clear_function in _registered_caches.values():
+        clear_function()
+
+
+def memoize(obj: Callable = None, maxsize: int | None = 128, key: Callable = None) -> Callable:
+    """
+    Decorator used for memoization (see https://en.wikipedia.org/wiki/Memoization). Results are stored in a least
+    recently used cache, keyed on the (hashable) arguments, with at most maxsize entries. Can be used either bare, as
+    in `@memoize`, or with arguments, as in `@memoize(maxsize=1024)`. The wrapped function gains `cache_info()` and
+    `cache_clear()` methods, and its cache is registered so that :func:`clear_caches` empties it. The cache is safe
+    to use from several threads at once, though (as with `functools.lru_cache`) two threads making the same call at
+    the same time may both end up calling the function.
 
     :param obj: the function to be wrapped in a memoizer
+    :param maxsize: the maximum number of results to store, or None for no limit
+    :param key: (optional) a function that takes the same arguments as the wrapped function and returns the hashable
+        key to cache the result under. This is useful for methods, since it avoids holding on to the instance.
+        Calls whose arguments (or key) are not hashable are simply not cached.
     :return: the wrapped, memoized function
     """
-    cache = obj.cache = {}
+    if obj is None:
+        return functools.partial(memoize, maxsize=maxsize, key=key)
+
+    cache = OrderedDict()
+    stats = {"hits": 0, "misses": 0, "evictions": 0}
+    # guards the cache and stats, but is never held while calling the function itself
+    lock = Lock()
 
     @functools.wraps(obj)
     def memoizer(*args, **kwargs):
-        key = str(args) + str(kwargs)
-        if key not in cache:
-            cache[key] = obj(*args, **kwargs)
-        return cache[key]
-
+        if key is not None:
+            cache_key = key(*args, **kwargs)
+        elif kwargs:
+            cache_key = args + (_kwargs_marker,) + tuple(kwargs.items())
+        else:
+            cache_key = args
+        with lock:
+            try:
+                result = cache[cache_key]
+            except KeyError:
+                stats["misses"] += 1
+            except TypeError:
+                # unhashable arguments; just call the function
+                stats["misses"] += 1
+                cache_key = _unhashable_marker
+            else:
+                stats["hits"] += 1
+                cache.move_to_end(cache_key)
+                return result
+
+        result = obj(*args, **kwargs)
+        if cache_key is not _unhashable_marker:
+            with lock:
+                cache[cache_key] = result
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+                    stats["evictions"] += 1
+        return result
+
+    def cache_info():
+        with lock:
+            return CacheInfo(stats["hits"], stats["misses"], stats["evictions"], maxsize, len(cache))
+
+    def cache_clear():
+        with lock:
+            cache.clear()
+            stats.update(hits=0, misses=0, evictions=0)
+
+    memoizer.cache_info = cache_info
+    memoizer.cache_clear = cache_clear
+    register_cache(f"{obj.__module__}.{obj.__qualname__}", cache_info, cache_clear)
     return memoizer
 
 # -------------------------------------------- Numerical Utilities -----------------------------------------------
@@ -329,6 +421,7 @@ def get_average_square_correlation(test_string: str, template_string: str) -> fl
 # All of these are needed for the indispensability stuff below
 
 
+@memoize(maxsize=1024)
 def indigestibility(n: int) -> float:
     """
     Returns the indigestibility of a number per the theories of Clarence Barlow.
@@ -0,0 +1,73 @@
+"""
+Checks that a performance whose voices are stored as ColumnarVoices behaves the same as one storing ordinary lists of
+notes: after the same filters and tempo remapping, the notes, their quantization, the resulting score's MusicXML and
+the exported MIDI file should all be the same.
+"""
+
+from scamp import *
+from scamp.performance import ColumnarVoice
+import random
+import io
+
+
+def make_performance(columnar):
+    rng = random.Random(7)
+    performance = Performance(tempo_envelope=TempoEnvelope([60, 80], [12]))
+    for part_num in range(2):
+        name = "Part {}".format(part_num + 1)
+        part = PerformancePart(name=name, instrument_id=(name, 0), columnar=columnar)
+        performance.add_part(part)
+        t = 0
+        for i in range(80):
+            length = rng.choice([0.25, 0.5, 0.75, 1.0, 1.5, (1.0, 0.5), 1 / 3])
+            if i % 11 == 0:
+                # rest
+                t += sum(length) if isinstance(length, tuple) else length
+                continue
+            pitch = Envelope([62, 66], [0.5]) if i % 13 == 0 else rng.randint(55, 80)
+            volume = Envelope([0.3, 0.9], [0.5]) if i % 17 == 0 else rng.uniform(0.2, 1)
+            properties = rng.choice(["staccato", "accent", "tenuto", "p"]) + ", spelling: C major"
+            part.add_note(PerformanceNote(t, length, pitch, volume, NoteProperties(properties)), voice=str(1 + i % 2))
+            t += sum(length) if isinstance(length, tuple) else length
+    return performance
+
+
+def transform(performance):
+    performance.transpose(2).scale_volume(0.9)
+    performance.apply_pitch_filter(lambda pitch: pitch - 1, start_beat=4, stop_beat=20, vectorized=True)
+    performance.apply_volume_filter(lambda volume: volume * 0.5, selected_voices=["1"], vectorized=True)
+    # (moves notes, so that the note index has to be rebuilt)
+    performance.apply_note_filter(lambda note: setattr(note, "start_beat", note.start_beat + 0.5), start_beat=30)
+    performance.remap_to_tempo(90)
+    return performance
+
+
+def note_values(performance):
+    return [(note.start_beat, note.length, note.pitch, note.volume, note.properties.articulations)
+            for part in performance.parts for voice_name, voice in sorted(part.voices.items()) for note in voice]
+
+
+def midi_bytes(performance):
+    with io.BytesIO() as byte_stream:
+        performance.export_to_midi_file(byte_stream)
+        return byte_stream.getvalue()
+
+
+list_performance, columnar_performance = transform(make_performance(False)), transform(make_performance(True))
+scheme = QuantizationScheme.from_time_signature("4/4", max_divisor=6)
+list_quantized, columnar_quantized = list_performance.quantized(scheme), columnar_performance.quantized(scheme)
+list_score = Score.from_quantized_performance(list_quantized, title="Columnar", composer="Test")
+columnar_score = Score.from_quantized_performance(columnar_quantized, title="Columnar", composer="Test")
+
+results = [
+    "columnar voices: {}".format(all(isinstance(voice, ColumnarVoice) for part in columnar_performance.parts
+                                     for voice in part.voices.values())),
+    "same notes after filters: {}".format(note_values(list_performance) == note_values(columnar_performance)),
+    "same quantized notes: {}".format(note_values(list_quantized) == note_values(columnar_quantized)),
+    "same MusicXML: {}".format(list_score.to_music_xml().to_xml() == columnar_score.to_music_xml().to_xml()),
+    "same MIDI: {}".format(midi_bytes(list_performance) == midi_bytes(columnar_performance)),
+]
+
+
+def test_results():
+    return results
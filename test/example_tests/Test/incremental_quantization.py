@@ -0,0 +1,55 @@
+"""
+Feeds random voices to an IncrementalQuantizer in the order that their notes end (as the Transcriber does), and checks
+that it finalizes the same measures, with the same beat divisors, as quantizing each voice all at once, including
+when the last note ends right on a barline.
+"""
+
+from scamp import *
+import random
+import copy
+
+scheme = QuantizationScheme.from_time_signature_list(["3/4", "5/8"], loop=True, max_divisor=8)
+
+
+def random_notes(seed, num_notes=150):
+    rng = random.Random(seed)
+    notes = []
+    t = 0
+    for i in range(num_notes):
+        length = rng.uniform(0.05, 2.3) if i % 9 else (0.3, 0.45)
+        notes.append(PerformanceNote(t, length, 60 + i % 5, 0.5, NoteProperties()))
+        t += rng.uniform(0.0, 1.0) if i % 13 else 0
+    return notes
+
+
+def measure_summary(quantized_measure):
+    return quantized_measure.time_signature.as_string(), [beat.divisor for beat in quantized_measure.beats]
+
+
+def compare(notes):
+    part = PerformancePart(voices={"1": copy.deepcopy(notes)})
+    part.quantize(scheme)
+    batch_measures = [measure_summary(m) for m in part.voice_quantization_records["1"].quantized_measures]
+
+    incremental_quantizer = IncrementalQuantizer(scheme)
+    notes_by_end = sorted(copy.deepcopy(notes), key=lambda note: note.end_beat)
+    for i, note in enumerate(notes_by_end):
+        incremental_quantizer.add_note(note, "1")
+        incremental_quantizer.advance(min([note.end_beat] + [n.start_beat for n in notes_by_end[i + 1:]]))
+    incremental_quantizer.finish()
+    incremental_measures = [measure_summary(m) for _, m, _ in incremental_quantizer.finalized_measures]
+    return f"{len(batch_measures)} measures; same measures and divisors: {batch_measures == incremental_measures}"
+
+
+results = [f"seed {seed}: {compare(random_notes(seed))}" for seed in range(20)]
+
+# the last note ends exactly on the barline at beat 5.5 (the end of the second measure)
+results.append("ending on a barline: " + compare([
+    PerformanceNote(0, 1, 60, 0.5, NoteProperties()),
+    PerformanceNote(1, 2.5, 62, 0.5, NoteProperties()),
+    PerformanceNote(4, 1.5, 64, 0.5, NoteProperties()),
+]))
+
+
+def test_results():
+    return [results]
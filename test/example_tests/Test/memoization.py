@@ -0,0 +1,115 @@
+"""
+Checks the bounded memoization caches: hit, miss and eviction counts (with and without a maxsize), the key function,
+calls with unhashable or keyword arguments, registration with get_cache_info, emptying everything with clear_caches,
+and the consistency of the cache when it is used from several threads at once.
+"""
+
+from scamp import get_cache_info, clear_caches
+from scamp.utilities import memoize, register_cache, CacheInfo
+import threading
+
+calls = []
+
+
+@memoize(maxsize=2)
+def square(x):
+    calls.append(x)
+    return x * x
+
+
+@memoize(maxsize=None)
+def cube(x):
+    return x ** 3
+
+
+@memoize
+def describe(x, y=0):
+    calls.append((x, y))
+    return "{} {}".format(x, y)
+
+
+class Transposer:
+
+    def __init__(self, name, interval):
+        self.name = name
+        self.interval = interval
+
+    # keyed on the name and interval rather than on the instance itself
+    @memoize(key=lambda self, pitch: (self.name, self.interval, pitch))
+    def transpose(self, pitch):
+        calls.append((self.name, pitch))
+        return pitch + self.interval
+
+
+# least recently used eviction: 1 and 2 are cached, 1 is used again, so 3 pushes out 2, and then 2 pushes out 1
+for x in (1, 2, 1, 3, 2):
+    square(x)
+square_info, square_calls = square.cache_info(), list(calls)
+
+for x in range(200):
+    cube(x)
+for x in range(10):
+    cube(x)
+cube_info = cube.cache_info()
+
+calls.clear()
+describe(1)
+describe(1, y=2)
+describe(1, 2)
+describe(1, y=2)
+describe([1, 2])
+describe([1, 2])
+describe_info, describe_calls = describe.cache_info(), list(calls)
+
+calls.clear()
+results = [Transposer("up", 2).transpose(60), Transposer("up", 2).transpose(60), Transposer("down", -2).transpose(60)]
+transposer_info, transposer_calls = Transposer.transpose.cache_info(), list(calls)
+
+# other caches can be registered, so that they are reported and cleared along with the memoized functions
+lookup_table = {"a": 1}
+register_cache("memoization test lookup table", lambda: CacheInfo(0, 0, 0, None, len(lookup_table)),
+               lookup_table.clear)
+registered_info = get_cache_info()
+clear_caches()
+cleared_info = get_cache_info()
+
+
+# many threads sharing a small cache
+@memoize(maxsize=16)
+def halve(x):
+    return x / 2
+
+
+threaded_results = []
+
+
+def worker(offset):
+    threaded_results.append(all(halve((i + offset) % 50) == ((i + offset) % 50) / 2 for i in range(2000)))
+
+
+threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+threaded_info = halve.cache_info()
+
+
+def test_results():
+    return [
+        "maxsize 2: {}, function called for {}".format(tuple(square_info), square_calls),
+        "maxsize None: {}".format(tuple(cube_info)),
+        "keyword and unhashable arguments: {}, function called for {}".format(tuple(describe_info), describe_calls),
+        "key function: results {}, {}, function called for {}".format(results, tuple(transposer_info),
+                                                                      transposer_calls),
+        "registered caches reported: {}".format(
+            registered_info["memoization test lookup table"].currsize == 1 and
+            registered_info[square.__module__ + ".square"] == square_info),
+        "clear_caches empties everything: {}".format(
+            len(lookup_table) == 0 and all(tuple(info)[:3] == (0, 0, 0) and info.currsize == 0
+                                           for info in cleared_info.values())),
+        "threaded results correct: {}".format(len(threaded_results) == 8 and all(threaded_results)),
+        "threaded statistics consistent: {}".format(
+            threaded_info.hits + threaded_info.misses == 8 * 2000 and threaded_info.currsize <= 16 and
+            threaded_info.evictions <= threaded_info.misses - threaded_info.currsize),
+    ]
@@ -0,0 +1,113 @@
+"""
+Checks that MIDI-based playback implementations skip pitch bend and volume messages that would leave a channel's value
+unchanged, that volume changes go through the (overridable) volume_cc method, and that when two implementations send
+to the same channels, each one sees what the other sent, rather than skipping a message because it sent the same value
+itself earlier on.
+"""
+
+from scamp import *
+from scamp.playback_implementations import _MIDIPlaybackImplementation
+
+
+class RecordingPort:
+    # stands in for an output port that several implementations send to, recording what was sent on each channel the
+    # way that SimpleRtMidiOut does
+    def __init__(self):
+        self.messages = []
+        self.channel_state = {}
+
+    def pitch_bend(self, chan, value):
+        self.messages.append(("pitch_bend", chan, value))
+        self.channel_state[(chan, "pitch_bend")] = value
+
+    def cc(self, chan, cc_number, value):
+        self.messages.append(("cc", chan, cc_number, value))
+        self.channel_state[(chan, cc_number)] = value
+
+
+class RecordingPlaybackImplementation(_MIDIPlaybackImplementation):
+
+    def __init__(self, port=None):
+        super().__init__(num_channels=1)
+        self.port = port
+        self.messages = []
+        self.volume_cc_calls = 0
+
+    def _get_channel_state(self, chan):
+        return (self._channel_state, chan) if self.port is None else (self.port.channel_state, chan)
+
+    def note_on(self, chan, pitch, velocity_from_0_to_1):
+        self.messages.append(("note_on", chan, pitch))
+
+    def note_off(self, chan, pitch):
+        self.messages.append(("note_off", chan, pitch))
+
+    def pitch_bend(self, chan, bend_in_semitones):
+        self.messages.append(("pitch_bend", chan, bend_in_semitones))
+        if self.port is not None:
+            self.port.pitch_bend(chan, self._quantize_pitch_bend(bend_in_semitones))
+
+    def set_max_pitch_bend(self, max_bend_in_semitones):
+        self.max_pitch_bend = max_bend_in_semitones
+
+    def cc(self, chan, cc_number, value_from_0_to_1):
+        self.messages.append(("cc", chan, cc_number, value_from_0_to_1))
+        if self.port is not None:
+            self.port.cc(chan, cc_number, self._quantize_cc(value_from_0_to_1))
+
+    def volume_cc(self, chan, volume_from_0_to_1):
+        self.volume_cc_calls += 1
+        super().volume_cc(chan, volume_from_0_to_1)
+
+    def _to_dict(self):
+        return {}
+
+    @classmethod
+    def _from_dict(cls, json_dict):
+        return cls()
+
+
+def play(implementation, note_id, pitch, volume, volume_changes=()):
+    implementation.start_note(note_id, pitch, volume, NoteProperties(), {"flags": [], "max_volume": 1.0})
+    for new_volume in volume_changes:
+        implementation.change_note_volume(note_id, new_volume)
+    implementation.end_note(note_id)
+
+
+def messages_sent(implementation):
+    return [message for message in implementation.messages if message[0] in ("pitch_bend", "cc")]
+
+
+# one implementation on its own: the second note needs no bend or volume messages, and neither do repeated volumes
+solo = RecordingPlaybackImplementation()
+play(solo, 0, 60, 0.5, volume_changes=(0.75, 0.75, 0.5))
+play(solo, 1, 62, 0.5)
+solo_messages = messages_sent(solo)
+
+# two implementations sharing a port: after the second one changes the bend and volume of channel 0, the first one
+# has to send them again, even though it set the same values on that channel before
+port = RecordingPort()
+first, second = RecordingPlaybackImplementation(port), RecordingPlaybackImplementation(port)
+play(first, 0, 60, 0.5)
+play(first, 1, 60, 0.5)
+play(second, 2, 60.5, 0.25)
+play(first, 3, 60, 0.5)
+
+# forgetting the channel state means that everything gets sent again
+forgetful = RecordingPlaybackImplementation()
+play(forgetful, 0, 60, 0.5)
+forgetful.forget_channel_state()
+play(forgetful, 1, 60, 0.5)
+
+
+def test_results():
+    return [
+        "solo messages sent: {}".format(solo_messages),
+        "solo elided: {}".format(solo.elided_message_counts),
+        "solo volume_cc calls: {}".format(solo.volume_cc_calls),
+        "shared port messages: {}".format(port.messages),
+        "first implementation elided: {}".format(first.elided_message_counts),
+        "second implementation elided: {}".format(second.elided_message_counts),
+        "messages sent after forgetting: {}".format(len(messages_sent(forgetful))),
+        "elided after forgetting: {}".format(forgetful.elided_message_counts),
+    ]
@@ -0,0 +1,80 @@
+"""
+Checks how a batch of queued MIDI output is coalesced before sending: a pitch bend or cc message is only dropped if a
+later message in the batch sets the same value on the same channel before any note starts or stops on that channel.
+Note ons and offs (and RPN messages) are all kept in their original order, every note sounds with the same bends and ccs
+as it would have without coalescing, and each channel ends up with the same final values.
+"""
+
+from scamp._midi import _MIDIOutputWriter
+
+
+def note_on(chan, pitch):
+    return [0x90 + chan, pitch, 100]
+
+
+def note_off(chan, pitch):
+    return [0x80 + chan, pitch, 0]
+
+
+def bend(chan, value):
+    return [0xE0 + chan, value % 128, value // 128]
+
+
+def cc(chan, cc_number, value):
+    return [0xB0 + chan, cc_number, value]
+
+
+messages = [
+    bend(0, 8192), bend(1, 9000), bend(0, 8500),  # the first bend on channel 0 is overwritten
+    cc(0, 11, 40), cc(0, 11, 60), cc(0, 1, 10),  # so is the first expression value
+    cc(0, 101, 0), cc(0, 100, 0), cc(0, 6, 4), cc(0, 101, 0), cc(0, 100, 0), cc(0, 6, 4),  # RPNs are all kept
+    note_on(0, 60),  # this needs the bend and ccs before it to be in place
+    bend(1, 9100),  # overwrites the earlier bend on channel 1, since there was no note on that channel in between
+    bend(0, 8600), cc(0, 11, 70), bend(0, 8700), cc(0, 11, 80),
+    note_off(0, 60), note_on(1, 62),
+    cc(1, 11, 90), cc(1, 11, 91), bend(0, 8192), note_off(1, 62), cc(1, 11, 92),
+]
+batch = [(i, message) for i, message in enumerate(messages)]
+coalesced = _MIDIOutputWriter._coalesce(batch)
+
+
+def replay(messages_sent):
+    # the bend and cc values of the channel at each note on or off, and the final values of every channel
+    values = {}
+    at_notes = []
+    for message in messages_sent:
+        status, chan = message[0] & 0xF0, message[0] & 0x0F
+        if status in (0x80, 0x90):
+            at_notes.append((tuple(message), {key: value for key, value in values.items() if key[0] == chan}))
+        elif status == 0xE0:
+            values[(chan, "bend")] = message[1] + 128 * message[2]
+        else:
+            values[(chan, message[1])] = message[2]
+    return at_notes, values
+
+
+def is_note_message(message):
+    return message[0] & 0xF0 in (0x80, 0x90)
+
+
+def is_rpn_message(message):
+    return message[0] & 0xF0 == 0xB0 and message[1] in (6, 100, 101)
+
+
+original_at_notes, original_final_values = replay(messages)
+coalesced_at_notes, coalesced_final_values = replay(message for _, message in coalesced)
+
+
+def test_results():
+    return [
+        "dropped: {}".format([i for i, _ in batch if i not in {j for j, _ in coalesced}]),
+        "kept in order: {}".format([i for i, _ in coalesced] == sorted(i for i, _ in coalesced)),
+        "note ons and offs kept: {}".format(
+            [message for message in messages if is_note_message(message)] ==
+            [message for _, message in coalesced if is_note_message(message)]),
+        "RPN messages kept: {}".format(
+            [message for message in messages if is_rpn_message(message)] ==
+            [message for _, message in coalesced if is_rpn_message(message)]),
+        "same values when each note starts and stops: {}".format(original_at_notes == coalesced_at_notes),
+        "same final values: {}".format(original_final_values == coalesced_final_values),
+    ]
@@ -0,0 +1,66 @@
+"""
+Checks that writing a score's MusicXML measure by measure (with and without a MusicXMLCache) produces the same
+document as rendering the whole score with to_music_xml, with and without pretty printing, and that after editing
+one measure, re-exporting with the same cache renders just that measure again and still produces the right document.
+"""
+
+from scamp import *
+import random
+import io
+
+random.seed(5)
+performance = Performance(tempo_envelope=TempoEnvelope([60, 90, 90, 72], [8, 8, 8]))
+for part_num in range(3):
+    name = "Violin {}".format(part_num) if part_num > 0 else "Piano"
+    part = PerformancePart(name=name, instrument_id=(name, 0))
+    performance.add_part(part)
+    t = 0
+    for i in range(60):
+        length = random.choice([0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 1.75, 3.0])
+        if i % 9 == 0:
+            # rest
+            t += length
+            continue
+        pitch = Envelope([60, 64, 61], [length / 2, length / 2]) if i % 7 == 0 else 60 + i % 12
+        properties = random.choice(["staccato", "accent", "fermata", "pp", "slur"]) + ", spelling: C major"
+        part.add_note(PerformanceNote(t, length, pitch, 0.5, NoteProperties(properties)),
+                      voice=str(1 + i % 2) if part_num == 1 else "_unspecified_")
+        t += length
+
+score = performance.to_score(time_signature=["4/4", "3/4", "loop"], max_divisor=4, title="Streaming", composer="Test")
+
+
+def write_music_xml(pretty_print, cache=None):
+    file = io.StringIO()
+    score.write_music_xml(file, pretty_print=pretty_print, cache=cache)
+    return file.getvalue()
+
+
+results = []
+for pretty_print in (False, True):
+    whole_document = score.to_music_xml().to_xml(pretty_print=pretty_print)
+    cache = MusicXMLCache()
+    results.append("pretty print {}: streamed {}, first cached export {}, second cached export {}".format(
+        pretty_print, write_music_xml(pretty_print) == whole_document,
+        write_music_xml(pretty_print, cache) == whole_document, write_music_xml(pretty_print, cache) == whole_document
+    ))
+    first_two_exports = cache.cache_info()
+
+    # alter a note in a measure in the middle of the second part
+    staff = score.staves[1]
+    measure = staff.measures[len(staff.measures) // 2]
+    note = next(note for voice in measure.voices if voice is not None for note in voice.iterate_notes()
+                if not note.does_glissando())
+    note.pitch = note.pitch + 1
+    edited_document = write_music_xml(pretty_print, cache)
+    edited_export = cache.cache_info()
+    results.append("after edit: same as to_music_xml {}, changed {}, hits {}, misses {}".format(
+        edited_document == score.to_music_xml().to_xml(pretty_print=pretty_print),
+        edited_document != whole_document, edited_export.hits - first_two_exports.hits,
+        edited_export.misses - first_two_exports.misses
+    ))
+    note.pitch = note.pitch - 1
+
+
+def test_results():
+    return results
@@ -0,0 +1,45 @@
+"""
+Checks that a PerformancePart's note queries (get_note_iterator and get_notes_sounding_at) keep up with notes that
+are edited directly after the part has been queried: moved, lengthened, replaced or removed, in both list and
+columnar voices.
+"""
+
+from scamp import *
+
+
+def queries(part):
+    return ([(note.start_beat, note.pitch) for note in part.get_note_iterator(1, 4)],
+            [(note.start_beat, note.pitch) for note in part.get_notes_sounding_at(2.5)])
+
+
+def expected_queries(part):
+    notes = sorted((note for voice in part.voices.values() for note in voice), key=lambda note: note.start_beat)
+    return ([(note.start_beat, note.pitch) for note in notes if 1 <= note.start_beat < 4],
+            [(note.start_beat, note.pitch) for note in notes if note.start_beat <= 2.5 < note.end_beat])
+
+
+def check_edits(columnar):
+    part = PerformancePart(name="Test", columnar=columnar)
+    for i in range(6):
+        part.add_note(PerformanceNote(i, 1, 60 + i, 0.5, NoteProperties()), "1")
+        part.add_note(PerformanceNote(i + 0.5, 0.25, 72 + i, 0.5, NoteProperties()), "2")
+    voice = part.voices["1"]
+    edits = {
+        "moving a note": lambda: setattr(voice[0], "start_beat", 2.25),
+        "lengthening a note": lambda: setattr(voice[1], "length", 3),
+        "shortening a tied note": lambda: setattr(voice[2], "length", (0.25, 0.25)),
+        "replacing a note": lambda: voice.__setitem__(3, PerformanceNote(2, 1, 50, 0.5, NoteProperties())),
+        "removing a note": lambda: voice.__delitem__(1),
+        "adding a note": lambda: part.add_note(PerformanceNote(2.4, 1, 40, 0.5, NoteProperties()), "2"),
+    }
+    results = []
+    for description, edit in edits.items():
+        queries(part)
+        edit()
+        results.append("{}{}: {}".format(description, " (columnar)" if columnar else "",
+                                         queries(part) == expected_queries(part)))
+    return results
+
+
+def test_results():
+    return [check_edits(False), check_edits(True)]
@@ -0,0 +1,71 @@
+"""
+Checks that looking up the notes in a range of beats (or sounding at a beat) in a large part is much faster than
+re-sorting all of its notes for each query, as was done before parts kept their notes indexed. Also checks that
+columnar voices answer these queries from their columns, giving the same notes as list voices without keeping a view
+of every note alive afterwards.
+"""
+
+from scamp import *
+import bisect
+import itertools
+import random
+import time
+
+rng = random.Random(3)
+note_specs = []
+t = 0
+for _ in range(20000):
+    note_specs.append((t, rng.choice([0.25, 0.5, 1.0, (0.5, 0.5), 2.5]), rng.randint(48, 84)))
+    t += rng.choice([0, 0.25, 0.5])
+
+list_part = PerformancePart(name="List")
+columnar_part = PerformancePart(name="Columnar", columnar=True)
+for part in (list_part, columnar_part):
+    for i, (start_beat, length, pitch) in enumerate(note_specs):
+        part.add_note(PerformanceNote(start_beat, length, pitch, 0.5, NoteProperties()), voice=str(1 + i % 3))
+
+
+def query_by_re_sorting(part, start_beat, stop_beat):
+    # the way that get_note_iterator used to work: sort all the notes every time
+    all_notes = sorted(itertools.chain(*part.voices.values()))
+    start_index = bisect.bisect_left(all_notes, start_beat)
+    return [note for note in all_notes[start_index:] if note.start_beat < stop_beat]
+
+
+def time_queries(query, num_queries=20):
+    start = time.perf_counter()
+    for i in range(num_queries):
+        query(100 + i, 101 + i)
+    return time.perf_counter() - start
+
+
+re_sorting_time = time_queries(lambda start, stop: query_by_re_sorting(list_part, start, stop))
+index_time = time_queries(lambda start, stop: list(list_part.get_note_iterator(start, stop)))
+
+
+def note_values(notes):
+    return [(note.start_beat, note.length, note.pitch) for note in notes]
+
+
+same_notes = all(
+    note_values(list_part.get_note_iterator(start, start + 3)) ==
+    note_values(query_by_re_sorting(list_part, start, start + 3))
+    for start in range(0, int(t), 97)
+)
+columnar_same_notes = all(
+    note_values(columnar_part.get_note_iterator(start, start + 3)) ==
+    note_values(list_part.get_note_iterator(start, start + 3))
+    and note_values(columnar_part.get_notes_sounding_at(start + 0.1)) ==
+    note_values(list_part.get_notes_sounding_at(start + 0.1))
+    for start in range(0, int(t), 97)
+)
+columnar_views_left = sum(len(voice._views) for voice in columnar_part.voices.values())
+
+
+def test_results():
+    return [
+        "index queries at least ten times faster than re-sorting: {}".format(index_time * 10 < re_sorting_time),
+        "index gives the same notes as re-sorting: {}".format(same_notes),
+        "columnar and list voices give the same notes: {}".format(columnar_same_notes),
+        "columnar note views left alive after querying: {}".format(columnar_views_left),
+    ]
@@ -0,0 +1,37 @@
+"""
+Checks that rendering the same music offline in two Sessions, one after the other, gives identical files. (Each
+Session gets an offline soundfont host of its own, so the second render runs in its own score time from the start,
+rather than carrying on from wherever the first one left off.)
+"""
+
+from scamp import *
+import os
+import tempfile
+
+
+def render(file_path):
+    s = Session(default_audio_driver="offline")
+    piano = s.new_part("piano")
+
+    def melody():
+        for pitch, volume in [(60, 0.5), (64.5, 0.7), (67, 0.6)]:
+            piano.play_note(pitch, volume, 0.5)
+        # a glissando with a swell, so that pitch bends and expression changes are rendered too
+        piano.play_note([72, 60], [0.2, 0.9], 1)
+
+    s.fork(melody)
+    s.render_offline(file_path)
+    with open(file_path, "rb") as wave_file:
+        return wave_file.read()
+
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    first_render = render(os.path.join(temp_dir, "first.wav"))
+    second_render = render(os.path.join(temp_dir, "second.wav"))
+
+
+def test_results():
+    return [
+        "rendered audio: {}".format(len(first_render) > 44),
+        "second render identical to the first: {}".format(first_render == second_render),
+    ]
@@ -0,0 +1,63 @@
+"""
+Checks that quantizing a performance, constructing a score from it, and exporting it to a MIDI file all give the
+same results when done in a pool of worker processes as when done in this process.
+"""
+
+from scamp import *
+import random
+import io
+
+
+def make_performance():
+    rng = random.Random(11)
+    performance = Performance(tempo_envelope=TempoEnvelope([60, 100, 100], [6, 10]))
+    for part_num in range(3):
+        name = "Part {}".format(part_num + 1)
+        part = PerformancePart(name=name, instrument_id=(name, 0))
+        performance.add_part(part)
+        for voice in ("1", "2"):
+            t = 0
+            for i in range(50):
+                length = rng.choice([0.25, 0.5, 0.75, 1.0, 1.5, 2 / 3, 0.2])
+                if rng.random() < 0.1:
+                    # rest
+                    t += length
+                    continue
+                pitch = Envelope([60, 65], [length]) if rng.random() < 0.05 else rng.randint(48 + 12 * part_num, 72)
+                properties = rng.choice(["staccato", "accent", "tenuto", "mf"]) + ", spelling: C major"
+                part.add_note(PerformanceNote(t, length, pitch, rng.uniform(0.2, 1), NoteProperties(properties)),
+                              voice=voice)
+                t += length
+    return performance
+
+
+def note_values(performance):
+    return [(note.start_beat, note.length, note.pitch, note.volume, note.properties.articulations)
+            for part in performance.parts for voice_name, voice in sorted(part.voices.items()) for note in voice]
+
+
+def divisors(performance):
+    return [[beat.divisor for measure in record.quantized_measures for beat in measure.beats]
+            for part in performance.parts for _, record in sorted(part.voice_quantization_records.items())]
+
+
+def midi_bytes(performance, parallel):
+    with io.BytesIO() as byte_stream:
+        performance.export_to_midi_file(byte_stream, parallel=parallel)
+        return byte_stream.getvalue()
+
+
+def test_results():
+    # (the work happens here, rather than on import, so that worker processes never run it)
+    performance = make_performance()
+    scheme = QuantizationScheme.from_time_signature_list(["4/4", "3/4"], loop=True, max_divisor=6)
+    serial_quantized, parallel_quantized = performance.quantized(scheme), performance.quantized(scheme, parallel=2)
+    serial_score = Score.from_quantized_performance(serial_quantized, title="Parallel", composer="Test")
+    parallel_score = Score.from_quantized_performance(parallel_quantized, title="Parallel", composer="Test",
+                                                      parallel=2)
+    return [
+        "same quantized notes: {}".format(note_values(serial_quantized) == note_values(parallel_quantized)),
+        "same divisors: {}".format(divisors(serial_quantized) == divisors(parallel_quantized)),
+        "same MusicXML: {}".format(serial_score.to_music_xml().to_xml() == parallel_score.to_music_xml().to_xml()),
+        "same MIDI: {}".format(midi_bytes(performance, False) == midi_bytes(performance, 2)),
+    ]
@@ -0,0 +1,84 @@
+"""
+Checks the animation of parameter changes by the _ParameterAnimationEngine: chained segments start where the previous
+one finished and each end exactly on their target, a segment is only updated when its value crosses to the next
+multiple of its resolution (and no more than once per tick), the beats of a faster child clock are followed, and the
+engine's ticks don't fill up the master clock's time stamp data.
+"""
+
+from clockblocks import Clock, current_clock, fork, wait
+from scamp.instruments import _ParameterChangeSegment
+import math
+
+master = Clock()
+master.fast_forward_in_time(float("inf"))
+time_stamps_before = len(master.time_stamp_data)
+
+changes = []
+
+
+def record(label):
+    return lambda value: changes.append((label, round(master.time(), 3), value))
+
+
+def run_chain(clock, label, specs, resolution):
+    # the segments of a sequence of parameter changes, chained together the way that change_note_parameter does it
+    def start_segment(which_segment):
+        # like a note's parameter values, each segment starts from wherever the previous one left the parameter
+        start_value = [value for this_label, _, value in changes if this_label == label + str(which_segment - 1)][-1] \
+            if which_segment > 0 else specs[0][0]
+        _, target, length = specs[which_segment]
+        segment = _ParameterChangeSegment(
+            record(label + str(which_segment)), start_value, target, length, 0, clock, which_segment,
+            temporal_resolution=resolution,
+            on_finish=(lambda: start_segment(which_segment + 1)) if which_segment + 1 < len(specs) else None
+        )
+        segment.run()
+    start_segment(0)
+
+
+def child_glissando():
+    run_chain(current_clock(), "child", [(60, 62, 1)], "pitch-based")
+    wait(2)
+
+
+run_chain(master, "pitch", [(60, 61, 1), (None, 60, 2)], "pitch-based")
+run_chain(master, "swell", [(0, 1, 0.02)], "volume-based")
+child = fork(child_glissando, initial_tempo=120)
+wait(4)
+
+
+def changes_for(label):
+    return [(time, value) for this_label, time, value in changes if this_label == label]
+
+
+def crosses_a_step_each_time(values, step):
+    levels = [math.floor(value / step + 1e-9) for value in values]
+    return all(level != next_level for level, next_level in zip(levels, levels[1:]))
+
+
+first, second = changes_for("pitch0"), changes_for("pitch1")
+swell, child_changes = changes_for("swell0"), changes_for("child0")
+
+
+def ends_on(segment_changes, target, time):
+    return segment_changes[-1] == (time, target)
+
+
+def test_results():
+    return [
+        "first segment ends on its target at its end: {}".format(ends_on(first, 61, 1.0)),
+        "first segment updated at about every step of 0.04: {}".format(20 <= len(first) <= 27),
+        "second segment starts where the first ended: {}".format(60.9 <= second[0][1] < 61 and second[0][0] > 1),
+        "second segment ends on its target at its end: {}".format(ends_on(second, 60, 3.0)),
+        "values move steadily towards the target: {}".format(
+            all(a <= b for (_, a), (_, b) in zip(first, first[1:])) and
+            all(a >= b for (_, a), (_, b) in zip(second, second[1:]))),
+        "each pitch update crosses a step of 0.04: {}".format(
+            crosses_a_step_each_time([value for _, value in first[:-1]], 0.04) and
+            crosses_a_step_each_time([value for _, value in second[:-1]], 0.04)),
+        "fast swell updated at most once per tick: {}".format(len(swell) <= 5 and ends_on(swell, 1, 0.02)),
+        "glissando on a clock at double speed ends on time: {}".format(
+            45 <= len(child_changes) <= 52 and ends_on(child_changes, 62, 0.5)),
+        "master clock time stamps not added on every tick: {}".format(
+            len(master.time_stamp_data) - time_stamps_before < 20),
+    ]
@@ -0,0 +1,50 @@
+"""
+Checks the bulk transformations of a Performance: transpose and scale_volume should leave the types of the pitches
+and volumes alone (so that integer pitches stay integers), vectorized pitch and volume filters should give the
+same values as the equivalent filters applied one note at a time, and remap_to_tempo should scale each segment of a
+tied note separately, in both list and columnar voices.
+"""
+
+from scamp import *
+
+
+def make_performance():
+    performance = Performance()
+    part = PerformancePart(name="Test")
+    performance.add_part(part)
+    for i in range(8):
+        part.add_note(PerformanceNote(i * 0.5, 0.5, 60 + i, 0.5, NoteProperties()))
+    part.add_note(PerformanceNote(4, 1, Envelope([60, 62], [1]), Envelope([0.2, 0.8], [1]), NoteProperties()))
+    return performance
+
+
+def pitches_and_volumes(performance):
+    return [(note.pitch, note.volume) for note in performance.get_note_iterator()]
+
+
+transposed = make_performance().transpose(2).scale_volume(0.5)
+vectorized = make_performance().apply_pitch_filter(lambda p: p * 2 - 60, vectorized=True) \
+    .apply_volume_filter(lambda v: v * v, vectorized=True)
+scalar = make_performance().apply_pitch_filter(lambda p: p * 2 - 60).apply_volume_filter(lambda v: v * v)
+
+
+def remapped_tied_notes(columnar):
+    performance = Performance()
+    part = PerformancePart(name="Test", columnar=columnar)
+    performance.add_part(part)
+    part.add_note(PerformanceNote(0, 1, 60, 0.5, NoteProperties()))
+    part.add_note(PerformanceNote(1, (1, 0.5), 62, 0.5, NoteProperties()))
+    part.add_note(PerformanceNote(2.5, (0.5, 1, 0.25), 64, 0.5, NoteProperties()))
+    # from the default tempo of 60 BPM to 120 BPM, every beat is doubled
+    performance.remap_to_tempo(120)
+    return [(note.start_beat, note.length) for note in performance.get_note_iterator()]
+
+
+def test_results():
+    return [
+        pitches_and_volumes(transposed),
+        "vectorized filters match scalar filters: {}".format(
+            pitches_and_volumes(vectorized) == pitches_and_volumes(scalar)),
+        remapped_tied_notes(False),
+        remapped_tied_notes(True)
+    ]
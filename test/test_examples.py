@@ -203,22 +203,24 @@ def test_example_result(python_file_path):
         return START_RED_TEXT + "FAILED: No saved result" + STOP_RED_TEXT
 
 
-if SAVE_NEW:
-    for example_path in examples:
-        print("Saving result for {}...".format(example_path))
-        save_example_result(example_path)
-        print("DONE")
-else:
-    total = 0
-    successes = 0
-    for example_path in examples:
-        print("Testing result for {}...".format(example_path))
-        example_test_result = test_example_result(example_path)
-        if example_test_result is True:
-            successes += 1
-            print("SUCCESS")
-        else:
-            print(example_test_result)
-        total += 1
-        print()
-    print('\033[1m' + "{}/{} scripts tested successfully".format(successes, total) + '\033[0m')
+# (guarded, since parallel processing in some of the examples spawns worker processes that import this module)
+if __name__ == "__main__":
+    if SAVE_NEW:
+        for example_path in examples:
+            print("Saving result for {}...".format(example_path))
+            save_example_result(example_path)
+            print("DONE")
+    else:
+        total = 0
+        successes = 0
+        for example_path in examples:
+            print("Testing result for {}...".format(example_path))
+            example_test_result = test_example_result(example_path)
+            if example_test_result is True:
+                successes += 1
+                print("SUCCESS")
+            else:
+                print(example_test_result)
+            total += 1
+            print()
+        print('\033[1m' + "{}/{} scripts tested successfully".format(successes, total) + '\033[0m')